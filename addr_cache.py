@@ -0,0 +1,176 @@
+import asyncio
+import bisect
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from statement_registry import statements
+
+logger = logging.getLogger(__name__)
+
+# 코드 접두사 검색 시 범위 상한으로 사용하는 문자 (코드 문자열보다 항상 큼)
+_PREFIX_UPPER = "\uffff"
+
+# 행 튜플의 컬럼 순서 (GET_ADDR_STEP_ALL 의 별칭과 동일)
+_COLUMNS = ("sidoCd", "sido", "sigunguCd", "sigungu", "emdCd", "emd", "riCd", "ri")
+
+
+def _text_sort_key(value: Optional[str]) -> Tuple[bool, str]:
+    """PostgreSQL ORDER BY 와 같이 NULL 값을 가장 뒤로 정렬하기 위한 키"""
+    return (value is None, value or "")
+
+
+def _tuple_sort_key(item: Tuple) -> Tuple:
+    return tuple(_text_sort_key(v) for v in item)
+
+
+class _PrefixIndex:
+    """
+    코드 접두사(LIKE $1 || '%') 검색을 위한 정렬 배열 인덱스
+
+    코드 기준으로 정렬한 뒤 bisect 로 접두사 범위를 찾고,
+    결과는 엔드포인트 정렬 순서로 다시 정렬하여 접두사별로 보관합니다.
+    """
+
+    def __init__(self, items, code_pos: int, order_key):
+        ordered = sorted(
+            (item for item in items if item[code_pos] is not None),
+            key=lambda r: (r[code_pos],) + _tuple_sort_key(r),
+        )
+        self._codes = [item[code_pos] for item in ordered]
+        self._rows = [dict(zip(_COLUMNS, item)) for item in ordered]
+        self._order_key = order_key
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+
+        # 셀렉트박스는 항상 완전한 코드로 조회하므로 코드별 결과를 미리 만들어 둡니다.
+        for code in set(self._codes):
+            self._results[code] = self._compute(code)
+
+    def _compute(self, prefix: str) -> List[Dict[str, Any]]:
+        start = bisect.bisect_left(self._codes, prefix)
+        end = bisect.bisect_left(self._codes, prefix + _PREFIX_UPPER, lo=start)
+        return sorted(self._rows[start:end], key=self._order_key)
+
+    def lookup(self, prefix: str) -> List[Dict[str, Any]]:
+        result = self._results.get(prefix)
+        if result is None:
+            result = self._compute(prefix)
+            # 일치하는 코드가 있는 접두사만 보관 (접두사 수는 코드 수에 비례하므로 제한됨)
+            if result:
+                self._results[prefix] = result
+        return result
+
+
+class AddressSnapshot:
+    """
+    ADDR_STEP 테이블 전체를 메모리에 올린 읽기 전용 스냅샷
+
+    시도코드 → 시군구코드 → 읍면코드 → 동리코드 단계별로
+    상위 코드(접두사)에 대한 하위 목록을 미리 정렬해 둡니다.
+    응답 형태와 정렬 순서는 queries.sql 의 GET_SIDO_LIST ~ GET_RI_LIST 와 동일합니다.
+    (한글 정렬은 유니코드 코드포인트 순서, 즉 가나다 순)
+    """
+
+    def __init__(self, rows: List[Tuple]):
+        self.row_count = len(rows)
+        self.loaded_at = time.time()
+
+        sido_set = set()
+        sigungu_set = set()
+        emd_set = set()
+        ri_set = set()
+
+        for row in rows:
+            sido_cd, sido, sigungu_cd, sigungu, emd_cd, emd, ri_cd, ri = row
+            sido_set.add((sido_cd, sido))
+            sigungu_set.add((sido_cd, sido, sigungu_cd, sigungu))
+
+            # GET_EMD_LIST: 읍면이 없으면 동리를 읍면 자리에 표시
+            if emd == "":
+                emd_set.add((sido_cd, sido, sigungu_cd, sigungu, emd_cd, ri, ri_cd, ""))
+            else:
+                emd_set.add((sido_cd, sido, sigungu_cd, sigungu, emd_cd, emd, ri_cd, ri))
+
+            ri_set.add(row)
+
+        # 시도 목록 (ORDER BY 시도코드)
+        self.sido_list = [
+            {"sidoCd": sido_cd, "sido": sido}
+            for sido_cd, sido in sorted(sido_set, key=_tuple_sort_key)
+        ]
+
+        # 시군구 목록 (WHERE 시도코드 = $1 ORDER BY 시군구)
+        self.sigungu_by_sido: Dict[str, List[Dict[str, Any]]] = {}
+        for item in sorted(sigungu_set, key=lambda r: (_text_sort_key(r[3]),) + _tuple_sort_key(r)):
+            self.sigungu_by_sido.setdefault(item[0], []).append(
+                {"sidoCd": item[0], "sido": item[1], "sigunguCd": item[2], "sigungu": item[3]}
+            )
+
+        # 읍면동 목록 (WHERE 시군구코드 LIKE $1 || '%' ORDER BY emd, ri)
+        self.emd_index = _PrefixIndex(
+            emd_set, code_pos=2,
+            order_key=lambda r: (_text_sort_key(r["emd"]), _text_sort_key(r["ri"])),
+        )
+
+        # 동리 목록 (WHERE 읍면코드 LIKE $1 || '%' ORDER BY ri)
+        self.ri_index = _PrefixIndex(
+            ri_set, code_pos=4,
+            order_key=lambda r: _text_sort_key(r["ri"]),
+        )
+
+
+class AddressCache:
+    """
+    주소 단계별 셀렉트박스 조회용 인메모리 캐시
+
+    lifespan 에서 한 번 적재하고, refresh() 로 재적재합니다.
+    재적재 중에도 기존 스냅샷으로 응답하며, 새 스냅샷이 완성되면 참조만 교체합니다.
+    """
+
+    def __init__(self):
+        self.snapshot: Optional[AddressSnapshot] = None
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.snapshot is not None
+
+    async def refresh(self, pool) -> AddressSnapshot:
+        """ADDR_STEP 을 다시 읽어 새 스냅샷으로 교체합니다."""
+        async with self._refresh_lock:
+            start_time = time.time()
+            async with pool.acquire() as conn:
+                records = await statements.fetch(conn, "GET_ADDR_STEP_ALL")
+            rows = [tuple(record) for record in records]
+
+            # 정렬/인덱스 구성은 이벤트 루프를 막지 않도록 스레드에서 수행
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, AddressSnapshot, rows)
+            self.snapshot = snapshot
+
+            logger.info(f"주소 캐시 적재 완료: {snapshot.row_count}행, 소요 시간: {time.time() - start_time:.4f}초")
+            return snapshot
+
+    async def run_periodic_refresh(self, pool, interval: float) -> None:
+        """interval 초마다 캐시를 재적재합니다. (lifespan 에서 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh(pool)
+            except Exception as e:
+                logger.error(f"주소 캐시 주기적 갱신 중 오류 발생: {str(e)}")
+
+    def get_sido_list(self) -> List[Dict[str, Any]]:
+        return self.snapshot.sido_list
+
+    def get_sigungu_list(self, sido_cd: str) -> List[Dict[str, Any]]:
+        return self.snapshot.sigungu_by_sido.get(sido_cd, [])
+
+    def get_emd_list(self, sigungu_cd: str) -> List[Dict[str, Any]]:
+        return self.snapshot.emd_index.lookup(sigungu_cd)
+
+    def get_ri_list(self, emd_cd: str) -> List[Dict[str, Any]]:
+        return self.snapshot.ri_index.lookup(emd_cd)
+
+
+address_cache = AddressCache()
@@ -3,6 +3,8 @@ import string
 import uuid
 import base64
 import argparse
+import hashlib
+import json
 import os
 from datetime import datetime
 
@@ -48,6 +50,65 @@ def save_key_to_file(key, filename="api_key.txt"):
     print(f"키가 '{filename}' 파일에 저장되었습니다.")
 
 
+def hash_api_key(key):
+    """
+    키 저장소에 기록할 키 해시를 만듭니다.
+
+    생성한 키는 충분히 무작위이므로 느린 해시 없이 SHA-256 으로도 원래 키를 알아낼 수 없습니다.
+    """
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def load_key_store(filename):
+    """
+    해시된 키 저장소(JSON)를 읽습니다. 파일이 없으면 빈 저장소를 돌려줍니다.
+    """
+    try:
+        with open(filename, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"keys": []}
+
+
+def add_keys_to_store(keys, filename, name=None, rate=None, burst=None, concurrency=None, admin=False):
+    """
+    키의 해시만 저장소에 추가합니다. (원래 키는 저장하지 않음)
+
+    rate(초당 요청 수), burst(순간 허용 요청 수), concurrency(동시 요청 수)를 비우면
+    서버의 기본값(API_KEY_RATE, API_KEY_BURST, API_KEY_CONCURRENCY)을 사용합니다.
+    admin 이면 /admin/* 와 /metrics 를 사용할 수 있는 관리 키로 등록합니다.
+    """
+    store = load_key_store(filename)
+    used_ids = {entry["id"] for entry in store["keys"]}
+    for key in keys:
+        key_id = secrets.token_hex(4)
+        while key_id in used_ids:
+            key_id = secrets.token_hex(4)
+        used_ids.add(key_id)
+        entry = {
+            "id": key_id,
+            "name": name or key_id,
+            "hash": hash_api_key(key),
+            "hint": key[:4],
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "disabled": False,
+        }
+        if admin:
+            entry["admin"] = True
+        for field, value in (("rate", rate), ("burst", burst), ("concurrency", concurrency)):
+            if value is not None:
+                entry[field] = value
+        store["keys"].append(entry)
+        print(f"키 #{key_id} 의 해시를 '{filename}' 에 추가했습니다.")
+
+    # 서버가 읽는 도중 반쯤 쓰인 파일을 보지 않도록 임시 파일에 쓴 뒤 교체
+    temp_file = f"{filename}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(store, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    os.replace(temp_file, filename)
+
+
 def main():
     parser = argparse.ArgumentParser(description='안전한 API 키 생성기')
     parser.add_argument('--type', choices=['random', 'uuid', 'timestamp', 'base64'], 
@@ -62,6 +123,18 @@ def main():
                         help='키를 저장할 파일 이름 (기본값: api_key.txt)')
     parser.add_argument('--count', type=int, default=1, 
                         help='생성할 키의 개수 (기본값: 1)')
+    parser.add_argument('--store', type=str, default=None,
+                        help='키의 해시를 추가할 서버 키 저장소 (예: api_keys.json)')
+    parser.add_argument('--name', type=str, default=None,
+                        help='저장소에 기록할 키 이름 (사용처 구분용)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='키별 초당 허용 요청 수 (기본값: 서버 설정)')
+    parser.add_argument('--burst', type=int, default=None,
+                        help='키별 순간 허용 요청 수 (기본값: 서버 설정)')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help='키별 동시 요청 수 (기본값: 서버 설정)')
+    parser.add_argument('--admin', action='store_true',
+                        help='관리 키로 등록 (/admin/*, /metrics 사용 가능)')
     
     args = parser.parse_args()
     
@@ -89,6 +162,10 @@ def main():
                 filename = f"{os.path.splitext(args.file)[0]}_{i+1}{os.path.splitext(args.file)[1]}"
                 save_key_to_file(key, filename)
 
+    if args.store and keys:
+        add_keys_to_store(keys, args.store, args.name, args.rate, args.burst, args.concurrency, args.admin)
+        print("원래 키는 저장소에 남지 않으므로 지금 안전한 곳에 보관하세요.")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,11 +1,300 @@
 from fastapi import HTTPException, Header
+import asyncio
+import hmac
+import json
+import logging
+import math
 import os
+import threading
+import time
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
+from api_key_generator import hash_api_key, load_key_store
+import metrics
+
 load_dotenv()
-VALID_API_KEYS = os.getenv("API_KEYS").split(",")
 
-def verify_api_key(api_key: str = Header(None)):
-    return True
-#    if api_key not in VALID_API_KEYS:
-#        raise HTTPException(status_code=403, detail="Invalid API Key")
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+# 인증 사용 여부 (개발 환경에서만 false)
+API_AUTH_ENABLED = os.getenv("API_AUTH_ENABLED", "true").lower() in ("1", "true", "yes")
+# api_key_generator.py --store 로 만든 해시 키 저장소, 변경 확인 간격(초, 0이면 시작 시에만 읽음)
+API_KEYS_FILE = os.getenv("API_KEYS_FILE", "api_keys.json")
+API_KEYS_RELOAD_SECONDS = float(os.getenv("API_KEYS_RELOAD_SECONDS", "30"))
+# 이전 방식의 평문 키 목록 (쉼표로 구분, 저장소와 함께 사용 가능)
+VALID_API_KEYS = [key.strip() for key in os.getenv("API_KEYS", "").split(",") if key.strip()]
+# 관리 권한이 있는 평문 키 목록 (/admin/*, /metrics 용, 저장소에서는 --admin 으로 발급한 키)
+ADMIN_API_KEYS = [key.strip() for key in os.getenv("ADMIN_API_KEYS", "").split(",") if key.strip()]
+# 예전 .env.example 의 예시 키 (그대로 복사해 쓰면 누구나 추측할 수 있으므로 인증에 쓰지 않음)
+EXAMPLE_API_KEYS = frozenset({"key1", "key2", "key3", "your_api_key"})
+# 저장소에 한도가 없는 키의 기본 한도 (초당 요청 수, 순간 허용 요청 수, 동시 요청 수 / 0이면 제한 없음)
+API_KEY_RATE = float(os.getenv("API_KEY_RATE", "20"))
+API_KEY_BURST = int(os.getenv("API_KEY_BURST", "40"))
+API_KEY_CONCURRENCY = int(os.getenv("API_KEY_CONCURRENCY", "8"))
+# 키별 사용량 누적 파일, 기록 간격(초)
+API_KEY_USAGE_FILE = os.getenv("API_KEY_USAGE_FILE", "api_key_usage.json")
+API_KEY_USAGE_FLUSH_SECONDS = float(os.getenv("API_KEY_USAGE_FLUSH_SECONDS", "60"))
+
+
+class KeyState:
+    """키별 한도 상태 (토큰 버킷, 처리 중인 요청 수, 기록 전 사용량) / 저장소를 다시 읽어도 유지"""
+
+    __slots__ = ("tokens", "updated", "in_flight", "requests", "rate_limited", "concurrency_limited", "last_used")
+
+    def __init__(self, burst: float):
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.requests = 0
+        self.rate_limited = 0
+        self.concurrency_limited = 0
+        self.last_used: Optional[float] = None
+
+
+class ApiKey:
+    __slots__ = ("id", "name", "digest", "rate", "burst", "concurrency", "admin", "state")
+
+    def __init__(self, entry: Dict[str, Any], state: KeyState):
+        self.id = entry["id"]
+        self.name = entry.get("name", self.id)
+        self.digest = entry["hash"]
+        self.rate = float(entry.get("rate", API_KEY_RATE))
+        self.burst = float(entry.get("burst", API_KEY_BURST)) or 1
+        self.concurrency = int(entry.get("concurrency", API_KEY_CONCURRENCY))
+        self.admin = bool(entry.get("admin", False))
+        self.state = state
+
+
+def _rejected(status_code: int, detail: str, reason: str, retry_after: Optional[int] = None) -> HTTPException:
+    metrics.api_key_rejections_total.inc((reason,))
+    headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+    return HTTPException(status_code=status_code, detail=detail, headers=headers)
+
+
+class ApiKeyStore:
+    """
+    해시된 API 키와 키별 한도
+
+    키 저장소의 해시를 메모리의 해시 → 키 맵으로 들고 있어 요청마다 I/O 가 없습니다.
+    요청한 키의 SHA-256 으로 맵을 찾은 뒤 hmac.compare_digest 로 비교하며,
+    원래 키는 메모리에도 남기지 않습니다.
+    한도(토큰 버킷, 동시 요청 수)와 사용량도 메모리에서만 계산하고, 사용량은 주기적으로 모아서 파일에 기록합니다.
+    관리 권한(admin)이 있는 키만 /admin/* 와 /metrics 를 사용할 수 있습니다.
+    """
+
+    def __init__(self, file_path: str, plain_keys=(), admin_keys=()):
+        self.file_path = file_path
+        self.plain_keys = [key for key in plain_keys if key not in EXAMPLE_API_KEYS]
+        self.admin_keys = [key for key in admin_keys if key not in EXAMPLE_API_KEYS]
+        if len(self.plain_keys) != len(plain_keys) or len(self.admin_keys) != len(admin_keys):
+            logger.warning("API_KEYS 의 예시 키(key1 등)는 무시합니다. api_key_generator.py --store 로 키를 발급하세요.")
+        self.keys: Dict[str, ApiKey] = {}
+        self.states: Dict[str, KeyState] = {}
+        self.mtime: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.file_path)
+        except OSError:
+            return None
+
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """저장소 파일이 바뀌었으면 (force 면 항상) 다시 읽어 키 맵을 교체합니다."""
+        with self._lock:
+            mtime = self._read_mtime()
+            if not force and mtime == self.mtime:
+                return self.stats()
+            try:
+                entries = [entry for entry in load_key_store(self.file_path)["keys"] if not entry.get("disabled")]
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"API 키 저장소 읽기 실패, 기존 키 유지: {self.error}")
+                return self.stats()
+            entries += [
+                {"id": f"env{i}", "name": "API_KEYS", "hash": hash_api_key(key)}
+                for i, key in enumerate(self.plain_keys, 1)
+            ]
+            entries += [
+                {"id": f"admin{i}", "name": "ADMIN_API_KEYS", "hash": hash_api_key(key), "admin": True}
+                for i, key in enumerate(self.admin_keys, 1)
+            ]
+
+            keys = {}
+            for entry in entries:
+                state = self.states.get(entry["id"]) or KeyState(float(entry.get("burst", API_KEY_BURST)))
+                self.states[entry["id"]] = state
+                keys[entry["hash"]] = ApiKey(entry, state)
+            self.keys = keys
+            self.mtime = mtime
+            self.loaded_at = time.time()
+            self.error = None
+            if not keys:
+                logger.warning("등록된 API 키가 없어 모든 인증 요청이 거부됩니다. (api_key_generator.py --store 또는 API_KEYS)")
+            else:
+                logger.info(f"API 키 {len(keys)}개 로드")
+            return self.stats()
+
+    async def run_watcher(self, interval: float) -> None:
+        """interval 초마다 키 저장소 변경을 확인합니다. (lifespan 에서 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"API 키 저장소 다시 읽기 중 오류 발생: {str(e)}")
+
+    def authorize(self, api_key: Optional[str]) -> ApiKey:
+        """
+        키를 확인하고 토큰 버킷에서 요청 하나를 뺍니다.
+
+        Raises:
+            HTTPException: 키가 없거나 틀리면 403, 초당 한도를 넘으면 429 (Retry-After 포함)
+        """
+        if not api_key:
+            raise _rejected(403, "Invalid API Key", "missing")
+        digest = hash_api_key(api_key)
+        key = self.keys.get(digest)
+        if key is None or not hmac.compare_digest(key.digest, digest):
+            raise _rejected(403, "Invalid API Key", "invalid")
+
+        state = key.state
+        now = time.monotonic()
+        state.last_used = time.time()
+        if key.rate > 0:
+            state.tokens = min(key.burst, state.tokens + (now - state.updated) * key.rate)
+            state.updated = now
+            if state.tokens < 1:
+                state.rate_limited += 1
+                raise _rejected(429, "Rate limit exceeded", "rate", math.ceil((1 - state.tokens) / key.rate))
+            state.tokens -= 1
+        state.requests += 1
+        return key
+
+    def enter(self, key: ApiKey) -> None:
+        """
+        동시 요청 수 한도 안이면 처리 중 요청 수를 늘립니다. (응답 전송이 끝나면 leave)
+
+        Raises:
+            HTTPException: 동시 요청 수 한도를 넘으면 429
+        """
+        state = key.state
+        if key.concurrency > 0 and state.in_flight >= key.concurrency:
+            state.concurrency_limited += 1
+            raise _rejected(429, "Too many concurrent requests", "concurrency", 1)
+        state.in_flight += 1
+
+    def leave(self, key: ApiKey) -> None:
+        key.state.in_flight -= 1
+
+    def _take_usage(self) -> Dict[str, Dict[str, Any]]:
+        """기록하지 않은 사용량을 꺼내고 0으로 돌립니다."""
+        usage = {}
+        for key_id, state in self.states.items():
+            if not (state.requests or state.rate_limited or state.concurrency_limited):
+                continue
+            usage[key_id] = {
+                "requests": state.requests,
+                "rate_limited": state.rate_limited,
+                "concurrency_limited": state.concurrency_limited,
+                "last_used": state.last_used,
+            }
+            state.requests = state.rate_limited = state.concurrency_limited = 0
+        return usage
+
+    def _write_usage(self, usage: Dict[str, Dict[str, Any]]) -> None:
+        try:
+            with open(API_KEY_USAGE_FILE, encoding="utf-8") as f:
+                totals = json.load(f)
+        except FileNotFoundError:
+            totals = {}
+        for key_id, delta in usage.items():
+            total = totals.setdefault(key_id, {"requests": 0, "rate_limited": 0, "concurrency_limited": 0})
+            for field in ("requests", "rate_limited", "concurrency_limited"):
+                total[field] = total.get(field, 0) + delta[field]
+            total["last_used"] = delta["last_used"]
+        temp_file = f"{API_KEY_USAGE_FILE}.tmp"
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump(totals, f, ensure_ascii=False, indent=2)
+        os.replace(temp_file, API_KEY_USAGE_FILE)
+
+    async def flush_usage(self) -> None:
+        """쌓인 사용량을 사용량 파일의 누적값에 더합니다."""
+        usage = self._take_usage()
+        if usage:
+            await asyncio.to_thread(self._write_usage, usage)
+
+    async def run_usage_flush(self, interval: float) -> None:
+        """interval 초마다 사용량을 모아서 기록합니다. (lifespan 에서 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush_usage()
+            except Exception as e:
+                logger.error(f"API 키 사용량 기록 중 오류 발생: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": API_AUTH_ENABLED,
+            "file": self.file_path,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+            "keys": [
+                {
+                    "id": key.id,
+                    "name": key.name,
+                    "rate": key.rate,
+                    "burst": key.burst,
+                    "concurrency": key.concurrency,
+                    "admin": key.admin,
+                    "in_flight": key.state.in_flight,
+                    "tokens": round(key.state.tokens, 2),
+                    "last_used": key.state.last_used,
+                }
+                for key in self.keys.values()
+            ],
+        }
+
+
+api_keys = ApiKeyStore(API_KEYS_FILE, VALID_API_KEYS, ADMIN_API_KEYS)
+api_keys.reload(force=True)
+
+
+async def verify_api_key(api_key: str = Header(None)):
+    """
+    api-key 헤더를 확인하고 키별 초당/동시 요청 한도를 적용합니다.
+
+    동시 요청 수는 응답 본문 전송(다운로드 스트리밍 포함)이 끝날 때까지 유지됩니다.
+    """
+    if not API_AUTH_ENABLED:
+        yield None
+        return
+    key = api_keys.authorize(api_key)
+    api_keys.enter(key)
+    try:
+        yield key.id
+    finally:
+        api_keys.leave(key)
+
+
+async def verify_admin_key(api_key: str = Header(None)):
+    """
+    관리 권한이 있는 키인지 확인합니다. (/admin/*, /metrics)
+
+    캐시 비우기, 재적재, 키 사용량 조회 등은 일반 조회 키로는 사용할 수 없습니다.
+    초당/동시 요청 한도는 verify_api_key 와 같이 적용합니다.
+    """
+    if not API_AUTH_ENABLED:
+        yield None
+        return
+    key = api_keys.authorize(api_key)
+    if not key.admin:
+        raise _rejected(403, "Admin API Key required", "not_admin")
+    api_keys.enter(key)
+    try:
+        yield key.id
+    finally:
+        api_keys.leave(key)
@@ -0,0 +1,337 @@
+"""
+벤치마크용 합성 데이터셋 생성기
+
+housing_prices 와 ADDR_STEP 을 실제와 비슷한 분포로 만들어 로컬 PostgreSQL 에 적재합니다.
+    - 시도별 공동주택 비중(수도권 쏠림)과 법정동별 편중(Zipf 분포)
+    - 10자리 법정동코드 (시도 2 + 시군구 3 + 읍면동 3 + 리 2), 19자리 PNU
+    - 단지/동/호 구조, 도로명주소(도로명 공유), 특수지코드, 면적/지역별 공시가격
+같은 --seed 와 --rows 로 실행하면 항상 같은 데이터가 만들어집니다.
+
+적재 후 load_test.py 와 vworld_stub.py 가 사용할 요청 샘플(sample.json)을 저장합니다.
+
+사용법:
+    python benchmarks/generate_dataset.py --dsn postgresql://postgres@127.0.0.1:5432/facc_bench --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Tuple
+
+import asyncpg
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+DEFAULT_DSN = os.getenv("BENCH_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/facc_bench")
+DEFAULT_SAMPLE = os.path.join(BENCH_DIR, "sample.json")
+
+# (시도코드, 시도, 공동주택 비중, 광역시 여부(구/동 구조), ㎡당 공시가격 기준(원))
+SIDO = [
+    ("11", "서울특별시", 0.22, True, 9_000_000),
+    ("26", "부산광역시", 0.08, True, 3_200_000),
+    ("27", "대구광역시", 0.05, True, 2_800_000),
+    ("28", "인천광역시", 0.06, True, 3_000_000),
+    ("29", "광주광역시", 0.03, True, 2_300_000),
+    ("30", "대전광역시", 0.03, True, 2_600_000),
+    ("31", "울산광역시", 0.02, True, 2_400_000),
+    ("36", "세종특별자치시", 0.01, True, 3_300_000),
+    ("41", "경기도", 0.27, False, 4_200_000),
+    ("43", "충청북도", 0.03, False, 1_700_000),
+    ("44", "충청남도", 0.04, False, 1_700_000),
+    ("46", "전라남도", 0.02, False, 1_300_000),
+    ("47", "경상북도", 0.03, False, 1_400_000),
+    ("48", "경상남도", 0.05, False, 1_800_000),
+    ("50", "제주특별자치도", 0.01, False, 3_000_000),
+    ("51", "강원특별자치도", 0.02, False, 1_500_000),
+    ("52", "전북특별자치도", 0.03, False, 1_400_000),
+]
+
+SYLLABLES = "가남동서북중신월화수성산평안양천영광진포원정해청용송은덕봉학문미호금대도장매반상하구율"
+BRANDS = ["래미안", "자이", "힐스테이트", "푸르지오", "e편한세상", "아이파크", "롯데캐슬", "더샵", "센트럴", "SK뷰", "하늘채", "주공"]
+# 전용면적(㎡)과 선택 비중
+AREAS = [(39.9, 0.08), (49.5, 0.10), (59.9, 0.28), (74.9, 0.14), (84.9, 0.30), (101.9, 0.04), (114.9, 0.04), (134.9, 0.02)]
+# DB 특수지코드와 비중 (0: 일반, 1: 산, 2: 블록, 6: 지구), 특수지명
+SPECIAL_CODES = [("0", 0.96, ""), ("1", 0.02, "산"), ("2", 0.01, "블록"), ("6", 0.01, "지구")]
+
+HOUSING_COLUMNS = [
+    "법정동코드", "도로명주소", "시도", "시군구", "읍면", "동리", "특수지코드", "본번", "부번", "특수지명",
+    "단지명", "동명", "호명", "전용면적", "공시가격", "단지코드", "동코드", "호코드",
+    "건축물대장pk", "(구)건축물대장PK", "pnu",
+]
+ADDR_STEP_COLUMNS = ["시도코드", "시도", "시군구코드", "시군구", "읍면코드", "읍면", "동리코드", "동리"]
+
+INDEX_STATEMENTS = [
+    "CREATE INDEX IF NOT EXISTS housing_prices_pnu_idx ON housing_prices (PNU)",
+    "CREATE INDEX IF NOT EXISTS housing_prices_bldg_idx ON housing_prices (건축물대장PK)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS housing_prices_keyset_uniq ON housing_prices (법정동코드, 단지코드, 동코드, 호코드, 건축물대장PK, PNU)",
+    "CREATE INDEX IF NOT EXISTS housing_prices_road_addr_idx ON housing_prices (도로명주소)",
+]
+
+
+def place_name(rng: random.Random, length: int = 2) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(length))
+
+
+def weighted_choice(rng: random.Random, choices: List[Tuple[Any, float]]) -> Any:
+    return rng.choices([value for value, _ in choices], weights=[weight for _, weight in choices])[0]
+
+
+class Region:
+    """법정동(동 또는 리) 하나"""
+
+    __slots__ = ("legal_code", "sido", "sigungu", "emd", "ri", "price_base", "weight", "roads")
+
+    def __init__(self, legal_code, sido, sigungu, emd, ri, price_base, weight):
+        self.legal_code = legal_code
+        self.sido = sido
+        self.sigungu = sigungu
+        self.emd = emd
+        self.ri = ri
+        self.price_base = price_base
+        self.weight = weight
+        self.roads: List[str] = []
+
+
+def build_regions(rng: random.Random) -> Tuple[List[Region], List[Tuple[str, ...]]]:
+    """
+    시도 → 시군구 → 읍면동 → 리 단계의 법정동 목록과 ADDR_STEP 행을 만듭니다.
+
+    Returns:
+        (법정동 목록, ADDR_STEP 행 목록)
+    """
+    regions = []
+    addr_step = []
+    for sido_code, sido, share, metro, price_base in SIDO:
+        sigungu_count = rng.randint(5, 16) if metro else rng.randint(10, 24)
+        for i in range(sigungu_count):
+            sigungu_code = f"{sido_code}{110 + i * 10:03d}"
+            suffix = "구" if metro else rng.choice(["시", "시", "군"])
+            sigungu = place_name(rng) + suffix
+            local_regions = []
+            emd_count = rng.randint(8, 25)
+            for j in range(emd_count):
+                # 광역시와 시 지역은 동, 그 외는 읍/면 아래 리
+                if metro or (suffix == "시" and j < emd_count // 2):
+                    emd_code = f"{sigungu_code}{101 + j:03d}"
+                    dong = place_name(rng) + "동"
+                    local_regions.append(Region(f"{emd_code}00", sido, sigungu, "", dong, price_base, 0.0))
+                    addr_step.append((sido_code, sido, sigungu_code, sigungu, emd_code, "", f"{emd_code}00", dong))
+                else:
+                    emd_code = f"{sigungu_code}{250 + j:03d}"
+                    emd = place_name(rng) + rng.choice(["읍", "면", "면"])
+                    for k in range(rng.randint(3, 12)):
+                        ri_code = f"{emd_code}{21 + k:02d}"
+                        ri = place_name(rng) + "리"
+                        local_regions.append(Region(ri_code, sido, sigungu, emd, ri, price_base * 0.6, 0.0))
+                        addr_step.append((sido_code, sido, sigungu_code, sigungu, emd_code, emd, ri_code, ri))
+
+            # 시군구 안에서도 일부 동에 공동주택이 몰림 (Zipf)
+            rng.shuffle(local_regions)
+            harmonic = sum(1 / (rank + 1) ** 1.1 for rank in range(len(local_regions)))
+            for rank, region in enumerate(local_regions):
+                region.weight = share / sigungu_count * (1 / (rank + 1) ** 1.1) / harmonic
+                region.roads = [f"{place_name(rng)}로" if r == 0 else f"{place_name(rng)}로{rng.randint(1, 60)}길"
+                                for r in range(rng.randint(2, 6))]
+            regions.extend(local_regions)
+    return regions, addr_step
+
+
+def allocate_rows(rng: random.Random, regions: List[Region], total_rows: int) -> List[int]:
+    """법정동별 행 수를 비중에 맞게 나눕니다."""
+    weight_sum = sum(region.weight for region in regions)
+    quotas = [int(total_rows * region.weight / weight_sum) for region in regions]
+    # 반올림으로 남은 행은 비중이 큰 동부터 배분
+    remainder = total_rows - sum(quotas)
+    for index in sorted(range(len(regions)), key=lambda i: -regions[i].weight)[:remainder]:
+        quotas[index] += 1
+    return quotas
+
+
+class DatasetGenerator:
+    """법정동별 할당량만큼 단지/동/호 행을 만들고, 부하 테스트용 샘플을 모읍니다."""
+
+    SAMPLE_SIZE = 2000
+
+    def __init__(self, seed: int, total_rows: int):
+        self.rng = random.Random(seed)
+        self.total_rows = total_rows
+        self.regions, self.addr_step = build_regions(self.rng)
+        self.quotas = allocate_rows(self.rng, self.regions, total_rows)
+        self.complex_seq = 0
+        self.building_seq = 0
+        self.seen_complexes = 0
+        # 샘플 (저수지 표본 추출로 전체에서 고르게)
+        self.complex_samples: List[Dict[str, Any]] = []
+
+    def _sample_complex(self, sample: Dict[str, Any]) -> None:
+        self.seen_complexes += 1
+        if len(self.complex_samples) < self.SAMPLE_SIZE:
+            self.complex_samples.append(sample)
+        else:
+            index = self.rng.randrange(self.seen_complexes)
+            if index < self.SAMPLE_SIZE:
+                self.complex_samples[index] = sample
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        rng = self.rng
+        for region, quota in zip(self.regions, self.quotas):
+            used_lots = set()
+            while quota > 0:
+                # 단지 규모: 소규모 연립/다세대가 많고 대단지는 드묾 (로그정규)
+                households = min(quota, max(4, int(rng.lognormvariate(4.2, 1.1))))
+                quota -= households
+                self.complex_seq += 1
+
+                sp_code, sp_name = weighted_choice(rng, [((code, name), weight) for code, weight, name in SPECIAL_CODES])
+                while True:
+                    bon = rng.randint(1, 2000) if rng.random() < 0.9 else rng.randint(2000, 9999)
+                    boo = 0 if rng.random() < 0.55 else rng.randint(1, 120)
+                    if (bon, boo) not in used_lots:
+                        used_lots.add((bon, boo))
+                        break
+                bon_text, boo_text = str(bon), str(boo)
+                pnu = f"{region.legal_code}{'2' if sp_code == '1' else '1'}{bon:04d}{boo:04d}"
+                road = f"{region.sido} {region.sigungu} {rng.choice(region.roads)} {rng.randint(1, 300)}"
+                if households >= 100:
+                    complex_name = f"{region.ri}{rng.choice(BRANDS)}" + (f"{rng.randint(1, 9)}단지" if rng.random() < 0.3 else "")
+                else:
+                    complex_name = f"{place_name(rng)}{rng.choice(['빌라', '맨션', '하이츠', '빌'])}"
+                complex_code = f"{self.complex_seq:09d}"
+                units_per_building = rng.randint(20, 120) if households >= 100 else households
+                area_bias = rng.random()
+                price_factor = rng.lognormvariate(0, 0.35)
+
+                parcel = " ".join(part for part in (region.sido, region.sigungu, region.emd, region.ri) if part)
+                parcel += f" {'산' if sp_code == '1' else ''}{bon}" + (f"-{boo}" if boo else "")
+                first_building_pk = None
+
+                for unit_index in range(households):
+                    building_no, unit_no = divmod(unit_index, units_per_building)
+                    if unit_no == 0:
+                        self.building_seq += 1
+                        building_pk = f"{region.legal_code[:5]}-{self.building_seq:09d}"
+                        old_building_pk = f"{region.legal_code}{bon:04d}{boo:04d}{building_no + 1:03d}"
+                        first_building_pk = first_building_pk or building_pk
+                    floor, line = divmod(unit_no, 4)
+                    area = weighted_choice(rng, AREAS) if rng.random() > area_bias * 0.5 else AREAS[4][0]
+                    price = region.price_base * area * price_factor * (1 + floor * 0.005)
+                    yield (
+                        region.legal_code, road, region.sido, region.sigungu, region.emd, region.ri,
+                        sp_code, bon_text, boo_text, sp_name,
+                        complex_name,
+                        f"{101 + building_no}동" if households >= 100 else "",
+                        f"{floor + 1}{line + 1:02d}호",
+                        Decimal(f"{area:.2f}"),
+                        Decimal(int(price // 1000 * 1000)),
+                        complex_code, f"{building_no + 1:04d}", f"{floor + 1:03d}{line + 1:02d}",
+                        building_pk, old_building_pk, pnu,
+                    )
+
+                self._sample_complex({
+                    "legalCode": region.legal_code,
+                    "spCd": {"0": "1", "1": "2", "2": "3", "6": "5"}[sp_code],
+                    "bon": bon_text,
+                    "boo": boo_text,
+                    "pnu": pnu,
+                    "bldgReg": first_building_pk,
+                    "roadAddr": road,
+                    "road": road.split(" ")[2],
+                    "parcel": parcel,
+                    "households": households,
+                })
+
+    def sample(self) -> Dict[str, Any]:
+        """load_test.py 와 vworld_stub.py 가 읽는 요청 샘플"""
+        samples = self.complex_samples
+        sido_codes = sorted({row[0] for row in self.addr_step})
+        sigungu_codes = sorted({row[2] for row in self.addr_step})
+        emd_codes = sorted({row[4] for row in self.addr_step})
+        # 행 수가 많은 법정동일수록 자주 요청되도록 가중치와 함께 저장
+        legal_codes = [
+            [region.legal_code, quota] for region, quota in sorted(
+                zip(self.regions, self.quotas), key=lambda item: -item[1]
+            ) if quota > 0
+        ][:500]
+        return {
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "rows": self.total_rows,
+            "sido_codes": sido_codes,
+            "sigungu_codes": sigungu_codes,
+            "emd_codes": emd_codes,
+            "legal_codes": legal_codes,
+            "complexes": samples,
+        }
+
+
+async def load(args) -> None:
+    generator = DatasetGenerator(args.seed, args.rows)
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        with open(os.path.join(BENCH_DIR, "schema.sql"), encoding="utf-8") as f:
+            await conn.execute(f.read())
+        with open(os.path.join(ROOT_DIR, "sql", "dataset_version.sql"), encoding="utf-8") as f:
+            await conn.execute(f.read())
+        if args.truncate:
+            await conn.execute("TRUNCATE housing_prices, ADDR_STEP")
+            # 인덱스가 있으면 적재가 느려지므로 지우고 적재 후 다시 만듦
+            for statement in INDEX_STATEMENTS:
+                index_name = statement.split()[5]
+                await conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+        await conn.copy_records_to_table("addr_step", records=generator.addr_step, columns=ADDR_STEP_COLUMNS)
+        print(f"ADDR_STEP {len(generator.addr_step):,}행 적재")
+
+        start_time = time.time()
+        loaded = 0
+        batch = []
+        for row in generator.rows():
+            batch.append(row)
+            if len(batch) >= args.batch_size:
+                await conn.copy_records_to_table("housing_prices", records=batch, columns=HOUSING_COLUMNS)
+                loaded += len(batch)
+                batch = []
+                elapsed = time.time() - start_time
+                print(f"housing_prices {loaded:,}/{args.rows:,}행 적재 ({loaded / elapsed:,.0f}행/초)")
+        if batch:
+            await conn.copy_records_to_table("housing_prices", records=batch, columns=HOUSING_COLUMNS)
+            loaded += len(batch)
+        print(f"housing_prices {loaded:,}행 적재 완료, 소요 시간: {time.time() - start_time:.1f}초")
+
+        for statement in INDEX_STATEMENTS:
+            index_start = time.time()
+            await conn.execute(statement)
+            print(f"{statement.split()[5]} 생성: {time.time() - index_start:.1f}초")
+        await conn.execute("ANALYZE housing_prices")
+        await conn.execute("ANALYZE addr_step")
+        await conn.execute(
+            "INSERT INTO dataset_version (version) VALUES ($1) ON CONFLICT (version) DO UPDATE SET updated_at = now()",
+            f"bench-{args.seed}-{args.rows}",
+        )
+    finally:
+        await conn.close()
+
+    with open(args.sample, "w", encoding="utf-8") as f:
+        json.dump(generator.sample(), f, ensure_ascii=False, indent=1)
+    print(f"요청 샘플 저장: {args.sample}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 합성 housing_prices / ADDR_STEP 데이터 생성")
+    parser.add_argument("--dsn", default=DEFAULT_DSN, help="적재할 PostgreSQL 접속 문자열 (BENCH_DATABASE_URL)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="housing_prices 행 수")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같은 시드면 같은 데이터)")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="COPY 한 번에 보낼 행 수")
+    parser.add_argument("--sample", default=DEFAULT_SAMPLE, help="요청 샘플 저장 경로")
+    parser.add_argument("--no-truncate", dest="truncate", action="store_false", help="기존 데이터를 지우지 않고 추가")
+    args = parser.parse_args()
+    if args.rows <= 0:
+        parser.error("--rows 는 1 이상이어야 합니다.")
+    asyncio.run(load(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+API 서버 부하 테스트
+
+main.py 의 모든 조회/다운로드 엔드포인트를 동시 요청 수별로 일정 시간 호출하고
+처리량, p50/p95/p99 응답 시간, 서버 최대 RSS 를 JSON 으로 저장합니다.
+커밋별 결과 파일을 --compare 로 비교할 수 있습니다.
+
+사용법:
+    python benchmarks/load_test.py --base-url http://127.0.0.1:8000 --server-pid <uvicorn PID> --api-key <키> \\
+        --concurrency 1,8,32 --duration 10 --output results/$(git rev-parse --short HEAD).json
+    python benchmarks/load_test.py --compare results/base.json results/new.json
+"""
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import aiohttp
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_SAMPLE = os.path.join(BENCH_DIR, "sample.json")
+
+# 서버가 한도 초과로 거절한 응답 (API 키 한도 429, 작업 부류 포화 503)
+# 거절 응답은 DB 를 거치지 않아 매우 빠르므로 처리량/응답 시간에서 빼고 따로 셉니다.
+REJECTED_STATUSES = {"429", "503"}
+
+
+class Call(NamedTuple):
+    method: str
+    path: str
+    params: Optional[Dict[str, str]] = None
+    body: Optional[Dict[str, Any]] = None
+
+
+class Scenario(NamedTuple):
+    name: str
+    build: Callable[[random.Random, Dict[str, Any]], Call]
+    # ETag 를 기억했다가 If-None-Match 로 다시 요청 (304 경로 측정)
+    revalidate: bool = False
+
+
+def _complex(rng, sample):
+    return rng.choice(sample["complexes"])
+
+
+def _legal_code(rng, sample):
+    # 행이 많은 법정동일수록 자주 요청
+    codes, weights = zip(*sample["legal_codes"])
+    return rng.choices(codes, weights=weights)[0]
+
+
+def _short_parcel(rng, sample):
+    return " ".join(_complex(rng, sample)["parcel"].split(" ")[-2:])
+
+
+def _pnu_list(rng, sample, size=100):
+    return {"pnu_list": [c["pnu"] for c in rng.sample(sample["complexes"], min(size, len(sample["complexes"])))]}
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("api_test_page", lambda rng, s: Call("GET", "/api-test")),
+    Scenario("sido", lambda rng, s: Call("GET", "/data/sido")),
+    Scenario("sigungu", lambda rng, s: Call("GET", f"/data/sigungu/{rng.choice(s['sido_codes'])}")),
+    Scenario("emd", lambda rng, s: Call("GET", f"/data/emd/{rng.choice(s['sigungu_codes'])}")),
+    Scenario("ri", lambda rng, s: Call("GET", f"/data/ri/{rng.choice(s['emd_codes'])}")),
+    Scenario("pnu", lambda rng, s: Call("GET", f"/data/pnu/{_complex(rng, s)['pnu']}")),
+    Scenario("pnu_batch", lambda rng, s: Call("POST", "/data/pnu", body=_pnu_list(rng, s))),
+    Scenario("bldgReg", lambda rng, s: Call("GET", f"/data/bldgReg/{_complex(rng, s)['bldgReg']}")),
+    Scenario("roadAddr", lambda rng, s: Call("GET", f"/data/roadAddr/{_complex(rng, s)['road']}", {"limit": "100"})),
+    Scenario("bonboo", lambda rng, s: Call("GET", f"/data/bonboo/{_legal_code(rng, s)}", {"spCd": "1"})),
+    Scenario("bonboo_bon", lambda rng, s: (lambda c: Call(
+        "GET", f"/data/bonboo/{c['legalCode']}", {"spCd": c["spCd"], "bon": c["bon"], "boo": c["boo"]}
+    ))(_complex(rng, s))),
+    Scenario("bonboo_arrow", lambda rng, s: Call("GET", f"/data/bonboo/{_legal_code(rng, s)}", {"format": "arrow"})),
+    Scenario("bonboo_revalidate", lambda rng, s: Call("GET", f"/data/bonboo/{_legal_code(rng, s)}"), revalidate=True),
+    Scenario("jibunAddr", lambda rng, s: Call("GET", f"/data/jibunAddr/{_short_parcel(rng, s)}")),
+    Scenario("download_sido", lambda rng, s: Call("GET", "/download/data/sido")),
+    Scenario("download_sigungu", lambda rng, s: Call("GET", f"/download/data/sigungu/{rng.choice(s['sido_codes'])}")),
+    Scenario("download_emd", lambda rng, s: Call("GET", f"/download/data/emd/{rng.choice(s['sigungu_codes'])}")),
+    Scenario("download_ri", lambda rng, s: Call("GET", f"/download/data/ri/{rng.choice(s['emd_codes'])}")),
+    Scenario("download_pnu", lambda rng, s: Call("GET", f"/download/data/pnu/{_complex(rng, s)['pnu']}")),
+    Scenario("download_pnu_batch", lambda rng, s: Call("POST", "/download/data/pnu", body=_pnu_list(rng, s, 1000))),
+    Scenario("download_bldgReg", lambda rng, s: Call("GET", f"/download/data/bldgReg/{_complex(rng, s)['bldgReg']}")),
+    Scenario("download_roadAddr", lambda rng, s: Call("GET", f"/download/data/roadAddr/{_complex(rng, s)['road']}")),
+    Scenario("download_bonboo", lambda rng, s: Call("GET", f"/download/data/bonboo/{_legal_code(rng, s)}")),
+    Scenario("download_bonboo_excel", lambda rng, s: Call(
+        "GET", f"/download/data/bonboo/{_legal_code(rng, s)}", {"format": "excel"}
+    )),
+    Scenario("metrics", lambda rng, s: Call("GET", "/metrics")),
+    Scenario("admin_statements", lambda rng, s: Call("GET", "/admin/statements")),
+    Scenario("admin_queries", lambda rng, s: Call("GET", "/admin/queries")),
+    Scenario("admin_vworld_stats", lambda rng, s: Call("GET", "/admin/vworld/stats")),
+    Scenario("admin_db_stats", lambda rng, s: Call("GET", "/admin/db/stats")),
+    Scenario("admin_ip_filter", lambda rng, s: Call("GET", "/admin/ip-filter")),
+    Scenario("admin_api_keys", lambda rng, s: Call("GET", "/admin/api-keys")),
+    Scenario("admin_result_cache", lambda rng, s: Call("GET", "/admin/result-cache")),
+    Scenario("admin_data_reload", lambda rng, s: Call("GET", "/admin/data-reload")),
+    Scenario("admin_workloads", lambda rng, s: Call("GET", "/admin/workloads")),
+]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class RssSampler:
+    """서버 프로세스의 RSS 를 주기적으로 읽어 최대값을 기록합니다. (psutil 또는 /proc)"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.1):
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._process = psutil.Process(pid) if (pid and psutil is not None) else None
+
+    def read(self) -> int:
+        if self._process is not None:
+            rss = self._process.memory_info().rss
+            for child in self._process.children(recursive=True):
+                rss += child.memory_info().rss
+            return rss
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def reset(self) -> None:
+        self.peak = 0
+
+    async def run(self) -> None:
+        if not self.pid:
+            return
+        while True:
+            try:
+                self.peak = max(self.peak, self.read())
+            except (OSError, ValueError):
+                return
+            await asyncio.sleep(self.interval)
+
+
+async def run_level(session, base_url, scenario, sample, concurrency, duration, warmup, api_key, seed):
+    """동시 요청 수 하나로 warmup + duration 초 동안 시나리오를 반복 호출합니다."""
+    latencies: List[float] = []
+    status_counts: Dict[str, int] = {}
+    errors = 0
+    rejected = 0
+    total_bytes = 0
+    etags: Dict[str, str] = {}
+    start_time = time.perf_counter()
+    measure_from = start_time + warmup
+    stop_at = measure_from + duration
+
+    async def worker(worker_id: int):
+        nonlocal errors, rejected, total_bytes
+        rng = random.Random(seed * 1000 + worker_id)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            call = scenario.build(rng, sample)
+            headers = {"api-key": api_key} if api_key else {}
+            url = base_url + call.path
+            cache_key = url + json.dumps(call.params, sort_keys=True)
+            if scenario.revalidate and cache_key in etags:
+                headers["If-None-Match"] = etags[cache_key]
+            request_start = time.perf_counter()
+            try:
+                async with session.request(call.method, url, params=call.params, json=call.body, headers=headers) as response:
+                    size = 0
+                    async for chunk in response.content.iter_chunked(65536):
+                        size += len(chunk)
+                    status = str(response.status)
+                    if scenario.revalidate and "ETag" in response.headers:
+                        etags[cache_key] = response.headers["ETag"]
+            except Exception:
+                status = "exception"
+                size = 0
+            elapsed = time.perf_counter() - request_start
+            if request_start < measure_from:
+                continue
+            status_counts[status] = status_counts.get(status, 0) + 1
+            if status in REJECTED_STATUSES:
+                rejected += 1
+                continue
+            latencies.append(elapsed)
+            total_bytes += size
+            if status == "exception" or int(status) >= 400:
+                errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    measured = min(duration, time.perf_counter() - measure_from)
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "status_counts": status_counts,
+        "throughput_rps": len(latencies) / measured if measured > 0 else 0.0,
+        "bytes_per_second": total_bytes / measured if measured > 0 else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+            "max": latencies[-1] * 1000 if latencies else 0.0,
+        },
+    }
+
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+async def run(args) -> Dict[str, Any]:
+    with open(args.sample, encoding="utf-8") as f:
+        sample = json.load(f)
+
+    patterns = [p.strip() for p in args.scenarios.split(",") if p.strip()]
+    scenarios = [s for s in SCENARIOS if any(fnmatch.fnmatch(s.name, p) for p in patterns)]
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    sampler = RssSampler(args.server_pid)
+    sampler_task = asyncio.create_task(sampler.run())
+    overall_peak = 0
+    results = []
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    try:
+        for scenario in scenarios:
+            for concurrency in levels:
+                connector = aiohttp.TCPConnector(limit=concurrency)
+                async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                    sampler.reset()
+                    result = await run_level(
+                        session, args.base_url.rstrip("/"), scenario, sample,
+                        concurrency, args.duration, args.warmup, args.api_key, args.seed,
+                    )
+                result["peak_rss_bytes"] = sampler.peak or None
+                overall_peak = max(overall_peak, sampler.peak)
+                results.append(result)
+                latency = result["latency_ms"]
+                print(
+                    f"{scenario.name:<24} c={concurrency:<4} {result['throughput_rps']:9.1f} req/s  "
+                    f"p50={latency['p50']:8.1f}ms p95={latency['p95']:8.1f}ms p99={latency['p99']:8.1f}ms  "
+                    f"errors={result['errors']} rejected={result['rejected']}",
+                    file=sys.stderr,
+                )
+    finally:
+        sampler_task.cancel()
+
+    if any("403" in result["status_counts"] for result in results):
+        print("403 응답이 있습니다. --api-key (BENCH_API_KEY) 가 서버의 ADMIN_API_KEYS 와 같은지 확인하세요. (관리 시나리오는 관리 키 필요)", file=sys.stderr)
+    if any(result["rejected"] for result in results):
+        print(
+            "429/503 거절 응답은 처리량과 응답 시간에서 뺐습니다. 서버 용량을 측정하려면 "
+            "API_KEY_RATE/API_KEY_CONCURRENCY 와 WORKLOAD_CLASSES 의 한도를 풀고 실행하세요. (benchmarks/README.md)",
+            file=sys.stderr,
+        )
+
+    return {
+        "meta": {
+            **git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "base_url": args.base_url,
+            "dataset_rows": sample.get("rows"),
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "peak_rss_bytes": overall_peak or None,
+        "results": results,
+    }
+
+
+def compare(base_path: str, new_path: str, threshold: float) -> int:
+    """두 결과 파일의 처리량과 p95 를 비교합니다. (threshold 이상 나빠진 항목이 있으면 1 반환)"""
+    with open(base_path, encoding="utf-8") as f:
+        base = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = {(r["scenario"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'scenario':<24} {'c':>4} {'rps':>10} {'Δrps':>8} {'p95(ms)':>10} {'Δp95':>8}")
+    for key in sorted(base.keys() & new.keys()):
+        old, cur = base[key], new[key]
+        rps_change = (cur["throughput_rps"] / old["throughput_rps"] - 1) if old["throughput_rps"] else 0.0
+        p95_change = (cur["latency_ms"]["p95"] / old["latency_ms"]["p95"] - 1) if old["latency_ms"]["p95"] else 0.0
+        regressed = rps_change < -threshold or p95_change > threshold
+        regressions += regressed
+        rejected = cur.get("rejected", 0)
+        print(
+            f"{key[0]:<24} {key[1]:>4} {cur['throughput_rps']:>10.1f} {rps_change:>+8.1%} "
+            f"{cur['latency_ms']['p95']:>10.1f} {p95_change:>+8.1%}{'  ← 회귀' if regressed else ''}"
+            f"{f'  (거절 {rejected}건)' if rejected else ''}"
+        )
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 서버 부하 테스트")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--api-key", default=os.getenv("BENCH_API_KEY", ""), help="api-key 헤더 값")
+    parser.add_argument("--sample", default=DEFAULT_SAMPLE, help="generate_dataset.py 가 저장한 요청 샘플")
+    parser.add_argument("--scenarios", default="*", help="실행할 시나리오 이름 (쉼표 구분, 와일드카드 가능)")
+    parser.add_argument("--concurrency", default="1,8,32", help="동시 요청 수 목록 (쉼표 구분)")
+    parser.add_argument("--duration", type=float, default=10.0, help="동시 요청 수별 측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="측정 전 예열 시간 (초)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청 하나의 최대 시간 (초)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--server-pid", type=int, help="RSS 를 측정할 API 서버 프로세스 ID")
+    parser.add_argument("--output", help="결과 JSON 저장 경로 (생략 시 표준 출력)")
+    parser.add_argument("--list", action="store_true", help="시나리오 목록 출력")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="두 결과 파일 비교")
+    parser.add_argument("--threshold", type=float, default=0.10, help="--compare 에서 회귀로 볼 변화율")
+    args = parser.parse_args()
+
+    if args.list:
+        for scenario in SCENARIOS:
+            print(scenario.name)
+        return
+    if args.compare:
+        sys.exit(compare(*args.compare, args.threshold))
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
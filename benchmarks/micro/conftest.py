@@ -0,0 +1,103 @@
+"""
+요청마다 실행되는 순수 Python 경로의 마이크로벤치마크 공통 설정
+
+각 벤치마크의 최소 시간을 baselines.json 과 비교하여 허용 비율(--baseline-threshold,
+MICROBENCH_THRESHOLD, 기본 25%)보다 느려지면 실패합니다.
+(최소 시간은 다른 스레드/프로세스의 간섭을 가장 적게 받은 값이라 중앙값보다 안정적입니다)
+기준값은 측정 환경마다 다르므로 CI 와 같은 장비에서 --update-baselines 로 다시 저장합니다.
+"""
+import json
+import os
+import platform
+import sys
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+MICRO_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(os.path.dirname(MICRO_DIR))
+BASELINE_FILE = os.path.join(MICRO_DIR, "baselines.json")
+
+# main 이 읽는 파일은 현재 디렉터리 기준이므로 절대 경로로 지정 (세션의 작업 디렉터리는 바꾸지 않음)
+# auth 는 API_KEYS 가 필요
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QUERIES_FILE", os.path.join(ROOT_DIR, "queries.sql"))
+os.environ.setdefault("KOREAN_IP_RANGES_FILE", os.path.join(ROOT_DIR, "korean_ip_ranges.txt"))
+os.environ.setdefault("API_KEYS_FILE", os.path.join(ROOT_DIR, "api_keys.json"))
+os.environ.setdefault("API_KEYS", "bench")
+os.environ.setdefault("LOG_DIR", os.path.join(MICRO_DIR, ".logs"))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("microbench baselines")
+    group.addoption("--update-baselines", action="store_true", help="측정한 최소 시간을 baselines.json 에 저장")
+    group.addoption(
+        "--baseline-threshold", type=float,
+        default=float(os.getenv("MICROBENCH_THRESHOLD", "0.25")),
+        help="기준값 대비 허용 지연 비율 (0.25 = 25%%)",
+    )
+
+
+def _load_baselines():
+    try:
+        with open(BASELINE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"machine": None, "minimums": {}}
+
+
+def pytest_configure(config):
+    config._microbench_baselines = _load_baselines()
+    config._microbench_measured = {}
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if not config.getoption("--update-baselines") or not config._microbench_measured:
+        return
+    baselines = config._microbench_baselines
+    baselines["machine"] = " ".join(filter(None, [platform.machine(), platform.processor(), f"/ Python {platform.python_version()}"]))
+    baselines["minimums"].update(config._microbench_measured)
+    baselines["minimums"] = dict(sorted(baselines["minimums"].items()))
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def run_coroutine(coroutine):
+    """await 하지 않는 코루틴을 이벤트 루프 없이 실행합니다. (루프 비용이 측정에 섞이지 않도록)"""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("코루틴이 대기 상태가 되었습니다.")
+
+
+@pytest.fixture
+def bench(benchmark, request):
+    """
+    benchmark 로 측정한 뒤 최소 시간을 기준값과 비교합니다.
+
+    사용: bench(함수, *인자)
+    """
+    config = request.config
+
+    def run(func, *args, **kwargs):
+        result = benchmark(func, *args, **kwargs)
+        if benchmark.stats is None:
+            # --benchmark-disable 등으로 측정하지 않은 경우
+            return result
+        name = request.node.name
+        fastest = benchmark.stats.stats.min
+        config._microbench_measured[name] = fastest
+        baseline = config._microbench_baselines["minimums"].get(name)
+        if baseline and not config.getoption("--update-baselines"):
+            threshold = config.getoption("--baseline-threshold")
+            assert fastest <= baseline * (1 + threshold), (
+                f"{name}: 최소 {fastest * 1e6:.2f}µs 가 기준값 {baseline * 1e6:.2f}µs 보다 "
+                f"{fastest / baseline - 1:.0%} 느립니다. (허용 {threshold:.0%})"
+            )
+        return result
+
+    return run
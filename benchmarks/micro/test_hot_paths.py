@@ -0,0 +1,136 @@
+"""
+요청마다 실행되는 순수 Python 경로의 마이크로벤치마크
+
+실행:
+    pip install pytest-benchmark
+    python -m pytest benchmarks/micro
+    python -m pytest benchmarks/micro --update-baselines   # 기준값 다시 저장
+"""
+import json
+import os
+import sys
+
+import pytest
+from starlette.requests import Request
+
+from conftest import run_coroutine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_dataset import DatasetGenerator  # noqa: E402
+
+import main  # noqa: E402
+from download_export import build_csv, build_xlsx  # noqa: E402
+from json_response import record_to_json  # noqa: E402
+from korean_ip_middleware import KOREAN_IP_RANGES_FILE, IPRangeTable, KoreanIPFilter, is_korean_ip_simple  # noqa: E402
+from query_loader import QUERIES_FILE, load_queries, queries  # noqa: E402
+from query_template import parse_template  # noqa: E402
+
+asyncpg_protocol = pytest.importorskip("asyncpg.protocol.protocol")
+
+# 조회 쿼리의 응답 컬럼 별칭 (housing_prices 컬럼 순서)
+ALIASES = [
+    "legalCd", "roadAddr", "sido", "sigungu", "emd", "ri", "spCd", "bon", "boo", "spNm",
+    "cmpNm", "dongNm", "hoNm", "exArea", "pubPrice", "cmpCd", "dongCd", "hoCd",
+    "bldbLedgerPK", "oldBldbLedgerPK", "PNU",
+]
+# 한 법정동 조회의 일반적인 결과 크기 (/data/bonboo 기본 페이지 크기)
+ROW_COUNT = 1000
+
+
+@pytest.fixture(scope="module")
+def records():
+    """asyncpg 가 돌려주는 것과 같은 Record 목록"""
+    mapping = {alias: index for index, alias in enumerate(ALIASES)}
+    rows = []
+    for row in DatasetGenerator(seed=7, total_rows=ROW_COUNT).rows():
+        rows.append(asyncpg_protocol._create_record(mapping, row))
+    return rows
+
+
+@pytest.fixture(scope="module")
+def dict_rows(records):
+    return [dict(record) for record in records]
+
+
+@pytest.fixture(scope="module")
+def json_rows(records):
+    return [record_to_json(record) for record in records]
+
+
+@pytest.mark.parametrize("ip", [
+    "127.0.0.1",        # localhost
+    "1.11.23.4",        # 목록 앞쪽 국내 대역
+    "61.96.10.20",      # 목록 끝쪽 국내 대역
+    "8.8.8.8",          # 해외 (전체 목록 확인)
+    "2001:db8::1",      # IPv6
+], ids=["localhost", "korean_first", "korean_last", "foreign", "ipv6"])
+def test_is_korean_ip_simple(bench, ip):
+    bench(is_korean_ip_simple, ip)
+
+
+@pytest.fixture(scope="module")
+def large_ip_filter():
+    """대역이 수만 개인 허용 목록 (조회 비용이 목록 크기와 무관한지 확인)"""
+    ip_filter = KoreanIPFilter(KOREAN_IP_RANGES_FILE)
+    ip_filter.table = IPRangeTable(
+        [f"{a}.{b}.{c}.0/24" for a in range(1, 224, 3) for b in range(0, 256, 37) for c in range(0, 256, 4)]
+        + [f"2001:{n:x}::/32" for n in range(0, 65536, 8)]
+    )
+    return ip_filter
+
+
+@pytest.mark.parametrize("ip", ["1.11.23.4", "8.8.8.8", "2001:db8::1"], ids=["ipv4_listed", "ipv4_unlisted", "ipv6"])
+def test_ip_filter_large_table(bench, large_ip_filter, ip):
+    bench(large_ip_filter.is_allowed, ip)
+
+
+def test_parse_template(bench):
+    template = queries["GET_JIBUN_ADDR_TEMPLATE"]
+    params = {"legalCode": "1165010100", "spCd": "0", "bon": "1022", "boo": "3"}
+    bench(parse_template, template, params)
+
+
+def test_load_queries(bench):
+    bench(load_queries, QUERIES_FILE)
+
+
+def test_log_query_results_json_rows(bench, json_rows):
+    bench(main.log_query_results, json_rows, "지번주소 목록 조회")
+
+
+def test_log_query_results_records(bench, records):
+    bench(main.log_query_results, records, "PNU 조회")
+
+
+def test_get_query_params(bench):
+    request = Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/data/bonboo/1165010100",
+        "query_string": "spCd=1&bon=1022&boo=3&limit=1000&cursor=WyIwMDAwMDAwMDEiLCIwMDAxIiwiMDAxMDEiLCIxMTY1MC0wMDAwMDAwMDEiLCIxMTY1MDEwMTAwMTAwMDEwMDAwIl0".encode(),
+        "headers": [],
+    })
+    bench(lambda: run_coroutine(main.get_query_params(request)))
+
+
+def test_records_to_dicts(bench, records):
+    bench(lambda: [dict(record) for record in records])
+
+
+def test_record_to_json(bench, records):
+    bench(lambda: [record_to_json(record) for record in records])
+
+
+def test_download_parse_body(bench, json_rows):
+    # download_middleware 가 원래 응답 본문을 다시 읽는 단계
+    body = ('{"data":[' + ",".join(json_rows) + '],"count":%d}' % len(json_rows)).encode("utf-8")
+    bench(lambda: json.loads(body.decode("utf-8")).get("data"))
+
+
+def test_download_build_csv(bench, dict_rows):
+    bench(build_csv, dict_rows)
+
+
+def test_download_build_xlsx(bench, dict_rows):
+    bench(build_xlsx, dict_rows)
@@ -0,0 +1,41 @@
+-- 벤치마크용 테이블 (운영 DB 가 아니라 로컬 벤치마크 DB 에서만 실행)
+-- generate_dataset.py 가 자동으로 실행하므로 직접 실행할 필요는 없습니다.
+--
+-- 실행: psql -h <host> -U <user> -d <db> -f benchmarks/schema.sql
+
+CREATE TABLE IF NOT EXISTS housing_prices (
+    법정동코드          TEXT NOT NULL,
+    도로명주소          TEXT NOT NULL,
+    시도                TEXT NOT NULL,
+    시군구              TEXT NOT NULL,
+    읍면                TEXT NOT NULL,
+    동리                TEXT NOT NULL,
+    특수지코드          TEXT NOT NULL,
+    본번                TEXT NOT NULL,
+    부번                TEXT NOT NULL,
+    특수지명            TEXT NOT NULL,
+    단지명              TEXT NOT NULL,
+    동명                TEXT NOT NULL,
+    호명                TEXT NOT NULL,
+    전용면적            NUMERIC(10, 2) NOT NULL,
+    공시가격            NUMERIC(15, 0) NOT NULL,
+    단지코드            TEXT NOT NULL,
+    동코드              TEXT NOT NULL,
+    호코드              TEXT NOT NULL,
+    건축물대장PK        TEXT NOT NULL,
+    "(구)건축물대장PK"  TEXT NOT NULL,
+    PNU                 TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ADDR_STEP (
+    시도코드    TEXT NOT NULL,
+    시도        TEXT NOT NULL,
+    시군구코드  TEXT NOT NULL,
+    시군구      TEXT NOT NULL,
+    읍면코드    TEXT NOT NULL,
+    읍면        TEXT NOT NULL,
+    동리코드    TEXT NOT NULL,
+    동리        TEXT NOT NULL
+);
+
+-- 인덱스는 적재 속도를 위해 generate_dataset.py 가 적재 후에 만듭니다.
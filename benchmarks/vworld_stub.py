@@ -0,0 +1,103 @@
+"""
+V-World 주소 검색 API 대역 서버
+
+generate_dataset.py 가 저장한 요청 샘플의 지번주소 → PNU 로 V-World 와 같은 형식의 응답을 돌려줍니다.
+외부 API 호출 없이 /data/jibunAddr 를 부하 테스트할 수 있고, 지연 시간과 오류 비율을 흉내 낼 수 있습니다.
+
+사용법:
+    python benchmarks/vworld_stub.py --port 8081 --latency-ms 30
+    VWORLD_BASE_URL=http://127.0.0.1:8081/req/search 로 API 서버를 실행
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+from collections import defaultdict
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SAMPLE = os.path.join(BENCH_DIR, "sample.json")
+
+
+def normalize(address: str) -> str:
+    return " ".join(address.split())
+
+
+def build_index(sample: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    지번주소 → V-World 검색 결과 항목 목록
+
+    전체 주소("시도 시군구 동 본번-부번")와 짧은 주소("동 본번-부번")로 모두 찾을 수 있으며,
+    짧은 주소는 실제 API 처럼 여러 건이 나올 수 있습니다.
+    """
+    index = defaultdict(list)
+    for complex_ in sample["complexes"]:
+        parcel = complex_["parcel"]
+        parts = parcel.split(" ")
+        item = {
+            "id": complex_["pnu"],
+            "address": {
+                "parcel": parcel,
+                "road": complex_["roadAddr"],
+                "sido": parts[0],
+                "sigungu": parts[1],
+                "zipcode": "",
+                "bldnm": "",
+            },
+            "point": {"x": "127.0", "y": "37.5"},
+        }
+        index[normalize(parcel)].append(item)
+        index[normalize(" ".join(parts[-2:]))].append(item)
+    return index
+
+
+class VWorldStub:
+    def __init__(self, index: Dict[str, List[Dict[str, Any]]], latency_ms: float, error_rate: float):
+        self.index = index
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.requests = 0
+
+    async def search(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            # 실제 API 처럼 지연 시간에 편차를 줌
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            return web.Response(status=503, text="stub error")
+
+        items = self.index.get(normalize(request.query.get("query", "")), [])
+        if not items:
+            body = {"response": {"status": "NOT_FOUND", "result": {"items": []}}}
+        else:
+            body = {"response": {"status": "OK", "result": {"items": items[:int(request.query.get("size", "100"))]}}}
+        return web.json_response(body, dumps=lambda value: json.dumps(value, ensure_ascii=False))
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "addresses": len(self.index)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="V-World 주소 검색 API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--sample", default=DEFAULT_SAMPLE, help="generate_dataset.py 가 저장한 요청 샘플")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="평균 응답 지연 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="503 으로 응답할 비율 (0~1)")
+    args = parser.parse_args()
+
+    with open(args.sample, encoding="utf-8") as f:
+        stub = VWorldStub(build_index(json.load(f)), args.latency_ms, args.error_rate)
+
+    app = web.Application()
+    app.router.add_get("/req/search", stub.search)
+    app.router.add_get("/stats", stub.stats)
+    print(f"V-World 대역 서버: http://{args.host}:{args.port}/req/search (주소 {len(stub.index):,}건)")
+    web.run_app(app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
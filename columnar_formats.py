@@ -0,0 +1,206 @@
+import asyncio
+import datetime
+import io
+import logging
+import os
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+# 선택 의존성 (설치되지 않은 형식을 요청하면 406 응답)
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+# 고유 값 비율이 이 값 이하인 문자열 컬럼은 사전(dictionary) 인코딩 (시도/시군구/단지명 등)
+COLUMNAR_DICT_RATIO = float(os.getenv("COLUMNAR_DICT_RATIO", "0.5"))
+# Parquet 압축 방식 (snappy, zstd, gzip, none)
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+# Arrow IPC 버퍼 압축 (none, lz4, zstd / 압축을 지원하지 않는 클라이언트가 있으면 none)
+ARROW_COMPRESSION = os.getenv("ARROW_COMPRESSION", "none")
+
+ARROW = "arrow"
+PARQUET = "parquet"
+MSGPACK = "msgpack"
+
+MEDIA_TYPES = {
+    ARROW: "application/vnd.apache.arrow.stream",
+    PARQUET: "application/vnd.apache.parquet",
+    MSGPACK: "application/msgpack",
+}
+
+# ?format= 값과 Accept 헤더 미디어 타입 → 형식
+FORMAT_ALIASES = {
+    "arrow": ARROW,
+    "arrows": ARROW,
+    "parquet": PARQUET,
+    "msgpack": MSGPACK,
+}
+ACCEPT_TYPES = {
+    "application/vnd.apache.arrow.stream": ARROW,
+    "application/vnd.apache.parquet": PARQUET,
+    "application/x-parquet": PARQUET,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+def negotiate_format(request: Request) -> Optional[str]:
+    """
+    ?format= 값 또는 Accept 헤더로 컬럼 형식 응답 여부를 결정합니다.
+
+    Returns:
+        "arrow", "parquet", "msgpack" 중 하나 (JSON 응답이면 None)
+    """
+    file_format = request.query_params.get("format")
+    if file_format:
+        fmt = FORMAT_ALIASES.get(file_format.lower())
+        if fmt is not None:
+            _check_available(fmt)
+        return fmt
+
+    accept = request.headers.get("accept")
+    if not accept:
+        return None
+
+    best, best_q = None, 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        fmt = ACCEPT_TYPES.get(media_type.strip().lower())
+        if fmt is None or not _available(fmt):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+def _to_columns(column_count: int, rows: Sequence[Sequence[Any]]) -> List[List[Any]]:
+    """행 목록을 컬럼별 값 목록으로 바꿉니다."""
+    if not rows:
+        return [[] for _ in range(column_count)]
+    return [list(values) for values in zip(*rows)]
+
+
+def _should_dictionary_encode(values: List[Any]) -> bool:
+    if len(values) < 2 or not isinstance(next((v for v in values if v is not None), None), str):
+        return False
+    return len(set(values)) <= len(values) * COLUMNAR_DICT_RATIO
+
+
+def _arrow_table(column_names: Sequence[str], columns: List[List[Any]]):
+    arrays = []
+    for values in columns:
+        array = pa.array(values)
+        if _should_dictionary_encode(values):
+            array = array.dictionary_encode()
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=list(column_names))
+
+
+def build_arrow(column_names: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """Arrow IPC 스트림 형식으로 변환합니다. (블로킹, 스레드에서 호출)"""
+    table = _arrow_table(column_names, _to_columns(len(column_names), rows))
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression=None if ARROW_COMPRESSION == "none" else ARROW_COMPRESSION)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def build_parquet(column_names: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """Parquet 형식으로 변환합니다. (블로킹, 스레드에서 호출)"""
+    table = _arrow_table(column_names, _to_columns(len(column_names), rows))
+    output = io.BytesIO()
+    compression = None if PARQUET_COMPRESSION == "none" else PARQUET_COMPRESSION
+    pq.write_table(table, output, compression=compression)
+    return output.getvalue()
+
+
+def _msgpack_default(value: Any) -> Any:
+    # JSON 응답과 같은 값이 되도록 변환 (Decimal → int/float, 날짜 → ISO 문자열)
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"MessagePack 으로 변환할 수 없는 값: {type(value)}")
+
+
+def build_msgpack(column_names: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """
+    컬럼 단위 MessagePack 으로 변환합니다. (블로킹, 스레드에서 호출)
+
+    {"columns": [컬럼명...], "count": 행 수, "data": {컬럼명: 값 목록}}
+    반복이 많은 문자열 컬럼은 값 목록 대신 {"dictionary": [고유 값...], "codes": [번호...]} 로 보냅니다.
+    """
+    data: Dict[str, Any] = {}
+    for name, values in zip(column_names, _to_columns(len(column_names), rows)):
+        if _should_dictionary_encode(values):
+            dictionary: Dict[Any, int] = {}
+            codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+            data[name] = {"dictionary": list(dictionary), "codes": codes}
+        else:
+            data[name] = values
+    return msgpack.packb(
+        {"columns": list(column_names), "count": len(rows), "data": data},
+        default=_msgpack_default,
+        use_bin_type=True,
+    )
+
+
+BUILDERS = {ARROW: build_arrow, PARQUET: build_parquet, MSGPACK: build_msgpack}
+
+
+def _available(fmt: str) -> bool:
+    return (pa is not None) if fmt in (ARROW, PARQUET) else (msgpack is not None)
+
+
+def _check_available(fmt: str) -> None:
+    if fmt in (ARROW, PARQUET) and pa is None:
+        raise HTTPException(status_code=406, detail="서버에 pyarrow 가 설치되어 있지 않아 Arrow/Parquet 형식을 제공할 수 없습니다.")
+    if fmt == MSGPACK and msgpack is None:
+        raise HTTPException(status_code=406, detail="서버에 msgpack 이 설치되어 있지 않아 MessagePack 형식을 제공할 수 없습니다.")
+
+
+async def columnar_response(fmt: str, column_names: Sequence[str], rows: Sequence[Sequence[Any]]) -> Response:
+    """
+    조회 결과를 요청한 컬럼 형식으로 변환하여 응답합니다.
+
+    Args:
+        fmt: negotiate_format() 결과
+        column_names: 컬럼명 목록 (결과가 없어도 스키마를 만들 수 있도록 별도로 전달)
+        rows: asyncpg Record 또는 튜플 목록
+    """
+    content = await asyncio.get_running_loop().run_in_executor(None, BUILDERS[fmt], column_names, rows)
+    return Response(
+        content=content,
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Vary": "Accept"},
+    )
+
+
+def records_to_rows(records: Sequence[Dict[str, Any]]):
+    """dict 목록(주소 캐시 등)을 (컬럼명 목록, 행 목록)으로 바꿉니다."""
+    column_names = list(dict.fromkeys(key for record in records for key in record))
+    return column_names, [tuple(record.get(name) for name in column_names) for record in records]
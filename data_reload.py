@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Set
+
+import asyncpg
+
+from addr_cache import address_cache
+from dataset_version import dataset_version
+from result_cache import result_cache
+from road_addr_index import road_addr_search
+
+logger = logging.getLogger(__name__)
+
+# 적재 알림 채널 (sql/data_reload_notify.sql 과 같아야 함, 비우면 LISTEN 하지 않음)
+DATA_RELOAD_CHANNEL = os.getenv("DATA_RELOAD_CHANNEL", "facc_data_reload")
+# 알림을 받은 뒤 다시 만들기 전 기다리는 시간(초, 적재 중 연달아 오는 알림을 한 번에 처리)
+DATA_RELOAD_DEBOUNCE_SECONDS = float(os.getenv("DATA_RELOAD_DEBOUNCE_SECONDS", "2"))
+# 리스너 커넥션 확인 간격, 끊긴 뒤 다시 연결하기 전 대기 시간(초)
+DATA_RELOAD_KEEPALIVE_SECONDS = float(os.getenv("DATA_RELOAD_KEEPALIVE_SECONDS", "30"))
+DATA_RELOAD_RETRY_SECONDS = float(os.getenv("DATA_RELOAD_RETRY_SECONDS", "5"))
+
+# 알림 내용(테이블 이름)별로 다시 만들 파생 구조 ("*" 또는 모르는 내용이면 모두)
+ADDR_STEP_TABLE = "addr_step"
+HOUSING_TABLE = "housing_prices"
+ALL_TABLES = "*"
+
+
+class DataReloadListener:
+    """
+    데이터 적재 알림(LISTEN/NOTIFY)을 받아 파생 구조를 다시 만드는 리스너
+
+    커넥션 풀과 별도로 주 서버에 전용 커넥션을 열어 두고 (복제 서버에서는 LISTEN 불가),
+    알림이 오면 잠시 모았다가 백그라운드에서 다시 만듭니다.
+    주소 캐시는 새 스냅샷을 만든 뒤 교체하고, 도로명주소 인덱스는 추가/삭제분만 반영하므로
+    그동안에도 기존 데이터로 응답합니다.
+    데이터셋 버전은 마지막에 올려서, ETag 와 조회 결과 캐시가 파생 구조가 준비된 뒤에 새 버전으로 넘어가게 합니다.
+    연결이 끊기면 다시 연결하고, 그 사이 놓친 알림이 있을 수 있으므로 모두 다시 만듭니다.
+    """
+
+    def __init__(self, channel: str, debounce: float):
+        self.channel = channel
+        self.debounce = debounce
+        self.connected = False
+        self.notifications = 0
+        self.last_payload: Optional[str] = None
+        self.last_notified_at: Optional[float] = None
+        self.rebuilds = 0
+        self.last_rebuild_at: Optional[float] = None
+        self.last_rebuild: Optional[Dict[str, Any]] = None
+        self.last_error: Optional[str] = None
+        self._pending: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def request(self, table: str = ALL_TABLES) -> None:
+        """다시 만들 테이블을 예약합니다. (관리자 API, 재연결 시에도 사용)"""
+        self._pending.add(table or ALL_TABLES)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        self.notifications += 1
+        self.last_payload = payload
+        self.last_notified_at = time.time()
+        logger.info(f"데이터 적재 알림 수신: {channel} {payload!r}")
+        self.request(payload.strip().lower() if payload else ALL_TABLES)
+
+    async def run(self, pool, dsn: str) -> None:
+        """리스너 커넥션과 재구성 루프를 실행합니다. (lifespan 에서 태스크로 실행)"""
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        await asyncio.gather(self._listen(dsn), self._rebuild_loop(pool))
+
+    async def _listen(self, dsn: str) -> None:
+        missed = False
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn, server_settings={"application_name": "facc-api-server-listener"})
+                lost = asyncio.Event()
+                conn.add_termination_listener(lambda _: lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                self.connected = True
+                self.last_error = None
+                logger.info(f"데이터 적재 알림 LISTEN 시작: {self.channel}")
+                if missed:
+                    self.request(ALL_TABLES)
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), DATA_RELOAD_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        # 조용히 끊긴 TCP 연결을 알아차리도록 주기적으로 확인
+                        await conn.execute("SELECT 1", timeout=DATA_RELOAD_KEEPALIVE_SECONDS)
+                raise ConnectionError("리스너 커넥션이 끊겼습니다.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                logger.error(f"데이터 적재 알림 리스너 오류, {DATA_RELOAD_RETRY_SECONDS:g}초 후 다시 연결: {self.last_error}")
+            finally:
+                self.connected = False
+                if conn is not None:
+                    conn.terminate()
+            missed = True
+            await asyncio.sleep(DATA_RELOAD_RETRY_SECONDS)
+
+    async def _rebuild_loop(self, pool) -> None:
+        while True:
+            await self._wakeup.wait()
+            # 적재 중에는 문장마다 알림이 오므로 잠시 모아서 한 번에 처리
+            await asyncio.sleep(self.debounce)
+            self._wakeup.clear()
+            tables, self._pending = self._pending, set()
+            try:
+                await self.rebuild(pool, tables)
+            except Exception as e:
+                self.last_error = str(e) or type(e).__name__
+                logger.error(f"적재 알림 후 파생 구조 재구성 중 오류 발생: {self.last_error}")
+
+    async def rebuild(self, pool, tables: Set[str]) -> Dict[str, Any]:
+        """
+        알림받은 테이블에서 만든 파생 구조를 다시 만들고 데이터셋 버전을 올립니다.
+
+        복제 지연으로 이전 데이터를 읽지 않도록 주 서버 풀에서 읽습니다. (주 서버 풀이 없으면 분산 풀)
+        """
+        start_time = time.time()
+        source = getattr(getattr(pool, "primary", None), "pool", None) or pool
+        everything = ALL_TABLES in tables or not tables <= {ADDR_STEP_TABLE, HOUSING_TABLE}
+        result: Dict[str, Any] = {"tables": sorted(tables)}
+
+        if everything or ADDR_STEP_TABLE in tables:
+            snapshot = await address_cache.refresh(source)
+            result["address_cache_rows"] = snapshot.row_count
+        if everything or HOUSING_TABLE in tables:
+            result["road_addr_index"] = await road_addr_search.refresh(source)
+
+        previous = dataset_version.version
+        result["version"] = await dataset_version.refresh(source)
+        if result["version"] == previous:
+            # 고정 버전(DATASET_VERSION)이거나 변경 건수 통계가 아직 반영되지 않은 경우
+            # ETag 는 그대로지만 조회 결과 캐시는 비워서 새 데이터로 응답
+            result_cache.clear()
+            logger.warning("적재 알림 후에도 데이터셋 버전이 같아 조회 결과 캐시만 비웠습니다. (dataset_version 테이블 갱신 권장)")
+
+        self.rebuilds += 1
+        self.last_rebuild_at = time.time()
+        result["elapsed"] = self.last_rebuild_at - start_time
+        self.last_rebuild = result
+        logger.info(f"적재 알림 후 파생 구조 재구성 완료: {result}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.channel,
+            "connected": self.connected,
+            "notifications": self.notifications,
+            "last_payload": self.last_payload,
+            "last_notified_at": self.last_notified_at,
+            "pending": sorted(self._pending),
+            "rebuilds": self.rebuilds,
+            "last_rebuild_at": self.last_rebuild_at,
+            "last_rebuild": self.last_rebuild,
+            "last_error": self.last_error,
+        }
+
+
+data_reload = DataReloadListener(DATA_RELOAD_CHANNEL, DATA_RELOAD_DEBOUNCE_SECONDS)
@@ -1,60 +1,44 @@
+import asyncio
 import asyncpg
 import logging
 import os
 import urllib.parse
-from dotenv import load_dotenv, find_dotenv
 import time
+from typing import Any, Dict, List, Optional
+import env_loader  # noqa: F401  (.env 를 다른 모듈의 설정보다 먼저 읽음)
+from statement_registry import statements
+import log_config
+import metrics
+from workload import current_workload
 
 # 로거 설정 (먼저 설정해야 로깅이 가능)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # 로깅 레벨을 DEBUG로 설정
 
-# .env 파일 경로 찾기 및 로깅
-def load_env_file(path=None):
-    """지정된 경로 또는 기본 경로에서 .env 파일을 로드하고 경로를 로깅합니다."""
-    if path and os.path.exists(path):
-        dotenv_path = os.path.abspath(path)
-        load_dotenv(dotenv_path)
-        logger.info(f".env 파일 로드됨: {dotenv_path}")
-        return True
-    return False
-
-# 현재 디렉토리 .env 파일 로드 시도
-default_env = find_dotenv()
-if default_env:
-    logger.info(f"기본 .env 파일 발견: {os.path.abspath(default_env)}")
-    load_dotenv(default_env)
-else:
-    logger.warning("기본 .env 파일을 찾을 수 없습니다.")
-
-# 추가 경로에서 .env 파일 로드 시도
-additional_paths = [
-    '../.env',
-    'dist/.env',
-    './.env',
-    os.path.join(os.getcwd(), '.env')
-]
-
-for path in additional_paths:
-    if load_env_file(path):
-        logger.info(f"추가 .env 파일 로드됨: {path}")
-
 # 환경 변수 로깅
 logger.info(f"현재 작업 디렉토리: {os.getcwd()}")
 logger.info(f"환경 변수 확인: DATABASE_USER={os.getenv('DATABASE_USER')}, DATABASE_HOST={os.getenv('DATABASE_HOST')}")
 
 # 쿼리 로깅 클래스
 class LoggingConnection(asyncpg.Connection):
+    # 이름별로 준비된 쿼리 (커넥션 풀 init 에서 statement_registry 가 채움)
+    prepared_statements = None
+    # 준비할 때 사용한 쿼리 목록 세대 (statement_registry.generation 과 다르면 다시 준비)
+    catalog_generation = 0
+    
     async def execute(self, query, *args, **kwargs):
         start_time = time.time()
-        # 쿼리가 너무 길면 잘릴 수 있으므로 로깅 방식 개선
-        logger.info(f"실행 쿼리 (길이: {len(query)}): {query}")
-        logger.info(f"쿼리 파라미터: {args}")
+        # 쿼리가 너무 길면 잘라서 기록 (샘플링된 요청만)
+        sampled = log_config.request_sampled()
+        if sampled:
+            logger.info(f"실행 쿼리 (길이: {len(query)}): {log_config.clip_query(query)}")
+            logger.info(f"쿼리 파라미터: {log_config.clip_params(args)}")
         
         try:
             result = await super().execute(query, *args, **kwargs)
             execution_time = time.time() - start_time
-            logger.info(f"쿼리 실행 시간: {execution_time:.4f}초")
+            if sampled:
+                logger.info(f"쿼리 실행 시간: {execution_time:.4f}초")
             return result
         except Exception as e:
             execution_time = time.time() - start_time
@@ -63,19 +47,248 @@ class LoggingConnection(asyncpg.Connection):
 
     async def fetch(self, query, *args, **kwargs):
         start_time = time.time()
-        logger.info(f"실행 쿼리: {query}")
-        logger.info(f"쿼리 파라미터: {args}")
+        sampled = log_config.request_sampled()
+        if sampled:
+            logger.info(f"실행 쿼리: {log_config.clip_query(query)}")
+            logger.info(f"쿼리 파라미터: {log_config.clip_params(args)}")
         
         try:
             result = await super().fetch(query, *args, **kwargs)
             execution_time = time.time() - start_time
-            logger.info(f"쿼리 결과 행 수: {len(result)}, 실행 시간: {execution_time:.4f}초")
+            if sampled:
+                logger.info(f"쿼리 결과 행 수: {len(result)}, 실행 시간: {execution_time:.4f}초")
             return result
         except Exception as e:
             execution_time = time.time() - start_time
             logger.error(f"쿼리 실행 오류: {str(e)}, 실행 시간: {execution_time:.4f}초")
             raise
 
+class PoolNode:
+    """
+    읽기 노드 하나 (주 서버 또는 복제 서버)
+
+    노드별 커넥션 풀과 라우팅/상태 확인에 쓰는 값을 가집니다.
+    """
+
+    def __init__(self, name: str, role: str, dsn: str):
+        self.name = name
+        self.role = role
+        self.dsn = dsn
+        self.pool = None
+        # 커넥션을 기다리거나 사용 중인 요청 수 (최소 미처리 요청 분산 기준)
+        self.outstanding = 0
+        self.acquired = 0
+        self.healthy = False
+        # 연속 상태 확인 실패 횟수
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        # 복제 지연 (초, 주 서버이거나 알 수 없으면 None)
+        self.lag_seconds: Optional[float] = None
+
+    def mark_down(self, error: BaseException) -> None:
+        if self.healthy:
+            logger.warning(f"데이터베이스 노드 제외: {self.name} ({mask_dsn(self.dsn)}) - {error}")
+        self.healthy = False
+        self.last_error = str(error) or type(error).__name__
+
+    def mark_up(self) -> None:
+        if not self.healthy:
+            logger.info(f"데이터베이스 노드 복귀: {self.name} ({mask_dsn(self.dsn)})")
+        self.healthy = True
+        self.failures = 0
+        self.last_error = None
+
+    def stats(self) -> Dict[str, Any]:
+        pool = self.pool
+        return {
+            "name": self.name,
+            "role": self.role,
+            "dsn": mask_dsn(self.dsn),
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "acquired": self.acquired,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "checked_at": self.checked_at,
+            "lag_seconds": self.lag_seconds,
+            "pool": None if pool is None else {
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size(),
+            },
+        }
+
+
+# 노드가 내려갔다고 볼 커넥션 오류
+# (TimeoutError 도 OSError 이지만 풀이 가득 차서 기다린 것이므로 따로 처리)
+NODE_ERRORS = (OSError, asyncpg.exceptions.PostgresConnectionError, asyncpg.exceptions.CannotConnectNowError)
+
+
+class _RoutedAcquire:
+    """노드를 골라 커넥션을 얻고, 기다린 시간을 기록하는 pool.acquire() 컨텍스트"""
+
+    __slots__ = ("router", "timeout", "node", "conn")
+
+    def __init__(self, router, timeout):
+        self.router = router
+        self.timeout = timeout
+        self.node = None
+        self.conn = None
+
+    async def _acquire(self):
+        start_time = time.perf_counter()
+        tried = []
+        while True:
+            node = self.router.pick(exclude=tried)
+            node.outstanding += 1
+            try:
+                conn = await node.pool.acquire(timeout=self.timeout)
+            except asyncio.TimeoutError:
+                node.outstanding -= 1
+                raise
+            except NODE_ERRORS as e:
+                node.outstanding -= 1
+                node.mark_down(e)
+                tried.append(node)
+                if not self.router.has_candidate(exclude=tried):
+                    raise
+                continue
+            except BaseException:
+                node.outstanding -= 1
+                raise
+            node.acquired += 1
+            metrics.db_pool_acquire_wait_seconds.observe(time.perf_counter() - start_time, (current_workload.get(),))
+            self.node = node
+            return conn
+
+    async def __aenter__(self):
+        self.conn = await self._acquire()
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        conn, self.conn = self.conn, None
+        await self.router.release_to(self.node, conn)
+
+    def __await__(self):
+        return self._await().__await__()
+
+    async def _await(self):
+        # await pool.acquire() 형태는 pool.release(conn) 로 돌려줄 때 노드를 찾을 수 있도록 기록
+        conn = await self._acquire()
+        self.router.leased[id(conn)] = self.node
+        return conn
+
+
+class RoutedPool:
+    """
+    주 서버와 복제 서버 커넥션 풀 묶음
+
+    모든 조회는 읽기 전용이므로, 정상 노드 중 미처리 요청이 가장 적은 노드에서 커넥션을 얻습니다.
+    (같으면 차례로 돌아가며 선택)
+    상태 확인에 실패한 노드는 분산 대상에서 빠졌다가 다시 응답하면 돌아오고,
+    정상 노드가 하나도 없으면 풀이 있는 아무 노드에서나 시도합니다.
+    acquire() 외의 속성은 주 서버 풀로 넘깁니다.
+    """
+
+    def __init__(self, nodes: List[PoolNode], primary_reads: bool = True):
+        self.nodes = nodes
+        self.primary = nodes[0]
+        self.primary_reads = primary_reads
+        self.leased: Dict[int, PoolNode] = {}
+        self._next = 0
+
+    def _candidates(self, exclude) -> List[PoolNode]:
+        nodes = [node for node in self.nodes if node.pool is not None and node not in exclude]
+        healthy = [node for node in nodes if node.healthy]
+        if not self.primary_reads:
+            replicas = [node for node in healthy if node is not self.primary]
+            if replicas:
+                return replicas
+        return healthy or nodes
+
+    def has_candidate(self, exclude=()) -> bool:
+        return bool(self._candidates(exclude))
+
+    def pick(self, exclude=()) -> PoolNode:
+        candidates = self._candidates(exclude)
+        if not candidates:
+            raise ConnectionError("사용 가능한 데이터베이스 노드가 없습니다.")
+        if len(candidates) == 1:
+            return candidates[0]
+        self._next = (self._next + 1) % len(candidates)
+        rotated = candidates[self._next:] + candidates[:self._next]
+        return min(rotated, key=lambda node: node.outstanding)
+
+    def acquire(self, *, timeout=None):
+        return _RoutedAcquire(self, timeout)
+
+    async def release_to(self, node: PoolNode, conn) -> None:
+        node.outstanding -= 1
+        await node.pool.release(conn)
+
+    async def release(self, conn) -> None:
+        node = self.leased.pop(id(conn), self.primary)
+        await self.release_to(node, conn)
+
+    def get_size(self) -> int:
+        return sum(node.pool.get_size() for node in self.nodes if node.pool is not None)
+
+    def get_idle_size(self) -> int:
+        return sum(node.pool.get_idle_size() for node in self.nodes if node.pool is not None)
+
+    async def close(self) -> None:
+        await asyncio.gather(*(node.pool.close() for node in self.nodes if node.pool is not None))
+
+    def __getattr__(self, name):
+        pool = self.primary.pool or next(node.pool for node in self.nodes if node.pool is not None)
+        return getattr(pool, name)
+
+    async def check_node(self, node: PoolNode) -> None:
+        """
+        노드 하나의 상태를 확인합니다.
+
+        풀과 별도의 커넥션으로 확인하므로 풀이 바쁜 것과 노드가 내려간 것을 구분할 수 있습니다.
+        시작할 때 연결하지 못한 노드는 응답하면 이때 풀을 만듭니다.
+        """
+        node.checked_at = time.time()
+        try:
+            conn = await asyncpg.connect(node.dsn, timeout=DATABASE_HEALTH_CHECK_TIMEOUT)
+            try:
+                row = await conn.fetchrow(HEALTH_CHECK_QUERY, timeout=DATABASE_HEALTH_CHECK_TIMEOUT)
+            finally:
+                await conn.close(timeout=DATABASE_HEALTH_CHECK_TIMEOUT)
+            node.lag_seconds = float(row["lag"]) if row["lag"] is not None else None
+            if DATABASE_REPLICA_MAX_LAG_SECONDS > 0 and (node.lag_seconds or 0) > DATABASE_REPLICA_MAX_LAG_SECONDS:
+                raise RuntimeError(f"복제 지연 {node.lag_seconds:.1f}초 (허용 {DATABASE_REPLICA_MAX_LAG_SECONDS:g}초)")
+            if node.pool is None:
+                node.pool = await create_node_pool(node.dsn)
+            elif not node.healthy:
+                # 노드가 재시작되었다면 풀에 남은 커넥션은 끊겨 있으므로 새로 연결하게 함
+                await node.pool.expire_connections()
+            node.mark_up()
+        except Exception as e:
+            node.failures += 1
+            if node.failures >= DATABASE_HEALTH_CHECK_FAILURES or node.pool is None:
+                node.mark_down(e)
+            else:
+                node.last_error = str(e) or type(e).__name__
+
+    async def run_health_checks(self, interval: float) -> None:
+        """interval 초마다 모든 노드의 상태를 동시에 확인합니다."""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.gather(*(self.check_node(node) for node in self.nodes))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "primary_reads": self.primary_reads,
+            "healthy": sum(1 for node in self.nodes if node.healthy),
+            "nodes": [node.stats() for node in self.nodes],
+        }
+
+
 # 환경 변수 로드
 db_user = os.getenv("DATABASE_USER")
 db_passwd = os.getenv("DATABASE_PASSWD")
@@ -95,23 +308,89 @@ db_url = f"postgresql://{db_user}:{passwd_quoted}@{db_host}:{db_port}/{db_dbnm}"
 masked_url = db_url.replace(passwd_quoted, "********") if passwd_quoted else db_url
 logger.info(f"데이터베이스 URL: {masked_url}")
 
+# 복제 서버 (쉼표로 구분한 DSN 목록, "host:port" 만 적으면 주 서버의 사용자/비밀번호/DB 를 사용)
+DATABASE_REPLICA_DSNS = [dsn.strip() for dsn in os.getenv("DATABASE_REPLICA_DSNS", "").split(",") if dsn.strip()]
+# 주 서버도 읽기 분산 대상에 포함할지 (false 면 정상 복제 서버가 없을 때만 사용)
+DATABASE_PRIMARY_READS = os.getenv("DATABASE_PRIMARY_READS", "true").lower() in ("1", "true", "yes")
+# 노드별 커넥션 풀 크기
+DATABASE_POOL_MIN_SIZE = int(os.getenv("DATABASE_POOL_MIN_SIZE", "5"))
+DATABASE_POOL_MAX_SIZE = int(os.getenv("DATABASE_POOL_MAX_SIZE", "20"))
+# 상태 확인 간격(초, 0이면 확인하지 않음), 연결/쿼리 제한 시간(초), 분산 대상에서 뺄 연속 실패 횟수
+DATABASE_HEALTH_CHECK_SECONDS = float(os.getenv("DATABASE_HEALTH_CHECK_SECONDS", "5"))
+DATABASE_HEALTH_CHECK_TIMEOUT = float(os.getenv("DATABASE_HEALTH_CHECK_TIMEOUT", "2"))
+DATABASE_HEALTH_CHECK_FAILURES = int(os.getenv("DATABASE_HEALTH_CHECK_FAILURES", "2"))
+# 허용 복제 지연(초, 0이면 확인하지 않음)
+# 주 서버에 쓰기가 없으면 마지막 반영 시각이 계속 과거로 남으므로, 쓰기가 드문 환경에서는 0으로 둡니다.
+DATABASE_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DATABASE_REPLICA_MAX_LAG_SECONDS", "0"))
+
+HEALTH_CHECK_QUERY = """
+SELECT CASE WHEN pg_is_in_recovery()
+            THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+       END AS lag
+"""
+
+
+def mask_dsn(dsn: str) -> str:
+    """DSN 의 비밀번호를 가립니다."""
+    parsed = urllib.parse.urlsplit(dsn)
+    if not parsed.password:
+        return dsn
+    netloc = parsed.netloc.replace(f":{parsed.password}@", ":********@", 1)
+    return urllib.parse.urlunsplit(parsed._replace(netloc=netloc))
+
+
+def replica_dsn(entry: str) -> str:
+    """DATABASE_REPLICA_DSNS 항목을 DSN 으로 바꿉니다. ("host:port" 는 주 서버 접속 정보를 사용)"""
+    if "://" in entry:
+        return entry
+    host, _, port = entry.partition(":")
+    return f"postgresql://{db_user}:{passwd_quoted}@{host}:{port or db_port}/{db_dbnm}"
+
+
+async def create_node_pool(dsn: str):
+    # 로깅 연결 클래스 사용
+    return await asyncpg.create_pool(
+        dsn,
+        min_size=DATABASE_POOL_MIN_SIZE,
+        max_size=DATABASE_POOL_MAX_SIZE,
+        command_timeout=60.0,
+        server_settings={
+            'application_name': 'facc-api-server'  # 서버 로그에서 식별하기 쉽게
+        },
+        connection_class=LoggingConnection,
+        init=statements.init_connection  # 새 커넥션마다 queries.sql 의 쿼리를 미리 준비
+    )
+
+
 async def connect_db():
-    try:
-        # 로깅 연결 클래스 사용
-        conn = await asyncpg.create_pool(
-            db_url,
-            min_size=5,
-            max_size=20,
-            command_timeout=60.0,
-            server_settings={
-                'application_name': 'facc-api-server'  # 서버 로그에서 식별하기 쉽게
-            },
-            connection_class=LoggingConnection
-        )
-        logger.info(f"데이터베이스 연결 성공: {db_host}:{db_port}")
-        return conn
-    except Exception as e:
-        logger.error(f"데이터베이스 연결 오류: {str(e)}")
+    """
+    주 서버와 복제 서버의 커넥션 풀을 동시에 만듭니다.
+
+    일부 노드에 연결하지 못해도 하나라도 연결되면 시작하고, 나머지는 상태 확인에서 다시 시도합니다.
+
+    Returns:
+        RoutedPool: 노드별 풀 묶음
+    """
+    nodes = [PoolNode("primary", "primary", db_url)]
+    nodes += [PoolNode(f"replica{i}", "replica", replica_dsn(entry)) for i, entry in enumerate(DATABASE_REPLICA_DSNS, 1)]
+
+    results = await asyncio.gather(*(create_node_pool(node.dsn) for node in nodes), return_exceptions=True)
+    for node, result in zip(nodes, results):
+        node.checked_at = time.time()
+        if isinstance(result, BaseException):
+            node.failures = 1
+            node.last_error = str(result) or type(result).__name__
+            logger.error(f"데이터베이스 연결 오류: {node.name} ({mask_dsn(node.dsn)}) - {node.last_error}")
+            continue
+        node.pool = result
+        node.healthy = True
+        logger.info(f"데이터베이스 연결 성공: {node.name} ({mask_dsn(node.dsn)})")
+
+    if not any(node.pool is not None for node in nodes):
         # 연결 실패 시 환경 변수 정보 로깅 (비밀번호 제외)
         logger.error(f"환경 변수: DATABASE_USER={db_user}, DATABASE_HOST={db_host}, DATABASE_PORT={db_port}, DATABASE_DB={db_dbnm}")
-        raise
\ No newline at end of file
+        raise next(result for result in results if isinstance(result, BaseException))
+
+    pool = RoutedPool(nodes, primary_reads=DATABASE_PRIMARY_READS)
+    metrics.watch_pool(pool)
+    return pool
@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import asyncpg
+
+logger = logging.getLogger(__name__)
+
+# 고정 데이터셋 버전 (설정하면 DB 를 조회하지 않음)
+DATASET_VERSION = os.getenv("DATASET_VERSION", "")
+
+# 공시가격 적재 시 갱신하는 버전 테이블 (sql/dataset_version.sql)
+# 테이블이 없는 DB 에서도 커넥션 init 의 쿼리 준비가 실패하지 않도록 queries.sql 대신 여기서 실행합니다.
+VERSION_TABLE_QUERY = "SELECT version FROM dataset_version ORDER BY updated_at DESC LIMIT 1"
+# 버전 테이블이 없을 때 사용하는 카탈로그 표시: 원본 테이블의 파일 번호(TRUNCATE 후 다시 적재하면 바뀜)와
+# 주 서버의 누적 추가/수정/삭제 건수. 테이블을 읽지 않으므로 행 수와 관계없이 가볍습니다.
+CATALOG_MARKER_QUERY = """
+SELECT string_agg(
+    relname || ':' || pg_relation_filenode(relid) || ':' || n_tup_ins || ':' || n_tup_upd || ':' || n_tup_del,
+    ',' ORDER BY relname
+)
+FROM pg_stat_user_tables
+WHERE relname IN ('housing_prices', 'addr_step')
+"""
+
+
+class DatasetVersion:
+    """
+    조회 데이터(housing_prices, ADDR_STEP)의 버전
+
+    공시가격 적재 때만 데이터가 바뀌므로, 버전이 같으면 같은 요청의 응답도 같습니다.
+    ETag 는 이 버전과 요청(경로, 쿼리 문자열, 응답 형식)으로 만듭니다.
+    """
+
+    def __init__(self):
+        self.version: Optional[str] = DATASET_VERSION or None
+        self.source = "env" if DATASET_VERSION else None
+        self.loaded_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+
+    async def refresh(self, pool) -> Optional[str]:
+        """
+        DB 에서 현재 데이터셋 버전을 읽습니다. (버전 테이블 → 카탈로그 표시 순)
+
+        시작 시, 적재 알림 후(data_reload), POST /admin/dataset-version/refresh 에서만 호출합니다.
+        복제 서버마다 적재 반영 시점이 다르므로 항상 주 서버 풀에서 읽습니다. (주 서버 풀이 없으면 받은 풀)
+        """
+        if DATASET_VERSION:
+            return self.version
+
+        source_pool = getattr(getattr(pool, "primary", None), "pool", None) or pool
+        async with self._refresh_lock:
+            async with source_pool.acquire() as conn:
+                try:
+                    version = await conn.fetchval(VERSION_TABLE_QUERY)
+                    source = "table"
+                except asyncpg.UndefinedTableError:
+                    version = None
+                if version is None:
+                    version = await conn.fetchval(CATALOG_MARKER_QUERY)
+                    source = "catalog"
+
+            if version != self.version:
+                logger.info(f"데이터셋 버전 변경: {self.version} → {version} ({source})")
+            self.version = version
+            self.source = source
+            self.loaded_at = time.time()
+            return version
+
+    def etag(self, method: str, path: str, query: str, accept: str) -> Optional[str]:
+        """
+        버전과 요청으로 약한 ETag 를 만듭니다. (버전을 모르면 None)
+
+        응답 본문에 요청마다 다른 query_time/execution_time 이 들어가므로 바이트 단위로 같다는 강한 ETag 가 아니라
+        같은 데이터라는 뜻의 약한(W/) ETag 를 사용합니다.
+        """
+        if self.version is None:
+            return None
+        digest = hashlib.sha1(f"{self.version}\n{method}\n{path}\n{query}\n{accept}".encode("utf-8")).hexdigest()
+        return f'W/"{digest}"'
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self.version, "source": self.source, "loaded_at": self.loaded_at}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 헤더에 etag 가 포함되는지 확인합니다. (약한 비교)"""
+    if if_none_match.strip() == "*":
+        return True
+    etag = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+dataset_version = DatasetVersion()
@@ -0,0 +1,67 @@
+import asyncio
+import functools
+import logging
+from typing import Any, Awaitable, TypeVar
+
+from fastapi import Request
+
+import metrics
+from workload import current_workload
+
+logger = logging.getLogger(__name__)
+
+# 클라이언트가 응답을 받기 전에 연결을 끊은 요청의 상태 코드 (nginx 와 같은 값, 로그/지표용)
+CLIENT_CLOSED_REQUEST = 499
+
+T = TypeVar("T")
+
+
+class ClientDisconnected(Exception):
+    """응답을 보내기 전에 클라이언트 연결이 끊겨 처리를 중단함"""
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """클라이언트가 연결을 끊을 때까지 기다립니다. (요청 본문은 이미 읽은 뒤여야 함)"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_until_disconnect(request: Request, awaitable: Awaitable[T]) -> T:
+    """
+    클라이언트 연결이 끊기면 awaitable 을 취소합니다.
+
+    실행 중인 asyncpg 쿼리가 취소되면 asyncpg 가 서버에 취소 요청을 보내고 커넥션을 풀에 돌려주므로,
+    탭을 닫은 요청이 command_timeout 까지 커넥션을 붙잡고 있지 않습니다.
+
+    Raises:
+        ClientDisconnected: 결과가 나오기 전에 연결이 끊긴 경우
+    """
+    task = asyncio.ensure_future(awaitable)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait((task, watcher), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.debug(f"연결이 끊긴 요청의 작업 취소 중 오류: {str(e)}")
+    if task.cancelled():
+        metrics.http_client_disconnects_total.inc((current_workload.get(),))
+        logger.info(f"클라이언트 연결이 끊겨 처리를 중단했습니다: {request.method} {request.url.path}")
+        raise ClientDisconnected()
+    return task.result()
+
+
+def cancel_on_disconnect(func):
+    """엔드포인트 실행 중 클라이언트 연결이 끊기면 실행을 취소합니다. (엔드포인트에 request 인자 필요)"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs) -> Any:
+        return await run_until_disconnect(kwargs["request"], func(*args, **kwargs))
+    return wrapper
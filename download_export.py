@@ -0,0 +1,204 @@
+import asyncio
+import io
+import logging
+import os
+import urllib.parse
+from typing import Any, AsyncIterator, Optional, Sequence
+
+import pandas as pd
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from workload import statement_timeout
+from xlsx_stream import EXCEL_MAX_SHEET_ROWS, XlsxStreamWriter
+
+logger = logging.getLogger(__name__)
+
+# 엑셀에서 한글이 깨지지 않도록 CSV 앞에 붙이는 UTF-8 BOM
+UTF8_BOM = b"\xef\xbb\xbf"
+
+# COPY 출력과 HTTP 전송 사이에 보관할 최대 청크 수 (전송이 느리면 COPY 도 대기)
+EXPORT_QUEUE_CHUNKS = int(os.getenv("EXPORT_QUEUE_CHUNKS", "16"))
+
+# 엑셀 내보내기 최대 행 수, 시트당 최대 행 수, 한 번에 읽어 변환할 행 수
+EXPORT_MAX_ROWS = int(os.getenv("EXPORT_MAX_ROWS", "1000000"))
+XLSX_MAX_ROWS_PER_SHEET = int(os.getenv("XLSX_MAX_ROWS_PER_SHEET", str(EXCEL_MAX_SHEET_ROWS - 1)))
+XLSX_BATCH_ROWS = int(os.getenv("XLSX_BATCH_ROWS", "2000"))
+
+# DB 에서 직접 내보내는 /download/ 경로 (그 외 경로는 download_middleware 가 처리)
+NATIVE_DOWNLOAD_PREFIXES = (
+    "/download/data/bldgReg/",
+    "/download/data/pnu",
+    "/download/data/sido",
+    "/download/data/sigungu/",
+    "/download/data/emd/",
+    "/download/data/ri/",
+    "/download/data/roadAddr/",
+    "/download/data/bonboo/",
+)
+
+
+def is_native_download(path: str) -> bool:
+    return path.startswith(NATIVE_DOWNLOAD_PREFIXES)
+
+
+def download_filename(path: str, extension: str) -> str:
+    """요청 경로의 마지막 부분으로 파일명을 만듭니다. (예: /download/data/sido → sido.csv)"""
+    filename = path.split('/')[-1]
+    if not filename:
+        filename = "data"
+    return f"{filename}.{extension}"
+
+
+def attachment_headers(filename: str) -> dict:
+    # 파일명 URL 인코딩 (한글 지원)
+    encoded_filename = urllib.parse.quote(filename)
+    return {
+        'Content-Disposition': f'attachment; filename="{encoded_filename}"; filename*=UTF-8\'\'{encoded_filename}'
+    }
+
+
+def _copy_query(query: str) -> str:
+    """COPY (...) TO STDOUT 안에 넣을 수 있도록 끝의 세미콜론을 제거합니다."""
+    return query.strip().rstrip(';')
+
+
+async def stream_csv_copy(pool, query: str, args: Sequence[Any], timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+    """
+    COPY (query) TO STDOUT 결과를 UTF-8 BOM CSV 로 바로 흘려보냅니다.
+
+    COPY 출력 청크는 크기가 제한된 큐를 거쳐 응답으로 전달되므로,
+    결과 행 수와 관계없이 메모리 사용량이 일정합니다.
+    클라이언트 연결이 끊기면 COPY 태스크를 취소하고 커넥션을 반환합니다.
+    timeout 은 COPY 전체(전송 대기 포함)의 제한 시간입니다. (None 이면 풀의 command_timeout)
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+
+    async def run_copy():
+        try:
+            async with pool.acquire() as conn:
+                await conn.copy_from_query(
+                    _copy_query(query), *args,
+                    output=queue.put, format="csv", header=True, timeout=timeout,
+                )
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    # 첫 바이트(BOM)는 쿼리 실행을 기다리지 않고 바로 전송
+    yield UTF8_BOM
+
+    task = asyncio.create_task(run_copy())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                break
+            if isinstance(chunk, Exception):
+                logger.error(f"CSV 내보내기 중 오류 발생: {str(chunk)}")
+                raise chunk
+            yield chunk
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+def csv_response(pool, path: str, query: str, args: Sequence[Any], timeout: Optional[float] = None) -> StreamingResponse:
+    return StreamingResponse(
+        stream_csv_copy(pool, query, args, timeout),
+        media_type="text/csv",
+        headers=attachment_headers(download_filename(path, "csv")),
+    )
+
+
+async def stream_xlsx(pool, query: str, args: Sequence[Any], timeout: Optional[float] = None) -> AsyncIterator[bytes]:
+    """
+    서버 측 커서로 읽은 행을 XLSX 로 변환하여 흘려보냅니다.
+
+    XLSX_BATCH_ROWS 행씩 읽어 스레드 풀에서 XML 생성/압축을 수행하므로
+    이벤트 루프를 막지 않고, 메모리에는 한 배치 분량만 유지됩니다.
+    EXPORT_MAX_ROWS 를 넘는 행은 내보내지 않고 안내 시트를 추가합니다.
+    timeout 은 커서 생성과 배치 하나를 읽을 때마다의 제한 시간입니다.
+    """
+    loop = asyncio.get_running_loop()
+
+    async with pool.acquire() as conn:
+        # 커서는 트랜잭션 안에서만 사용할 수 있음
+        async with conn.transaction():
+            statement = await conn.prepare(query)
+            columns = [attribute.name for attribute in statement.get_attributes()]
+            writer = await loop.run_in_executor(
+                None, lambda: XlsxStreamWriter(columns, max_rows_per_sheet=XLSX_MAX_ROWS_PER_SHEET)
+            )
+            yield writer.drain()
+
+            cursor = await statement.cursor(*args, timeout=timeout)
+            truncated = False
+            while True:
+                batch = await cursor.fetch(XLSX_BATCH_ROWS, timeout=timeout)
+                if not batch:
+                    break
+
+                remaining = EXPORT_MAX_ROWS - writer.row_count
+                if len(batch) > remaining:
+                    batch = batch[:remaining]
+                    truncated = True
+
+                await loop.run_in_executor(None, writer.write_rows, [tuple(row) for row in batch])
+                chunk = writer.drain()
+                if chunk:
+                    yield chunk
+                if truncated:
+                    break
+
+    if truncated:
+        logger.warning(f"엑셀 내보내기 행 수 제한({EXPORT_MAX_ROWS}행)을 초과하여 결과를 잘랐습니다.")
+        await loop.run_in_executor(
+            None, writer.add_notice_sheet, "안내",
+            f"결과가 {EXPORT_MAX_ROWS}행을 초과하여 {EXPORT_MAX_ROWS}행까지만 포함되었습니다.",
+        )
+
+    await loop.run_in_executor(None, writer.close)
+    yield writer.drain()
+
+
+def build_csv(records: Sequence[dict]) -> bytes:
+    """dict 목록을 CSV(UTF-8 BOM) 파일 바이트로 변환합니다."""
+    output = io.BytesIO()
+    pd.DataFrame(records).to_csv(output, index=False, encoding='utf-8-sig')
+    return output.getvalue()
+
+
+def build_xlsx(records: Sequence[dict]) -> bytes:
+    """dict 목록을 XLSX 파일 바이트로 변환합니다. (블로킹, 스레드에서 호출)"""
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    writer = XlsxStreamWriter(columns, max_rows_per_sheet=XLSX_MAX_ROWS_PER_SHEET)
+    writer.write_rows([record.get(column) for column in columns] for record in records)
+    writer.close()
+    return writer.drain()
+
+
+def excel_response(pool, path: str, query: str, args: Sequence[Any], timeout: Optional[float] = None) -> StreamingResponse:
+    return StreamingResponse(
+        stream_xlsx(pool, query, args, timeout),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers=attachment_headers(download_filename(path, "xlsx")),
+    )
+
+
+async def export_response(pool, request: Request, query: str, args: Sequence[Any]):
+    """
+    ?format= 값에 따라 CSV(기본) 또는 엑셀(스트리밍 XLSX) 다운로드 응답을 만듭니다.
+
+    쿼리 제한 시간은 응답 본문을 보내는 동안이 아니라 여기서 (요청 부류가 정해진 상태로) 정합니다.
+    """
+    timeout = statement_timeout()
+    file_format = request.query_params.get('format', 'csv').lower()
+    if file_format == 'excel' or file_format == 'xlsx':
+        return excel_response(pool, request.url.path, query, args, timeout)
+    return csv_response(pool, request.url.path, query, args, timeout)
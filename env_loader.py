@@ -0,0 +1,39 @@
+import logging
+import os
+
+from dotenv import load_dotenv, find_dotenv
+
+# 다른 모듈이 import 시점에 os.getenv 로 설정을 읽으므로, main.py 와 database.py 가 가장 먼저 import 합니다.
+# (log_config, metrics, workload, query_loader 등의 설정이 .env 값을 보도록)
+logger = logging.getLogger("database")
+logger.setLevel(logging.DEBUG)
+
+# .env 파일 경로 찾기 및 로깅
+def load_env_file(path=None):
+    """지정된 경로 또는 기본 경로에서 .env 파일을 로드하고 경로를 로깅합니다."""
+    if path and os.path.exists(path):
+        dotenv_path = os.path.abspath(path)
+        load_dotenv(dotenv_path)
+        logger.info(f".env 파일 로드됨: {dotenv_path}")
+        return True
+    return False
+
+# 현재 디렉토리 .env 파일 로드 시도
+default_env = find_dotenv()
+if default_env:
+    logger.info(f"기본 .env 파일 발견: {os.path.abspath(default_env)}")
+    load_dotenv(default_env)
+else:
+    logger.warning("기본 .env 파일을 찾을 수 없습니다.")
+
+# 추가 경로에서 .env 파일 로드 시도
+additional_paths = [
+    '../.env',
+    'dist/.env',
+    './.env',
+    os.path.join(os.getcwd(), '.env')
+]
+
+for path in additional_paths:
+    if load_env_file(path):
+        logger.info(f"추가 .env 파일 로드됨: {path}")
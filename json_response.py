@@ -0,0 +1,65 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+
+def dumps(value: Any) -> bytes:
+    """FastAPI 기본 JSONResponse 와 같은 형식으로 직렬화합니다. (공백 없음, 한글 그대로)"""
+    return json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def record_to_json(record) -> str:
+    """asyncpg Record 한 행을 JSON 문자열로 변환합니다. (DB 측 변환을 쓸 수 없는 경우)"""
+    return dumps(dict(record)).decode("utf-8")
+
+
+def json_array(rows: Sequence[str]) -> bytes:
+    """행별 JSON 문자열을 이어 붙여 JSON 배열을 만듭니다."""
+    return ("[" + ",".join(rows) + "]").encode("utf-8")
+
+
+class RawJSONResponse(Response):
+    """
+    이미 직렬화된 JSON 조각으로 객체 응답을 만드는 Response
+
+    DB 가 만든 행별 JSON 문자열을 dict 로 바꾸지 않고 그대로 이어 붙이므로
+    jsonable_encoder 가 결과 전체를 다시 순회하지 않습니다.
+    필드 순서와 형식은 dict 를 반환할 때와 같습니다.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, fields: Sequence[Tuple[str, bytes]], status_code: int = 200, headers: Optional[dict] = None):
+        self.fields: List[Tuple[str, bytes]] = list(fields)
+        super().__init__(content=self._render_fields(), status_code=status_code, headers=headers)
+
+    def _render_fields(self) -> bytes:
+        return b"{" + b",".join(dumps(key) + b":" + value for key, value in self.fields) + b"}"
+
+    def with_field(self, key: str, value: Any) -> "RawJSONResponse":
+        """필드를 하나 덧붙인 새 응답을 반환합니다. (measure_time 의 execution_time 등, 추가한 헤더 유지)"""
+        headers = {name: value for name, value in self.headers.items() if name not in ("content-length", "content-type")}
+        return RawJSONResponse(self.fields + [(key, dumps(value))], status_code=self.status_code, headers=headers)
+
+
+def data_response(rows: Sequence[str], **fields: Any) -> RawJSONResponse:
+    """{"data": [...], 그 외 필드...} 형태의 응답을 만듭니다."""
+    return array_data_response(json_array(rows), **fields)
+
+
+def array_data_response(array: bytes, **fields: Any) -> RawJSONResponse:
+    """이미 만든 JSON 배열로 {"data": [...], 그 외 필드...} 형태의 응답을 만듭니다. (결과 캐시)"""
+    return RawJSONResponse([("data", array)] + [(key, dumps(value)) for key, value in fields.items()])
+
+
+def array_response(rows: Sequence[str]) -> Response:
+    """[...] 형태의 응답을 만듭니다."""
+    return Response(content=json_array(rows), media_type="application/json")
@@ -0,0 +1,230 @@
+import atexit
+import contextvars
+import datetime
+import logging
+import os
+import queue
+import random
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional, Sequence
+
+# 로그 기본 디렉토리 (logs/2023-04/2023-04-15.log 형식으로 기록)
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# 일별 로그 파일 보관 일수 (0이면 삭제하지 않음)
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+# 기록 대기 큐 크기 (가득 차면 요청을 막지 않고 로그를 버림)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# 상세(INFO 이하) 로그를 남길 요청 비율 (0~1, WARNING 이상은 항상 기록)
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+# 샘플링에서 제외된 요청도 이 시간(초) 이상 걸리면 경고로 기록
+LOG_SLOW_REQUEST_SECONDS = float(os.getenv("LOG_SLOW_REQUEST_SECONDS", "1.0"))
+# 쿼리문, 파라미터, 샘플 데이터 로그 최대 길이
+LOG_MAX_QUERY_CHARS = int(os.getenv("LOG_MAX_QUERY_CHARS", "500"))
+LOG_MAX_PARAM_CHARS = int(os.getenv("LOG_MAX_PARAM_CHARS", "200"))
+LOG_MAX_SAMPLE_CHARS = int(os.getenv("LOG_MAX_SAMPLE_CHARS", "500"))
+
+# 현재 요청의 상세 로그 기록 여부 (요청 밖의 시작/백그라운드 작업은 항상 기록)
+_request_sampled: contextvars.ContextVar[bool] = contextvars.ContextVar("request_sampled", default=True)
+
+
+class MonthlyFolderFileHandler(logging.Handler):
+    """
+    월별 폴더 / 일별 파일로 기록하는 핸들러 (logs/2023-04/2023-04-15.log)
+
+    자정이 지난 첫 로그에서 새 파일을 열고, 보관 기간이 지난 파일을 삭제합니다.
+    QueueListener 의 기록 스레드에서만 호출되므로 요청 처리와 무관하게 디스크에 씁니다.
+    """
+
+    def __init__(self, base_dir: str = LOG_DIR, retention_days: int = LOG_RETENTION_DAYS, encoding: str = 'utf-8'):
+        super().__init__()
+        self.base_dir = base_dir
+        self.retention_days = retention_days
+        self.encoding = encoding
+        self.stream = None
+        self.path: Optional[str] = None
+        self.next_rollover = 0.0
+
+    def _open(self, created: float) -> None:
+        day = datetime.date.fromtimestamp(created)
+        folder = os.path.join(self.base_dir, day.strftime('%Y-%m'))
+        os.makedirs(folder, exist_ok=True)
+
+        if self.stream is not None:
+            self.stream.close()
+        self.path = os.path.join(folder, day.strftime('%Y-%m-%d.log'))
+        self.stream = open(self.path, 'a', encoding=self.encoding)
+        self.next_rollover = time.mktime((day + datetime.timedelta(days=1)).timetuple())
+        self._remove_expired(day)
+
+    def _remove_expired(self, today: datetime.date) -> None:
+        if self.retention_days <= 0:
+            return
+        oldest = (today - datetime.timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        try:
+            month_folders = os.listdir(self.base_dir)
+        except OSError:
+            return
+        for month_folder in month_folders:
+            folder = os.path.join(self.base_dir, month_folder)
+            if not os.path.isdir(folder) or month_folder > oldest[:7]:
+                continue
+            for filename in os.listdir(folder):
+                if filename.endswith('.log') and filename[:-4] < oldest:
+                    try:
+                        os.remove(os.path.join(folder, filename))
+                    except OSError:
+                        pass
+            if not os.listdir(folder):
+                try:
+                    os.rmdir(folder)
+                except OSError:
+                    pass
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.stream is None or record.created >= self.next_rollover:
+                self._open(record.created)
+            self.stream.write(self.format(record) + '\n')
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.flush()
+        finally:
+            self.release()
+
+    def close(self) -> None:
+        self.acquire()
+        try:
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+        finally:
+            self.release()
+        super().close()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """큐가 가득 차면 기다리지 않고 로그를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class FlushingQueueListener(QueueListener):
+    """큐가 비는 시점에만 핸들러를 flush 하여 기록 스레드의 디스크 쓰기 횟수를 줄입니다."""
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            for handler in self.handlers:
+                handler.flush()
+            return self.queue.get(block)
+
+
+class RequestSamplingFilter(logging.Filter):
+    """샘플링에서 제외된 요청의 INFO 이하 로그를 큐에 넣기 전에 버립니다."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or _request_sampled.get()
+
+
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[FlushingQueueListener] = None
+
+
+def setup_logging() -> None:
+    """
+    루트 로거를 큐 기반 비동기 로깅으로 설정합니다.
+
+    요청 처리 중에는 레코드를 큐에 넣기만 하고, 파일/콘솔 출력은
+    QueueListener 의 기록 스레드가 담당합니다. 여러 번 호출해도 한 번만 설정됩니다.
+    """
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = MonthlyFolderFileHandler()
+    file_handler.setFormatter(formatter)
+    console_handler = logging.StreamHandler()  # 콘솔 출력
+    console_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = NonBlockingQueueHandler(log_queue)
+    _queue_handler.addFilter(RequestSamplingFilter())
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(_queue_handler)
+    root_logger.setLevel(LOG_LEVEL)
+
+    _listener = FlushingQueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """남은 로그를 모두 기록하고 기록 스레드를 종료합니다."""
+    global _listener
+    if _listener is None:
+        return
+    if _queue_handler is not None and _queue_handler.dropped:
+        logging.getLogger(__name__).warning(f"로그 큐가 가득 차 버려진 로그: {_queue_handler.dropped}건")
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def begin_request() -> contextvars.Token:
+    """현재 요청의 상세 로그 기록 여부를 LOG_SAMPLE_RATE 에 따라 정합니다."""
+    return _request_sampled.set(LOG_SAMPLE_RATE >= 1.0 or random.random() < LOG_SAMPLE_RATE)
+
+
+def end_request(token: contextvars.Token) -> None:
+    _request_sampled.reset(token)
+
+
+def request_sampled() -> bool:
+    return _request_sampled.get()
+
+
+def clip(value: Any, limit: int = LOG_MAX_PARAM_CHARS) -> str:
+    """로그에 남길 값을 limit 글자로 자릅니다."""
+    text = value if isinstance(value, str) else repr(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}...(총 {len(text)}자)"
+
+
+def clip_query(query: str) -> str:
+    """쿼리문의 공백을 줄이고 LOG_MAX_QUERY_CHARS 글자로 자릅니다."""
+    return clip(' '.join(query.split()), LOG_MAX_QUERY_CHARS)
+
+
+def clip_params(args: Sequence[Any]) -> str:
+    """쿼리 파라미터를 하나씩 잘라서 표시합니다. (긴 PNU 목록 등은 개수만 표시)"""
+    parts = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)) and len(repr(arg)) > LOG_MAX_PARAM_CHARS:
+            parts.append(f"{clip(list(arg[:5]))} 외 {len(arg) - 5}건" if len(arg) > 5 else clip(arg))
+        else:
+            parts.append(clip(arg))
+    return f"({', '.join(parts)})"
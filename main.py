@@ -1,63 +1,45 @@
-from fastapi import FastAPI, Depends, Request, Body
+import env_loader  # noqa: F401  (.env 를 다른 모듈의 설정보다 먼저 읽음)
+from fastapi import FastAPI, Depends, Request, Body, HTTPException
 import database
-from auth import verify_api_key
+from auth import verify_api_key, verify_admin_key, api_keys, API_AUTH_ENABLED, API_KEYS_RELOAD_SECONDS, API_KEY_USAGE_FLUSH_SECONDS
 from models import ServiceData
-from query_loader import queries  # 쿼리 로드 추가
 from contextlib import asynccontextmanager
 import logging
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
-from korean_ip_middleware import korean_ip_middleware
-from logging.handlers import TimedRotatingFileHandler
+from korean_ip_middleware import korean_ip_middleware, ip_filter, KOREAN_IP_FILTER_ENABLED, KOREAN_IP_RELOAD_SECONDS
 import os
 import time
-import psutil
 import functools
-from query_template import parse_template
 from sqlalchemy import select, and_, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-import aiohttp
 import urllib.parse
 import json
 import datetime
-from fastapi.responses import StreamingResponse, Response, HTMLResponse, FileResponse
+from fastapi.responses import StreamingResponse, Response, HTMLResponse, FileResponse, JSONResponse
 from io import BytesIO
-import pandas as pd
 from fastapi.staticfiles import StaticFiles
+import asyncio
+from addr_cache import address_cache
+from pnu_lookup import fetch_pnu_rows
+from download_export import export_response, is_native_download, build_csv, build_xlsx
+from road_addr_index import road_addr_search
+from vworld_client import vworld_client
+from statement_registry import statements, StatementTimeout
+from query_catalog import query_catalog, QUERIES_RELOAD_SECONDS
+import log_config
+import metrics
+from json_response import RawJSONResponse, data_response, array_data_response, json_array
+from result_cache import result_cache, JSONPage
+from data_reload import data_reload, DATA_RELOAD_CHANNEL
+from workload import workload_middleware, workloads
+from disconnect import cancel_on_disconnect, ClientDisconnected, CLIENT_CLOSED_REQUEST
+from columnar_formats import negotiate_format, columnar_response, records_to_rows
+from pagination import page_limit, decode_cursor, split_page, record_key, json_row_key
+from dataset_version import dataset_version, etag_matches
 
-# 로그 디렉토리 구조 설정 (월별 폴더)
-def get_log_path():
-    """월별 폴더와 일별 로그 파일 경로를 생성합니다."""
-    today = datetime.datetime.now()
-    month_folder = today.strftime('%Y-%m')  # 2023-04 형식
-    log_folder = os.path.join('logs', month_folder)
-    
-    # 월별 폴더 생성
-    os.makedirs(log_folder, exist_ok=True)
-    
-    # 일별 로그 파일 경로
-    log_file = today.strftime('%Y-%m-%d.log')  # 2023-04-15.log 형식
-    return os.path.join(log_folder, log_file)
-
-# 기본 로그 디렉토리 생성
-os.makedirs('logs', exist_ok=True)
-
-# 로깅 설정
-logging.basicConfig(
-    level=logging.INFO,  # 기본 로깅 레벨
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        # 일별 로그 파일 핸들러
-        TimedRotatingFileHandler(
-            get_log_path(),
-            when='midnight',  # 매일 자정에 새 파일 생성
-            interval=1,       # 1일 간격
-            backupCount=30,   # 최대 30일치 보관
-            encoding='utf-8'
-        ),
-        logging.StreamHandler()  # 콘솔 출력
-    ]
-)
+# 로깅 설정 (큐 기반 비동기 기록, 월별 폴더 / 일별 파일)
+log_config.setup_logging()
 
 # 데이터베이스 로거 설정
 db_logger = logging.getLogger('database')
@@ -66,29 +48,6 @@ db_logger.setLevel(logging.DEBUG)  # 데이터베이스 로거는 DEBUG 레벨
 # 메인 로거
 logger = logging.getLogger(__name__)
 
-# 로그 핸들러 업데이트 함수
-def update_log_handlers():
-    """로그 핸들러를 현재 날짜에 맞게 업데이트합니다."""
-    root_logger = logging.getLogger()
-    
-    # 기존 파일 핸들러 제거
-    for handler in root_logger.handlers[:]:
-        if isinstance(handler, TimedRotatingFileHandler):
-            root_logger.removeHandler(handler)
-    
-    # 새 파일 핸들러 추가
-    file_handler = TimedRotatingFileHandler(
-        get_log_path(),
-        when='midnight',
-        interval=1,
-        backupCount=30,
-        encoding='utf-8'
-    )
-    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    root_logger.addHandler(file_handler)
-    
-    logger.info(f"로그 파일 경로 업데이트: {get_log_path()}")
-
 # 로깅 함수 정의
 def log_query_results(rows: List[Dict[str, Any]], query_name: str = "쿼리") -> None:
     """
@@ -98,18 +57,17 @@ def log_query_results(rows: List[Dict[str, Any]], query_name: str = "쿼리") ->
         rows: 데이터베이스 쿼리 결과 행 목록
         query_name: 로그에 표시할 쿼리 이름
     """
+    if not log_config.request_sampled():
+        return
     try:
-        # 날짜가 바뀌었는지 확인하고 필요시 로그 핸들러 업데이트
-        update_log_handlers()
-        
         logger.info(f"{query_name} 결과 행 수: {len(rows)}")
         if rows:
-            # 샘플 데이터 일부 로깅 (민감 정보 제외)
-            sample_data = dict(rows[0])
+            # 샘플 데이터 일부 로깅 (민감 정보 제외, DB 에서 JSON 문자열로 받은 행은 첫 행만 파싱)
+            sample_data = json.loads(rows[0]) if isinstance(rows[0], str) else dict(rows[0])
             # 민감 정보 필터링 (예: 비밀번호, 개인정보 등)
             filtered_data = {k: v for k, v in sample_data.items() 
                             if not any(sensitive in k.lower() for sensitive in ['password', 'secret', 'token'])}
-            logger.info(f"{query_name} 샘플 데이터: {filtered_data}")
+            logger.info(f"{query_name} 샘플 데이터: {log_config.clip(filtered_data, log_config.LOG_MAX_SAMPLE_CHARS)}")
             
             # 성능 정보 로깅 (선택 사항)
             if hasattr(rows, 'execution_time'):
@@ -133,57 +91,98 @@ async def get_query_params(request: Request) -> Dict[str, str]:
         params[key] = value
     return params
 
+async def build_road_addr_index(pool):
+    try:
+        await road_addr_search.refresh(pool)
+    except Exception as e:
+        logger.error(f"도로명주소 검색 인덱스 구성 실패, LIKE 검색으로 대체합니다: {str(e)}")
+
+# 주소 캐시 주기적 갱신 간격 (초, 0이면 갱신하지 않음)
+ADDR_CACHE_REFRESH_SECONDS = float(os.getenv("ADDR_CACHE_REFRESH_SECONDS", "0"))
+
+# /data/* 응답을 브라우저/CDN 이 재검증 없이 사용할 수 있는 시간 (초)
+DATA_CACHE_MAX_AGE = int(os.getenv("DATA_CACHE_MAX_AGE", "300"))
+
 @asynccontextmanager
 async def lifespan(app):
     # 시작 시 실행할 코드
     app.state.db = await database.connect_db()
+    await vworld_client.start()
+    
+    # 데이터셋 버전 확인 (실패 시 ETag 없이 동작)
+    try:
+        await dataset_version.refresh(app.state.db)
+    except Exception as e:
+        logger.error(f"데이터셋 버전 확인 실패, ETag 없이 응답합니다: {str(e)}")
+    
+    # 주소 단계별 캐시 적재 (실패 시 DB 조회로 동작)
+    try:
+        await address_cache.refresh(app.state.db)
+    except Exception as e:
+        logger.error(f"주소 캐시 적재 실패, DB 조회로 대체합니다: {str(e)}")
+    
+    # 커넥션 init 에서 준비에 실패한 쿼리는 요청 시점이 아니라 시작 시 알림 (GET /admin/queries)
+    if statements.prepare_errors:
+        logger.error(f"준비에 실패한 쿼리 {len(statements.prepare_errors)}개: {', '.join(sorted(statements.prepare_errors))}")
+    
+    background_tasks = []
+    
+    # 도로명주소 검색 인덱스는 백그라운드에서 구성 (준비 전에는 LIKE 검색)
+    background_tasks.append(asyncio.create_task(build_road_addr_index(app.state.db)))
+    
+    # 프로세스 메모리/CPU 지표는 요청마다가 아니라 주기적으로 수집
+    background_tasks.append(asyncio.create_task(metrics.run_process_sampler()))
+    
+    # 읽기 노드 상태 확인 (실패한 노드는 분산 대상에서 뺐다가 응답하면 복귀)
+    if database.DATABASE_HEALTH_CHECK_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            app.state.db.run_health_checks(database.DATABASE_HEALTH_CHECK_SECONDS)
+        ))
+    
+    # 데이터 적재 알림(LISTEN/NOTIFY)을 받으면 주소 캐시, 검색 인덱스, 데이터셋 버전을 백그라운드에서 갱신
+    if DATA_RELOAD_CHANNEL:
+        background_tasks.append(asyncio.create_task(data_reload.run(app.state.db, database.db_url)))
+    
+    if KOREAN_IP_FILTER_ENABLED and KOREAN_IP_RELOAD_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(ip_filter.run_watcher(KOREAN_IP_RELOAD_SECONDS)))
+    
+    # API 키 저장소 변경 감시, 키별 사용량은 모아서 주기적으로 기록
+    if API_KEYS_RELOAD_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(api_keys.run_watcher(API_KEYS_RELOAD_SECONDS)))
+    background_tasks.append(asyncio.create_task(api_keys.run_usage_flush(API_KEY_USAGE_FLUSH_SECONDS)))
+    
+    if QUERIES_RELOAD_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            query_catalog.run_watcher(app.state.db, QUERIES_RELOAD_SECONDS)
+        ))
+    
+    if ADDR_CACHE_REFRESH_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(
+            address_cache.run_periodic_refresh(app.state.db, ADDR_CACHE_REFRESH_SECONDS)
+        ))
+    
     yield
     # 종료 시 실행할 코드
+    for task in background_tasks:
+        task.cancel()
+    await api_keys.flush_usage()
+    await vworld_client.close()
     await app.state.db.close()
 
 app = FastAPI(lifespan=lifespan)
 
-# 미들웨어 등록
-#app.middleware("http")(korean_ip_middleware)
+# 클라이언트가 떠난 요청은 쿼리를 취소하고 499 로 기록 (응답은 전달되지 않음)
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected):
+    return Response(status_code=CLIENT_CLOSED_REQUEST)
 
-# 미들웨어를 직접 정의
-@app.middleware("http")
-async def performance_middleware(request: Request, call_next):
-    # 요청 시작 시간
-    start_time = time.time()
-    
-    # 요청 경로 및 메서드 로깅
-    path = request.url.path
-    method = request.method
-    logger.info(f"요청 시작: {method} {path}")
-    
-    # 요청 처리 전 메모리 사용량 (선택 사항)
-    process = psutil.Process()
-    memory_before = process.memory_info().rss / 1024 / 1024  # MB 단위
-    
-    # 다음 미들웨어 또는 엔드포인트 호출
-    response = await call_next(request)
-    
-    # 요청 처리 시간 계산
-    process_time = time.time() - start_time
-    
-    # 요청 처리 후 메모리 사용량 (선택 사항)
-    memory_after = process.memory_info().rss / 1024 / 1024  # MB 단위
-    memory_diff = memory_after - memory_before
-    
-    # 상세 성능 정보 로깅
-    logger.info(
-        f"요청 완료: {method} {path} - "
-        f"상태 코드: {response.status_code}, "
-        f"처리 시간: {process_time:.4f}초, "
-        f"메모리 사용: {memory_diff:.2f}MB"
-    )
-    
-    # 응답 헤더에 처리 시간 추가 (클라이언트에게 성능 정보 제공)
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    return response
+# 요청 부류의 쿼리 제한 시간(WORKLOAD_CLASSES)을 넘어 취소된 쿼리
+@app.exception_handler(StatementTimeout)
+async def statement_timeout_handler(request: Request, exc: StatementTimeout):
+    logger.warning(f"쿼리 제한 시간 초과: {request.method} {request.url.path} - {exc}")
+    return JSONResponse(status_code=504, content={"detail": f"Query timeout ({exc.timeout:g}s)"})
 
+# 미들웨어를 직접 정의 (나중에 등록한 미들웨어가 바깥쪽에서 먼저 실행됨)
 @app.middleware("http")
 async def download_middleware(request: Request, call_next):
     # 원래 경로 저장
@@ -192,6 +191,10 @@ async def download_middleware(request: Request, call_next):
     # 다운로드 접두사 확인 (/download/로 시작하는지)
     is_download = original_path.startswith("/download/")
     
+    # DB 에서 직접 스트리밍하는 경로는 해당 다운로드 엔드포인트가 처리
+    if is_download and is_native_download(original_path):
+        return await call_next(request)
+    
     if is_download:
         # 원래 API 경로로 변환 (접두사 제거)
         request.scope["path"] = original_path.replace("/download/", "/", 1)
@@ -206,9 +209,10 @@ async def download_middleware(request: Request, call_next):
     # 다운로드 요청이면 응답을 파일로 변환
     if is_download and response.status_code == 200:
         # 응답 본문 가져오기
-        body = b""
+        chunks = []
         async for chunk in response.body_iterator:
-            body += chunk
+            chunks.append(chunk)
+        body = b"".join(chunks)
         
         # JSON 데이터 파싱
         try:
@@ -226,17 +230,16 @@ async def download_middleware(request: Request, call_next):
                 # 파일 형식 확인 (쿼리 파라미터에서)
                 file_format = request.query_params.get('format', 'csv').lower()
                 
-                # 데이터프레임 변환
-                df = pd.DataFrame(result_data)
-                
                 # 파일 생성
                 output = BytesIO()
                 if file_format == 'excel' or file_format == 'xlsx':
-                    df.to_excel(output, index=False)
+                    # 엑셀 변환은 이벤트 루프를 막지 않도록 스레드에서 수행
+                    content = await asyncio.get_running_loop().run_in_executor(None, build_xlsx, result_data)
+                    output.write(content)
                     media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                     filename = f"{filename}.xlsx"
                 else:  # 기본값은 CSV
-                    df.to_csv(output, index=False, encoding='utf-8-sig')  # BOM 포함 UTF-8
+                    output.write(build_csv(result_data))  # BOM 포함 UTF-8
                     media_type = "text/csv"
                     filename = f"{filename}.csv"
                 
@@ -266,13 +269,111 @@ async def download_middleware(request: Request, call_next):
     # 원래 응답 반환 (200이 아닌 경우)
     return response
 
+# 작업 부류별 입장 제어는 다운로드 변환보다 바깥, ETag(304) 보다 안쪽 (304 는 DB 를 쓰지 않으므로 자리를 차지하지 않음)
+app.middleware("http")(workload_middleware)
+
+def is_cacheable(request: Request) -> bool:
+    """데이터셋 버전으로 ETag 를 붙일 수 있는 요청인지 확인합니다. (V-World 를 거치는 jibunAddr 제외)"""
+    path = request.url.path
+    return request.method == "GET" and path.startswith("/data/") and not path.startswith("/data/jibunAddr/")
+
+@app.middleware("http")
+async def etag_middleware(request: Request, call_next):
+    # 캐시 대상이 아니거나 데이터셋 버전을 모르면 일반 처리
+    if not is_cacheable(request):
+        return await call_next(request)
+    etag = dataset_version.etag(
+        request.method, request.url.path, request.url.query, request.headers.get("accept", "")
+    )
+    if etag is None:
+        return await call_next(request)
+    
+    cache_headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={DATA_CACHE_MAX_AGE}",
+        "Vary": "Accept",
+    }
+    
+    # 클라이언트가 같은 버전의 응답을 갖고 있으면 DB 조회 없이 304 응답
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        # 304 도 엔드포인트와 같이 API 키와 초당 한도를 확인 (동시 요청 수는 DB 를 쓰지 않으므로 제외)
+        if API_AUTH_ENABLED:
+            try:
+                api_keys.authorize(request.headers.get("api-key"))
+            except HTTPException as e:
+                return JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
+        return Response(status_code=304, headers=cache_headers)
+    
+    # 데이터 응답(200)에만 캐시 헤더를 붙임 (오류 응답은 CDN 에 캐시되지 않도록 제외)
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(cache_headers)
+    return response
+
+# 국내 IP 제한은 ETag(304) 보다 바깥쪽에 등록하여 캐시 응답도 막음 (차단 응답은 지표에 포함)
+if KOREAN_IP_FILTER_ENABLED:
+    app.middleware("http")(korean_ip_middleware)
+
+# 성능 측정/지표 미들웨어는 가장 바깥쪽에 등록 (304, 다운로드 변환 시간까지 포함)
+@app.middleware("http")
+async def performance_middleware(request: Request, call_next):
+    # 요청 시작 시간
+    start_time = time.perf_counter()
+    
+    # 이 요청의 상세 로그 기록 여부 결정 (LOG_SAMPLE_RATE)
+    sampling_token = log_config.begin_request()
+    
+    # 요청 경로 및 메서드 로깅
+    path = request.url.path
+    method = request.method
+    logger.debug(f"요청 시작: {method} {path}")
+    
+    # 지표는 실제 경로 대신 라우트 템플릿 단위로 집계
+    labels = (method, metrics.route_label(request))
+    metrics.http_requests_in_flight.inc(labels)
+    
+    # 다음 미들웨어 또는 엔드포인트 호출
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.observe_response(labels, 500, time.perf_counter() - start_time, None)
+        raise
+    finally:
+        log_config.end_request(sampling_token)
+    
+    # 요청 처리 시간 계산
+    process_time = time.perf_counter() - start_time
+    status_code = response.status_code
+    
+    # 상세 성능 정보 로깅 (샘플링에서 제외된 요청은 느리거나 서버 오류일 때만 경고로 기록)
+    if process_time >= log_config.LOG_SLOW_REQUEST_SECONDS or status_code >= 500:
+        logger.warning(f"요청 완료: {method} {path} - 상태 코드: {status_code}, 처리 시간: {process_time:.4f}초")
+    elif log_config.request_sampled():
+        logger.info(f"요청 완료: {method} {path} - 상태 코드: {status_code}, 처리 시간: {process_time:.4f}초")
+    
+    # 응답 크기/처리 시간 지표 (스트리밍 응답은 본문 전송이 끝날 때 기록)
+    content_length = response.headers.get("content-length")
+    if content_length is not None:
+        metrics.observe_response(labels, status_code, process_time, int(content_length))
+    else:
+        response.body_iterator = metrics.count_body(
+            response.body_iterator,
+            lambda size: metrics.observe_response(labels, status_code, time.perf_counter() - start_time, size),
+        )
+    
+    # 응답 헤더에 처리 시간 추가 (클라이언트에게 성능 정보 제공)
+    response.headers["X-Process-Time"] = str(process_time)
+    
+    return response
+
 def measure_time(func):
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
         start_time = time.time()
         
         # 함수 이름 로깅
-        logger.info(f"엔드포인트 시작: {func.__name__}")
+        logger.debug(f"엔드포인트 시작: {func.__name__}")
         
         # 함수 실행
         result = await func(*args, **kwargs)
@@ -286,6 +387,8 @@ def measure_time(func):
         # 결과가 딕셔너리인 경우 실행 시간 추가
         if isinstance(result, dict):
             result["execution_time"] = execution_time
+        elif isinstance(result, RawJSONResponse):
+            result = result.with_field("execution_time", execution_time)
         
         return result
     return wrapper
@@ -303,38 +406,81 @@ async def get_api_test_page():
         return HTMLResponse(content=f"<h1>오류 발생</h1><p>{str(e)}</p>")
 
 
-@app.get("/data/bldgReg/{bldgReg}") # 건축물대장 조회
-async def get_building_data(bldgReg: str, api_key: str = Depends(verify_api_key)):
+async def query_columnar(fmt: str, query_name: str, *args, page_size: Optional[int] = None):
+    """
+    이름 있는 쿼리 결과를 Arrow/Parquet/MessagePack 응답으로 변환합니다.
+    
+    page_size 를 주면 limit + 1 행으로 조회한 결과를 한 페이지로 자르고 다음 커서를 X-Next-Cursor 헤더로 보냅니다.
+    """
     async with app.state.db.acquire() as conn:
-        query = queries["GET_BUILDING_LEDGER"]
-        rows = await conn.fetch(query, bldgReg)
-        
-        # 로깅 함수 호출
-        log_query_results(rows, "건축물대장 조회")
-        
-        # 딕셔너리 리스트로 변환
-        result = [dict(row) for row in rows]
-        return result
+        column_names, rows = await statements.fetch_columns(conn, query_name, *args)
+    next_cursor = None
+    if page_size is not None:
+        rows, next_cursor = split_page(rows, page_size, record_key)
+    response = await columnar_response(fmt, column_names, rows)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
+
+async def fetch_json_page(query_name: str, args: list, label: str, page_size: Optional[int] = None):
+    """
+    이름 있는 쿼리 결과를 JSON 배열 조각으로 반환합니다. (결과 캐시 사용)
+    
+    같은 데이터셋 버전에서 같은 쿼리와 파라미터로 다시 조회하면 커넥션 풀과 직렬화를 건너뜁니다.
+    page_size 를 주면 limit + 1 행으로 조회한 결과를 한 페이지로 자르고 다음 커서를 함께 저장합니다.
+    
+    Returns:
+        (JSONPage, 캐시 적중 여부)
+    """
+    async def load() -> JSONPage:
+        async with app.state.db.acquire() as conn:
+            rows = await statements.fetch_json(conn, query_name, *args)
+        log_query_results(rows, label)
+        next_cursor = None
+        if page_size is not None:
+            rows, next_cursor = split_page(rows, page_size, json_row_key)
+        return JSONPage(json_array(rows), len(rows), next_cursor)
+    
+    version = (dataset_version.version, statements.generation)
+    return await result_cache.get_or_load(version, query_name, tuple(args), load)
+
+def cache_status(response, hit: bool):
+    """결과 캐시 적중 여부를 X-Cache 헤더로 알립니다."""
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+@app.get("/data/bldgReg/{bldgReg}") # 건축물대장 조회
+@cancel_on_disconnect
+async def get_building_data(bldgReg: str, request: Request, api_key: str = Depends(verify_api_key)):
+    # Accept 헤더 또는 ?format= 으로 컬럼 형식 요청 시
+    fmt = negotiate_format(request)
+    if fmt:
+        return await query_columnar(fmt, "GET_BUILDING_LEDGER", bldgReg)
+    
+    # DB 에서 JSON 으로 직렬화된 행을 그대로 응답
+    page, hit = await fetch_json_page("GET_BUILDING_LEDGER", [bldgReg], "건축물대장 조회")
+    return cache_status(Response(content=page.array, media_type="application/json"), hit)
 
 # PNU 조회 엔드포인트
 @app.get("/data/pnu/{pnu}")
+@cancel_on_disconnect
 async def get_pnu_data(pnu: str, request: Request, api_key: str = Depends(verify_api_key)):
     # 쿼리 파라미터 가져오기
     params = await get_query_params(request)
     logger.info(f"PNU 단건 조회 파라미터: {params}")
     
-    async with app.state.db.acquire() as conn:
-        query = queries["GET_PNU_DATA"]
-        rows = await conn.fetch(query, pnu)
-        log_query_results(rows, "PNU 단건 조회")
-        
-        result = [dict(row) for row in rows]
-        return {"data": result, "params": params}
+    fmt = negotiate_format(request)
+    if fmt:
+        return await query_columnar(fmt, "GET_PNU_DATA", pnu)
+    
+    page, hit = await fetch_json_page("GET_PNU_DATA", [pnu], "PNU 단건 조회")
+    return cache_status(array_data_response(page.array, params=params), hit)
 
 class PnuListRequest(BaseModel):
     pnu_list: List[str]
 
 @app.post("/data/pnu")
+@cancel_on_disconnect
 async def get_pnu_list(
     request: Request, 
     pnu_request: PnuListRequest, 
@@ -342,124 +488,272 @@ async def get_pnu_list(
 ):
     params = await get_query_params(request)
     logger.info(f"PNU 목록 조회 파라미터: {params}")
-    logger.info(f"요청된 PNU 목록: {pnu_request.pnu_list}")
+    logger.info(f"요청된 PNU 목록: {log_config.clip_params([pnu_request.pnu_list])}")
     
     result = []
     pnu_results = {}  # 각 PNU별 결과를 추적하기 위한 딕셔너리
     
-    async with app.state.db.acquire() as conn:
-        for pnu in pnu_request.pnu_list:
-            try:
-                query = queries["GET_PNU_DATA"]
-                rows = await conn.fetch(query, pnu)
-                logger.info(f"PNU {pnu} 조회 결과 행 수: {len(rows)}")
-                
-                pnu_data = [dict(row) for row in rows]
-                pnu_results[pnu] = len(pnu_data)  # 각 PNU별 결과 행 수 기록
-                
-                # 결과에 추가
-                for row_dict in pnu_data:
-                    result.append(row_dict)
-            except Exception as e:
-                logger.error(f"PNU {pnu} 조회 중 오류 발생: {str(e)}")
-                pnu_results[pnu] = f"오류: {str(e)}"
-        
-        logger.info(f"PNU별 결과 요약: {pnu_results}")
-        logger.info(f"전체 결과 행 수: {len(result)}")
+    # 배열 파라미터 쿼리로 일괄 조회 (PNU별 왕복 없이 커넥션 하나에서 청크 단위로 조회)
+    rows_by_pnu, errors = await fetch_pnu_rows(app.state.db, pnu_request.pnu_list)
+    
+    # 요청 순서대로 결과 구성 (중복 요청된 PNU 도 기존과 같이 반복 포함)
+    for pnu in pnu_request.pnu_list:
+        if pnu in errors:
+            pnu_results[pnu] = errors[pnu]
+            continue
         
-        log_query_results(result[:1] if result else [], "PNU 목록 조회")
-        return {"data": result, "params": params, "pnu_summary": pnu_results}
+        pnu_data = [dict(row) for row in rows_by_pnu.get(pnu, [])]
+        pnu_results[pnu] = len(pnu_data)  # 각 PNU별 결과 행 수 기록
+        result.extend(pnu_data)
+    
+    logger.info(f"PNU별 결과 요약: {log_config.clip(pnu_results, log_config.LOG_MAX_SAMPLE_CHARS)}")
+    logger.info(f"전체 결과 행 수: {len(result)}")
+    
+    fmt = negotiate_format(request)
+    if fmt:
+        return await columnar_response(fmt, *records_to_rows(result))
+    
+    log_query_results(result[:1] if result else [], "PNU 목록 조회")
+    return {"data": result, "params": params, "pnu_summary": pnu_results}
 
 # 주소 단계별 셀렉트박스 조회 엔드포인트
 @app.get("/data/sido")
+@cancel_on_disconnect
 async def get_sido_list(request: Request, api_key: str = Depends(verify_api_key)):
     # 쿼리 파라미터 가져오기
     params = await get_query_params(request)
     
+    fmt = negotiate_format(request)
+    
+    # 주소 캐시에서 조회
+    if address_cache.ready:
+        result = address_cache.get_sido_list()
+        if fmt:
+            return await columnar_response(fmt, *records_to_rows(result))
+        return {"data": result, "params": params, "count": len(result)}
+    
+    if fmt:
+        return await query_columnar(fmt, "GET_SIDO_LIST")
+    
     async with app.state.db.acquire() as conn:
-        query = queries["GET_SIDO_LIST"]
-        rows = await conn.fetch(query)
+        rows = await statements.fetch_json(conn, "GET_SIDO_LIST")
         
         log_query_results(rows, "시도 목록 조회")
         
-        result = [dict(row) for row in rows]
-        return {"data": result, "params": params, "count": len(result)}
+        return data_response(rows, params=params, count=len(rows))
 
 @app.get("/data/sigungu/{sidoCd}")
+@cancel_on_disconnect
 async def get_sigungu_list(sidoCd: str, request: Request, api_key: str = Depends(verify_api_key)):
     # 쿼리 파라미터 가져오기
     params = await get_query_params(request)
     
+    fmt = negotiate_format(request)
+    
+    # 주소 캐시에서 조회
+    if address_cache.ready:
+        result = address_cache.get_sigungu_list(sidoCd)
+        if fmt:
+            return await columnar_response(fmt, *records_to_rows(result))
+        return {"data": result, "params": params, "count": len(result)}
+    
+    if fmt:
+        return await query_columnar(fmt, "GET_SIGUNGU_LIST", sidoCd)
+    
     async with app.state.db.acquire() as conn:
-        query = queries["GET_SIGUNGU_LIST"]
-        rows = await conn.fetch(query, sidoCd)
+        rows = await statements.fetch_json(conn, "GET_SIGUNGU_LIST", sidoCd)
         
         log_query_results(rows, "시군구 목록 조회")
         
-        result = [dict(row) for row in rows]
-        return {"data": result, "params": params, "count": len(result)}
+        return data_response(rows, params=params, count=len(rows))
 
 @app.get("/data/emd/{sigunguCd}")
+@cancel_on_disconnect
 async def get_emd_list(sigunguCd: str, request: Request, api_key: str = Depends(verify_api_key)):
     # 쿼리 파라미터 가져오기
     params = await get_query_params(request)
     
+    fmt = negotiate_format(request)
+    
+    # 주소 캐시에서 조회
+    if address_cache.ready:
+        result = address_cache.get_emd_list(sigunguCd)
+        if fmt:
+            return await columnar_response(fmt, *records_to_rows(result))
+        return {"data": result, "params": params, "count": len(result)}
+    
+    if fmt:
+        return await query_columnar(fmt, "GET_EMD_LIST", sigunguCd)
+    
     async with app.state.db.acquire() as conn:
-        query = queries["GET_EMD_LIST"]
-        rows = await conn.fetch(query, sigunguCd)
+        rows = await statements.fetch_json(conn, "GET_EMD_LIST", sigunguCd)
         
         log_query_results(rows, "읍면동 목록 조회")
         
-        result = [dict(row) for row in rows]
-        return {"data": result, "params": params, "count": len(result)}
+        return data_response(rows, params=params, count=len(rows))
 
 @app.get("/data/ri/{emdCd}")
+@cancel_on_disconnect
 async def get_ri_list(emdCd: str, request: Request, api_key: str = Depends(verify_api_key)):
     # 쿼리 파라미터 가져오기
     params = await get_query_params(request)
     
+    fmt = negotiate_format(request)
+    
+    # 주소 캐시에서 조회
+    if address_cache.ready:
+        result = address_cache.get_ri_list(emdCd)
+        if fmt:
+            return await columnar_response(fmt, *records_to_rows(result))
+        return {"data": result, "params": params, "count": len(result)}
+    
+    if fmt:
+        return await query_columnar(fmt, "GET_RI_LIST", emdCd)
+    
     async with app.state.db.acquire() as conn:
-        query = queries["GET_RI_LIST"]
-        rows = await conn.fetch(query, emdCd)
+        rows = await statements.fetch_json(conn, "GET_RI_LIST", emdCd)
         
         log_query_results(rows, "동리 목록 조회")
         
-        result = [dict(row) for row in rows]
-        return {"data": result, "params": params, "count": len(result)}
+        return data_response(rows, params=params, count=len(rows))
+
+@app.post("/admin/addr-cache/refresh")
+async def refresh_address_cache(api_key: str = Depends(verify_admin_key)):
+    """주소 단계별 캐시를 재시작 없이 다시 적재합니다."""
+    snapshot = await address_cache.refresh(app.state.db)
+    return {"status": "success", "row_count": snapshot.row_count, "loaded_at": snapshot.loaded_at}
+
+@app.post("/admin/road-index/refresh")
+async def refresh_road_addr_index(api_key: str = Depends(verify_admin_key)):
+    """도로명주소 검색 인덱스를 DB 와 비교하여 추가/삭제분만 반영합니다."""
+    stats = await road_addr_search.refresh(app.state.db)
+    return {"status": "success", **stats}
+
+@app.get("/metrics")
+async def get_metrics(api_key: str = Depends(verify_admin_key)):
+    """Prometheus 텍스트 형식 지표 (라우트별 지연 시간/응답 크기/상태 코드, 커넥션 풀 대기, 쿼리별 실행 시간)"""
+    return Response(content=metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/admin/db/stats")
+async def get_db_stats(api_key: str = Depends(verify_admin_key)):
+    """노드별 상태, 미처리 요청 수, 복제 지연, 커넥션 풀 크기를 반환합니다."""
+    return app.state.db.stats()
+
+@app.get("/admin/ip-filter")
+async def get_ip_filter_stats(api_key: str = Depends(verify_admin_key)):
+    """허용 IP 대역 수, 마지막 교체 시각, 허용/차단 건수를 반환합니다."""
+    return ip_filter.stats()
+
+@app.post("/admin/ip-filter/reload")
+async def reload_ip_filter(api_key: str = Depends(verify_admin_key)):
+    """허용 IP 대역 파일을 즉시 다시 읽습니다. (잘못된 줄이 있으면 기존 목록 유지)"""
+    return await asyncio.to_thread(ip_filter.reload, True)
+
+@app.get("/admin/api-keys")
+async def get_api_key_stats(api_key: str = Depends(verify_admin_key)):
+    """키별 한도, 처리 중인 요청 수, 남은 토큰, 마지막 사용 시각을 반환합니다. (해시는 제외)"""
+    return api_keys.stats()
+
+@app.post("/admin/api-keys/reload")
+async def reload_api_keys(api_key: str = Depends(verify_admin_key)):
+    """API 키 저장소를 즉시 다시 읽습니다."""
+    return await asyncio.to_thread(api_keys.reload, True)
+
+@app.get("/admin/result-cache")
+async def get_result_cache_stats(api_key: str = Depends(verify_admin_key)):
+    """결과 캐시 적중/실패/제거 건수, 저장 바이트 수, 현재 버전을 반환합니다."""
+    return result_cache.stats()
+
+@app.post("/admin/result-cache/clear")
+async def clear_result_cache(api_key: str = Depends(verify_admin_key)):
+    """결과 캐시를 비웁니다."""
+    result_cache.clear()
+    return result_cache.stats()
+
+@app.get("/admin/data-reload")
+async def get_data_reload_stats(api_key: str = Depends(verify_admin_key)):
+    """적재 알림 리스너 연결 상태, 받은 알림 수, 마지막 재구성 결과를 반환합니다."""
+    return data_reload.stats()
+
+@app.post("/admin/data-reload")
+async def run_data_reload(api_key: str = Depends(verify_admin_key)):
+    """적재 알림을 받은 것처럼 주소 캐시, 검색 인덱스, 데이터셋 버전을 모두 다시 만듭니다."""
+    return await data_reload.rebuild(app.state.db, {"*"})
+
+@app.get("/admin/workloads")
+async def get_workload_stats(api_key: str = Depends(verify_admin_key)):
+    """작업 부류별 한도, 처리 중/대기 중인 요청 수, 거절 건수와 경로 규칙을 반환합니다."""
+    return workloads.stats()
+
+@app.get("/admin/statements")
+async def get_statement_stats(api_key: str = Depends(verify_admin_key)):
+    """이름 있는 쿼리별 실행 횟수와 누적 실행 시간을 반환합니다."""
+    return statements.report()
+
+@app.get("/admin/queries")
+async def get_query_catalog(api_key: str = Depends(verify_admin_key)):
+    """쿼리 파일 세대, 마지막 교체 시각, 검증/준비 실패 내역을 반환합니다."""
+    return query_catalog.stats()
+
+@app.post("/admin/queries/reload")
+async def reload_query_catalog(api_key: str = Depends(verify_admin_key)):
+    """queries.sql 을 다시 읽어 검증하고, 모두 통과하면 재시작 없이 교체합니다."""
+    return await query_catalog.reload(app.state.db, force=True)
 
 @app.get("/data/roadAddr/{roadAddr}")
 @measure_time
-async def get_road_addr_list(roadAddr: str, request: Request, api_key: str = Depends(verify_api_key)):
+@cancel_on_disconnect
+async def get_road_addr_list(
+    roadAddr: str, 
+    request: Request, 
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    api_key: str = Depends(verify_api_key)
+):
     # 쿼리 파라미터 가져오기
     params = await get_query_params(request)
     logger.info(f"도로명주소 목록 조회 파라미터: {params}")
     
+    # 페이지 크기 (최대 PAGE_MAX_LIMIT) 와 이전 페이지 마지막 행 (cursor)
+    page_size = page_limit(limit)
+    after = decode_cursor(cursor)
+    
+    # 검색 인덱스로 후보 주소를 찾아 조회 (인덱스 준비 전이면 LIKE 검색)
+    query_name, query_params = road_addr_search.plan_page(roadAddr, page_size, after)
+    
+    fmt = negotiate_format(request)
+    if fmt:
+        return await query_columnar(fmt, query_name, *query_params, page_size=page_size)
+    
     async with app.state.db.acquire() as conn:
         start_time = time.time()
-        query = queries["GET_ROAD_ADDR_LIST"]
-        rows = await conn.fetch(query, roadAddr)
+        rows = await statements.fetch_json(conn, query_name, *query_params)
         query_time = time.time() - start_time
         
         logger.info(f"도로명주소 목록 조회 쿼리 실행 시간: {query_time:.4f}초")
         log_query_results(rows, "도로명주소 목록 조회")
         
-        result = [dict(row) for row in rows]
-        return {"data": result, "params": params, "query_time": query_time, "count": len(result)}
+        rows, next_cursor = split_page(rows, page_size, json_row_key)
+        return data_response(rows, params=params, query_time=query_time, count=len(rows), next=next_cursor)
 
-@app.get("/data/bonboo/{legalCode}")
-@measure_time
-async def get_jibun_addr_list(
-    legalCode: str, 
-    request: Request, 
-    spCd: Optional[str] = "1",
-    bon: Optional[str] = None,
-    boo: Optional[str] = None,
-    api_key: str = Depends(verify_api_key)
+def build_jibun_addr_query(
+    legalCode: str,
+    spCd: Optional[str],
+    bon: Optional[str],
+    boo: Optional[str],
+    limit: Optional[int] = None,
+    after: Optional[tuple] = None,
 ):
-    # 쿼리 파라미터 가져오기
-    params = await get_query_params(request)
-    logger.info(f"지번주소 목록 조회 파라미터: {params}")
+    """
+    지번주소 목록 조회에 사용할 컴파일된 쿼리 조합과 파라미터를 선택합니다.
+    
+    Args:
+        limit: 최대 행 수 (None 이면 전체)
+        after: 이전 페이지 마지막 행의 (단지코드, 동코드, 호코드, 건축물대장PK, PNU)
     
+    Returns:
+        (준비된 쿼리 이름, 쿼리 파라미터 목록)
+    """
     # spCd 값을 데이터베이스에서 사용하는 값으로 변환 (반대 로직)
     db_spCd = None
     if spCd == "1":
@@ -474,66 +768,64 @@ async def get_jibun_addr_list(
         db_spCd = spCd
     
     logger.info(f"변환된 특수지코드: 입력={spCd}, DB용={db_spCd}")
-
-    # 기본 쿼리
-    base_query = """
-    SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 
-           읍면 AS "emd", 동리 AS "ri", 
-           CASE WHEN 특수지코드 = '0' THEN '1' 
-                WHEN 특수지코드 = '1' THEN '2' 
-                WHEN 특수지코드 = '2' THEN '3' 
-                WHEN 특수지코드 = '6' THEN '5' 
-                ELSE 특수지코드 END AS "spCd", 
-           본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 
-           동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 
-           단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 
-           건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" 
-    FROM housing_prices hp 
-    WHERE hp.법정동코드 = $1
-    """
     
-    # 조건부 쿼리 추가
-    conditions = []
-    query_params = [legalCode]  # 기본 파라미터
+    return statements.bind_template(
+        "GET_JIBUN_ADDR_TEMPLATE",
+        {"spCd": db_spCd, "bon": bon, "boo": boo, "after": after},
+        [legalCode, limit],
+    )
+
+@app.get("/data/bonboo/{legalCode}")
+@measure_time
+@cancel_on_disconnect
+async def get_jibun_addr_list(
+    legalCode: str, 
+    request: Request, 
+    spCd: Optional[str] = "1",
+    bon: Optional[str] = None,
+    boo: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    api_key: str = Depends(verify_api_key)
+):
+    # 쿼리 파라미터 가져오기
+    params = await get_query_params(request)
+    logger.info(f"지번주소 목록 조회 파라미터: {params}")
     
-    if spCd:
-        conditions.append(f"특수지코드 = ${len(query_params) + 1}")
-        query_params.append(db_spCd)
-        
-    if bon:
-        conditions.append(f"본번 = ${len(query_params) + 1}")
-        query_params.append(bon)
-        
-    if boo:
-        conditions.append(f"부번 = ${len(query_params) + 1}")
-        query_params.append(boo)
+    # 단지코드/동코드/호코드/건축물대장PK/PNU 순으로 한 페이지씩 조회 (cursor: 이전 페이지 마지막 행)
+    # 다음 페이지 존재 여부를 알 수 있도록 page_size + 1 행을 조회
+    page_size = page_limit(limit)
+    query_name, query_params = build_jibun_addr_query(legalCode, spCd, bon, boo, page_size + 1, decode_cursor(cursor))
     
-    # 조건이 있으면 쿼리에 추가
-    if conditions:
-        base_query += " AND " + " AND ".join(conditions)
+    logger.info(f"실행 쿼리: {query_name}")
+    logger.info(f"쿼리 파라미터: {log_config.clip_params(query_params)}")
     
-    logger.info(f"최종 쿼리: {base_query}")
-    logger.info(f"쿼리 파라미터: {query_params}")
+    fmt = negotiate_format(request)
+    if fmt:
+        return await query_columnar(fmt, query_name, *query_params, page_size=page_size)
     
-    async with app.state.db.acquire() as conn:
-        start_time = time.time()
-        try:
-            rows = await conn.fetch(base_query, *query_params)
-            query_time = time.time() - start_time
-            
-            logger.info(f"지번주소 목록 조회 쿼리 실행 시간: {query_time:.4f}초")
-            log_query_results(rows, "지번주소 목록 조회")
-            
-            result = [dict(row) for row in rows]
-            return {"data": result, "params": params, "query_time": query_time, "count": len(result)}
-        except Exception as e:
-            logger.error(f"쿼리 실행 오류: {str(e)}")
-            return {"error": str(e), "query": base_query, "params": query_params}
+    start_time = time.time()
+    try:
+        page, hit = await fetch_json_page(query_name, query_params, "지번주소 목록 조회", page_size=page_size)
+        query_time = time.time() - start_time
+        
+        logger.info(f"지번주소 목록 조회 쿼리 실행 시간: {query_time:.4f}초")
+        
+        response = array_data_response(page.array, params=params, query_time=query_time, count=page.count, next=page.next)
+        return cache_status(response, hit)
+    except StatementTimeout:
+        raise
+    except Exception as e:
+        # DB 오류 내용과 파라미터는 로그에만 남기고, 캐시되지 않도록 5xx 로 응답
+        logger.error(f"쿼리 실행 오류: {query_name} - {str(e)}")
+        raise HTTPException(status_code=500, detail="지번주소 목록 조회 중 오류가 발생했습니다.")
 
 async def get_pnu_by_address(address: str) -> Dict[str, Any]:
     """
     주소를 입력받아 V-World API를 통해 PNU 번호를 조회하는 함수
     
+    공용 HTTP 세션, 결과 캐시, 동시 요청 병합, 서킷 브레이커는 vworld_client 가 처리합니다.
+    
     Args:
         address: 조회할 주소 (예: "방배동 1022-3")
         
@@ -544,105 +836,7 @@ async def get_pnu_by_address(address: str) -> Dict[str, Any]:
         - status: 상태 코드
     """
     try:
-        # API 키와 기본 URL 설정
-        api_key = "319AE1D3-A638-3922-93C7-053E31B7B3DA"  # 실제 운영 환경에서는 환경 변수로 관리하는 것이 좋습니다
-        base_url = "https://api.vworld.kr/req/search"
-        
-        # 쿼리 파라미터 설정
-        params = {
-            "request": "search",
-            "key": api_key,
-            "query": address,
-            "type": "address",
-            "category": "PARCEL",
-            "size": "100",
-            "page": "1"
-        }
-        
-        # URL 인코딩 및 전체 URL 구성
-        encoded_params = urllib.parse.urlencode(params)
-        url = f"{base_url}?{encoded_params}"
-        
-        logger.info(f"V-World API 호출: {url}")
-        start_time = time.time()
-        
-        # 비동기 HTTP 요청
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                response_time = time.time() - start_time
-                logger.info(f"V-World API 응답 시간: {response_time:.4f}초")
-                
-                # 응답 상태 확인
-                if response.status != 200:
-                    logger.error(f"V-World API 오류: 상태 코드 {response.status}")
-                    return {
-                        "error": f"API 요청 실패: 상태 코드 {response.status}",
-                        "status": "error"
-                    }
-                
-                # JSON 응답 파싱
-                data = await response.json()
-                
-                # 응답 데이터 확인
-                if data.get("response", {}).get("status") != "OK":
-                    error_msg = data.get("response", {}).get("error", {}).get("text", "알 수 없는 오류")
-                    logger.error(f"V-World API 오류: {error_msg}")
-                    return {
-                        "error": f"API 응답 오류: {error_msg}",
-                        "status": "error"
-                    }
-                
-                # 결과 항목 확인
-                items = data.get("response", {}).get("result", {}).get("items", [])
-                if not items:
-                    logger.warning(f"주소 '{address}'에 대한 결과가 없습니다.")
-                    return {
-                        "error": "주소에 대한 결과가 없습니다.",
-                        "status": "not_found"
-                    }
-                
-                # 모든 결과 항목 처리
-                processed_items = []
-                for item in items:
-                    pnu = item.get("id")  # V-World API에서는 'id' 필드가 PNU입니다
-                    parcel_address = item.get("address", {}).get("parcel", "")  # 지번주소
-                    
-                    if not pnu:
-                        logger.warning(f"항목에 PNU 정보가 없습니다: {item}")
-                        continue
-                    
-                    # 결과 로깅
-                    logger.info(f"주소 '{address}'의 PNU: {pnu}, 지번주소: {parcel_address}")
-                    
-                    # 필요한 주소 정보 추출
-                    address_info = {
-                        "pnu": pnu,
-                        "parcel_address": parcel_address,
-                        "road_address": item.get("address", {}).get("road", ""),
-                        "sido": item.get("address", {}).get("sido", ""),
-                        "sigungu": item.get("address", {}).get("sigungu", ""),
-                        "zipcode": item.get("address", {}).get("zipcode", ""),
-                        "bldnm": item.get("address", {}).get("bldnm", ""),
-                        "point": item.get("point", {})
-                    }
-                    
-                    processed_items.append({
-                        "pnu": pnu,
-                        "parcel_address": parcel_address,
-                        "address_info": address_info
-                    })
-                
-                if not processed_items:
-                    return {
-                        "error": "유효한 PNU 정보가 없습니다.",
-                        "status": "no_valid_pnu"
-                    }
-                
-                return {
-                    "items": processed_items,
-                    "status": "success"
-                }
-                
+        return await vworld_client.search(address)
     except Exception as e:
         logger.error(f"PNU 조회 중 오류 발생: {str(e)}")
         return {
@@ -650,8 +844,20 @@ async def get_pnu_by_address(address: str) -> Dict[str, Any]:
             "status": "error"
         }
 
+@app.post("/admin/dataset-version/refresh")
+async def refresh_dataset_version(api_key: str = Depends(verify_admin_key)):
+    """데이터 적재 후 데이터셋 버전을 다시 읽어 ETag 를 갱신합니다."""
+    await dataset_version.refresh(app.state.db)
+    return dataset_version.stats()
+
+@app.get("/admin/vworld/stats")
+async def get_vworld_stats(api_key: str = Depends(verify_admin_key)):
+    """V-World 캐시 적중률, 진행 중인 호출 수, 서킷 브레이커 상태를 반환합니다."""
+    return vworld_client.stats()
+
 @app.get("/data/jibunAddr/{address}")
 @measure_time
+@cancel_on_disconnect
 async def address_to_pnu(address: str, request: Request, api_key: str = Depends(verify_api_key)):
     """
     주소를 PNU 번호로 변환하는 API 엔드포인트
@@ -678,41 +884,38 @@ async def address_to_pnu(address: str, request: Request, api_key: str = Depends(
             "status": result.get("status")
         }
     
-    # 2. 모든 PNU에 대해 데이터베이스 조회
+    # 2. 모든 PNU를 한 번에 데이터베이스 조회 (커넥션 하나에서 청크 단위 일괄 조회)
+    items = result.get("items", [])
+    rows_by_pnu, errors = await fetch_pnu_rows(app.state.db, [item.get("pnu") for item in items])
+    
+    # 3. 조회 결과에 지번주소(parcel)를 붙여 V-World 결과 순서대로 구성
     all_results = []
     processed_count = 0
     
-    for item in result.get("items", []):
+    for item in items:
         pnu = item.get("pnu")
         parcel_address = item.get("parcel_address", "")
-        
-        try:
-            async with app.state.db.acquire() as conn:
-                query = queries["GET_PNU_DATA"]
-                logger.info(f"PNU {pnu} 조회 쿼리 실행")
-                rows = await conn.fetch(query, pnu)
-                
-                # 3. 데이터가 있으면 결과에 추가
-                if rows:
-                    # 결과 데이터 변환
-                    result_data = [dict(row) for row in rows]
-                    
-                    # 각 결과 항목에 지번주소(parcel) 추가
-                    for row_item in result_data:
-                        row_item["parcel"] = parcel_address
-                        all_results.append(row_item)
-                    
-                    processed_count += 1
-                    logger.info(f"PNU {pnu}에 대한 데이터 {len(result_data)}건 조회 완료")
-                else:
-                    logger.info(f"PNU {pnu}에 대한 데이터가 없습니다")
-        except Exception as e:
-            logger.error(f"PNU {pnu} 데이터 조회 중 오류: {str(e)}")
+        rows = rows_by_pnu.get(pnu)
+        
+        if pnu in errors:
+            logger.error(f"PNU {pnu} 데이터 조회 중 오류: {errors[pnu]}")
+        elif rows:
+            for row in rows:
+                row_item = dict(row)
+                row_item["parcel"] = parcel_address
+                all_results.append(row_item)
+            processed_count += 1
+        else:
+            logger.info(f"PNU {pnu}에 대한 데이터가 없습니다")
     
     # 쿼리 실행 시간 계산
     query_time = time.time() - start_time
     
     # 4. 최종 결과 반환
+    fmt = negotiate_format(request)
+    if fmt:
+        return await columnar_response(fmt, *records_to_rows(all_results))
+    
     return {
         "data": all_results,
         "params": params,
@@ -722,6 +925,52 @@ async def address_to_pnu(address: str, request: Request, api_key: str = Depends(
         "total_pnu_count": len(result.get("items", []))
     }
 
+# 다운로드 엔드포인트 (/download/ 접두사, DB 에서 CSV 로 바로 스트리밍)
+@app.get("/download/data/bldgReg/{bldgReg}")
+async def download_building_data(bldgReg: str, request: Request, api_key: str = Depends(verify_api_key)):
+    return await export_response(app.state.db, request, statements.queries["GET_BUILDING_LEDGER"], [bldgReg])
+
+@app.get("/download/data/pnu/{pnu}")
+async def download_pnu_data(pnu: str, request: Request, api_key: str = Depends(verify_api_key)):
+    return await export_response(app.state.db, request, statements.queries["GET_PNU_DATA"], [pnu])
+
+@app.post("/download/data/pnu")
+async def download_pnu_list(request: Request, pnu_request: PnuListRequest, api_key: str = Depends(verify_api_key)):
+    return await export_response(app.state.db, request, statements.queries["GET_PNU_DATA_BATCH"], [pnu_request.pnu_list])
+
+@app.get("/download/data/sido")
+async def download_sido_list(request: Request, api_key: str = Depends(verify_api_key)):
+    return await export_response(app.state.db, request, statements.queries["GET_SIDO_LIST"], [])
+
+@app.get("/download/data/sigungu/{sidoCd}")
+async def download_sigungu_list(sidoCd: str, request: Request, api_key: str = Depends(verify_api_key)):
+    return await export_response(app.state.db, request, statements.queries["GET_SIGUNGU_LIST"], [sidoCd])
+
+@app.get("/download/data/emd/{sigunguCd}")
+async def download_emd_list(sigunguCd: str, request: Request, api_key: str = Depends(verify_api_key)):
+    return await export_response(app.state.db, request, statements.queries["GET_EMD_LIST"], [sigunguCd])
+
+@app.get("/download/data/ri/{emdCd}")
+async def download_ri_list(emdCd: str, request: Request, api_key: str = Depends(verify_api_key)):
+    return await export_response(app.state.db, request, statements.queries["GET_RI_LIST"], [emdCd])
+
+@app.get("/download/data/roadAddr/{roadAddr}")
+async def download_road_addr_list(roadAddr: str, request: Request, api_key: str = Depends(verify_api_key)):
+    query_name, query_params = road_addr_search.plan(roadAddr)
+    return await export_response(app.state.db, request, statements.queries[query_name], query_params)
+
+@app.get("/download/data/bonboo/{legalCode}")
+async def download_jibun_addr_list(
+    legalCode: str, 
+    request: Request, 
+    spCd: Optional[str] = "1",
+    bon: Optional[str] = None,
+    boo: Optional[str] = None,
+    api_key: str = Depends(verify_api_key)
+):
+    query_name, query_params = build_jibun_addr_query(legalCode, spCd, bon, boo)
+    return await export_response(app.state.db, request, statements.queries[query_name], query_params)
+
 # 추가: 메인 블록 - 서버 실행 부분
 if __name__ == "__main__":
     import uvicorn
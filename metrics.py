@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import os
+from bisect import bisect_left
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from starlette.routing import Match
+
+try:
+    import psutil
+except ImportError:  # psutil 이 없으면 프로세스 메모리 지표를 생략
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+# 프로세스 메모리 등 주기 지표 수집 간격 (초)
+METRICS_SAMPLE_SECONDS = float(os.getenv("METRICS_SAMPLE_SECONDS", "15"))
+# 경로 → 라우트 템플릿 변환 결과를 보관할 최대 경로 수
+METRICS_ROUTE_CACHE_SIZE = int(os.getenv("METRICS_ROUTE_CACHE_SIZE", "10000"))
+
+# 지연 시간(초), 응답 크기(바이트) 히스토그램 구간
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """라벨별 누적 카운터"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """라벨별 현재 값"""
+
+    type_name = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - amount
+
+    def set(self, value: float, labels: Labels = ()) -> None:
+        self.values[labels] = value
+
+
+class _HistogramValue:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+
+
+class Histogram:
+    """
+    라벨별 히스토그램
+
+    관측 시에는 해당 구간 하나만 증가시키고, 누적 값은 /metrics 출력 시 계산합니다.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.values: Dict[Labels, _HistogramValue] = {}
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        histogram = self.values.get(labels)
+        if histogram is None:
+            histogram = self.values[labels] = _HistogramValue(len(self.buckets))
+        histogram.counts[bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, histogram in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(histogram.sum)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    프로세스 내 지표 저장소 (Prometheus 텍스트 형식으로 출력)
+
+    모든 기록은 이벤트 루프 스레드에서 dict 갱신만 수행하므로 잠금이 필요 없습니다.
+    """
+
+    def __init__(self):
+        self.metrics: List[Any] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """/metrics 출력 직전에 호출할 함수 (커넥션 풀 크기 등 현재 값 갱신)"""
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"지표 수집 중 오류 발생: {str(e)}")
+
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "처리 중인 요청 수", ("method", "route"))
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "요청 처리 시간 (응답 본문 전송 완료까지)", ("method", "route"))
+http_response_size_bytes = registry.histogram(
+    "http_response_size_bytes", "응답 본문 크기", ("method", "route"), buckets=SIZE_BUCKETS)
+http_responses_total = registry.counter(
+    "http_responses_total", "상태 코드별 응답 수", ("method", "route", "status"))
+db_pool_acquire_wait_seconds = registry.histogram(
+    "db_pool_acquire_wait_seconds", "커넥션 풀에서 커넥션을 얻기까지 기다린 시간 (요청 작업 부류별)", ("workload",))
+workload_admission_wait_seconds = registry.histogram(
+    "workload_admission_wait_seconds", "작업 부류의 자리를 얻기까지 기다린 시간", ("workload",))
+workload_rejections_total = registry.counter(
+    "workload_rejections_total", "작업 부류 포화로 503 거절한 요청 수", ("workload", "reason"))
+workload_requests = registry.gauge(
+    "workload_requests", "작업 부류별 처리 중/대기 중인 요청 수", ("workload", "state"))
+db_pool_connections = registry.gauge(
+    "db_pool_connections", "노드별 커넥션 풀의 커넥션 수", ("node", "state"))
+db_node_outstanding = registry.gauge(
+    "db_node_outstanding", "노드별 커넥션을 기다리거나 사용 중인 요청 수", ("node",))
+db_node_healthy = registry.gauge(
+    "db_node_healthy", "노드가 읽기 분산 대상이면 1", ("node",))
+api_key_rejections_total = registry.counter(
+    "api_key_rejections_total", "API 키 인증/한도 초과로 거부한 요청 수", ("reason",))
+result_cache_requests_total = registry.counter(
+    "result_cache_requests_total", "결과 캐시 조회 수 (hit/miss/coalesced)", ("result",))
+result_cache_bytes = registry.gauge(
+    "result_cache_bytes", "결과 캐시에 저장된 바이트 수")
+result_cache_entries = registry.gauge(
+    "result_cache_entries", "결과 캐시 항목 수")
+db_statement_timeouts_total = registry.counter(
+    "db_statement_timeouts_total", "작업 부류의 쿼리 제한 시간을 넘어 취소한 쿼리 수", ("workload",))
+http_client_disconnects_total = registry.counter(
+    "http_client_disconnects_total", "클라이언트 연결이 끊겨 처리를 중단한 요청 수", ("workload",))
+db_query_duration_seconds = registry.histogram(
+    "db_query_duration_seconds", "이름 있는 쿼리의 실행 시간", ("query",))
+process_resident_memory_bytes = registry.gauge(
+    "process_resident_memory_bytes", "프로세스 상주 메모리 (주기적으로 수집)")
+process_cpu_seconds_total = registry.gauge(
+    "process_cpu_seconds_total", "프로세스 누적 CPU 사용 시간 (주기적으로 수집)")
+
+
+_route_cache: Dict[Tuple[str, str], str] = {}
+
+
+def route_label(request) -> str:
+    """
+    요청 경로를 라우트 템플릿으로 바꿉니다. (예: /data/pnu/1111 → /data/pnu/{pnu})
+
+    실제 경로를 라벨로 쓰면 지표 개수가 끝없이 늘어나므로 템플릿 단위로 집계합니다.
+    경로별 결과는 캐시하여 라우트 매칭은 처음 한 번만 수행합니다.
+    """
+    scope = request.scope
+    key = (scope["method"], scope["path"])
+    label = _route_cache.get(key)
+    if label is not None:
+        return label
+
+    label = "unmatched"
+    for route in request.app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            label = getattr(route, "path", label)
+            break
+
+    if len(_route_cache) >= METRICS_ROUTE_CACHE_SIZE:
+        _route_cache.clear()
+    _route_cache[key] = label
+    return label
+
+
+def observe_response(labels: Labels, status: int, elapsed: float, size: Optional[int]) -> None:
+    http_requests_in_flight.dec(labels)
+    http_request_duration_seconds.observe(elapsed, labels)
+    http_responses_total.inc(labels + (str(status),))
+    if size is not None:
+        http_response_size_bytes.observe(size, labels)
+
+
+async def count_body(body_iterator: AsyncIterator[bytes], on_complete: Callable[[int], None]) -> AsyncIterator[bytes]:
+    """스트리밍 응답 본문을 그대로 전달하면서 전송된 바이트 수를 셉니다."""
+    size = 0
+    try:
+        async for chunk in body_iterator:
+            size += len(chunk)
+            yield chunk
+    finally:
+        on_complete(size)
+
+
+def sample_process() -> None:
+    if psutil is None:
+        return
+    process = psutil.Process()
+    process_resident_memory_bytes.set(process.memory_info().rss)
+    cpu_times = process.cpu_times()
+    process_cpu_seconds_total.set(cpu_times.user + cpu_times.system)
+
+
+async def run_process_sampler(interval: float = METRICS_SAMPLE_SECONDS) -> None:
+    """프로세스 메모리/CPU 사용량을 요청과 무관하게 주기적으로 수집합니다."""
+    while True:
+        try:
+            sample_process()
+        except Exception as e:
+            logger.error(f"프로세스 지표 수집 중 오류 발생: {str(e)}")
+        await asyncio.sleep(interval)
+
+
+def watch_pool(pool) -> None:
+    """/metrics 출력 시 노드별 커넥션 풀 크기와 상태를 함께 내보냅니다."""
+    def collect():
+        for node in pool.nodes:
+            labels = (node.name,)
+            db_node_outstanding.set(node.outstanding, labels)
+            db_node_healthy.set(1 if node.healthy else 0, labels)
+            if node.pool is not None:
+                db_pool_connections.set(node.pool.get_size(), (node.name, "total"))
+                db_pool_connections.set(node.pool.get_idle_size(), (node.name, "idle"))
+    registry.add_collector(collect)
@@ -0,0 +1,69 @@
+import base64
+import json
+import os
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+# 페이지당 기본 행 수와 최대 행 수 (limit 파라미터가 최대값을 넘으면 최대값으로 제한)
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "1000"))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "5000"))
+
+# 페이지 정렬 기준 (한 호를 식별하는 코드 조합 + 같은 코드의 행을 구분하는 건축물대장PK, PNU)
+# 페이지 경계에서 행을 건너뛰지 않도록 전체가 유일해야 합니다. (sql/keyset_pagination.sql 의 유일 인덱스)
+KEYSET_COLUMNS = ("단지코드", "동코드", "호코드", "건축물대장PK", "PNU")
+# 응답 행에서 정렬 기준 값을 읽을 컬럼 별칭
+KEYSET_ALIASES = ("cmpCd", "dongCd", "hoCd", "bldbLedgerPK", "PNU")
+
+CursorKey = Tuple[str, str, str, str, str]
+
+
+def page_limit(limit: Optional[int]) -> int:
+    """요청한 limit 을 1 ~ PAGE_MAX_LIMIT 범위로 맞춥니다. (생략 시 PAGE_DEFAULT_LIMIT)"""
+    if limit is None:
+        return PAGE_DEFAULT_LIMIT
+    return max(1, min(limit, PAGE_MAX_LIMIT))
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """마지막 행의 정렬 기준 값을 다음 페이지 요청용 커서 문자열로 만듭니다."""
+    raw = json.dumps(list(key), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[CursorKey]:
+    """커서 문자열을 정렬 기준 값으로 되돌립니다. (잘못된 커서면 400)"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+    if not isinstance(key, list) or len(key) != len(KEYSET_COLUMNS) or not all(isinstance(v, str) for v in key):
+        raise HTTPException(status_code=400, detail="잘못된 cursor 값입니다.")
+    return tuple(key)
+
+
+def split_page(rows: List[Any], limit: int, key_of: Callable[[Any], Sequence[Any]]) -> Tuple[List[Any], Optional[str]]:
+    """
+    limit + 1 행으로 조회한 결과를 이번 페이지 행과 다음 페이지 커서로 나눕니다.
+
+    Returns:
+        (이번 페이지 행 목록, 다음 페이지 커서 / 마지막 페이지면 None)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key_of(rows[-1]))
+
+
+def record_key(row) -> CursorKey:
+    """asyncpg Record 에서 정렬 기준 값을 읽습니다."""
+    return tuple(row[alias] for alias in KEYSET_ALIASES)
+
+
+def json_row_key(row: str) -> CursorKey:
+    """DB 에서 JSON 문자열로 받은 행에서 정렬 기준 값을 읽습니다."""
+    values = json.loads(row)
+    return tuple(values[alias] for alias in KEYSET_ALIASES)
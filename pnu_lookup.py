@@ -0,0 +1,56 @@
+import logging
+import os
+import time
+from typing import Any, Dict, List, Sequence, Tuple
+
+from statement_registry import statements
+
+logger = logging.getLogger(__name__)
+
+# 한 번의 쿼리로 조회할 최대 PNU 개수
+PNU_BATCH_CHUNK_SIZE = int(os.getenv("PNU_BATCH_CHUNK_SIZE", "1000"))
+
+
+def _chunked(items: Sequence[str], size: int) -> List[List[str]]:
+    return [list(items[i:i + size]) for i in range(0, len(items), size)]
+
+
+async def fetch_pnu_rows(pool, pnu_list: Sequence[str]) -> Tuple[Dict[str, List[Any]], Dict[str, str]]:
+    """
+    PNU 목록을 배열 파라미터(= ANY($1)) 쿼리로 일괄 조회합니다.
+
+    중복을 제거한 PNU 를 PNU_BATCH_CHUNK_SIZE 단위로 나누어 커넥션 하나에서 차례로 조회합니다.
+    (한 요청이 커넥션을 하나만 쓰므로 scan 부류 요청이 몰려도 단건 조회가 커넥션을 기다리지 않음)
+
+    Args:
+        pool: asyncpg 커넥션 풀
+        pnu_list: 조회할 PNU 목록
+
+    Returns:
+        (PNU별 결과 행 목록, 조회 중 오류가 발생한 PNU별 오류 메시지)
+    """
+    unique_pnus = list(dict.fromkeys(pnu_list))
+    rows_by_pnu: Dict[str, List[Any]] = {pnu: [] for pnu in unique_pnus}
+    errors: Dict[str, str] = {}
+    if not unique_pnus:
+        return rows_by_pnu, errors
+
+    chunks = _chunked(unique_pnus, PNU_BATCH_CHUNK_SIZE)
+    start_time = time.time()
+    async with pool.acquire() as conn:
+        for chunk in chunks:
+            try:
+                rows = await statements.fetch(conn, "GET_PNU_DATA_BATCH", chunk)
+            except Exception as e:
+                logger.error(f"PNU 일괄 조회 중 오류 발생 ({len(chunk)}건): {str(e)}")
+                for pnu in chunk:
+                    errors[pnu] = f"오류: {str(e)}"
+                continue
+            for row in rows:
+                rows_by_pnu.setdefault(row["PNU"], []).append(row)
+
+    logger.info(
+        f"PNU 일괄 조회 완료: 요청 {len(pnu_list)}건 (중복 제외 {len(unique_pnus)}건), "
+        f"쿼리 {len(chunks)}회, 실행 시간: {time.time() - start_time:.4f}초"
+    )
+    return rows_by_pnu, errors
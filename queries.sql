@@ -7,6 +7,9 @@ GET_BUILDING_LEDGER=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roa
 -- PNU 단건 조회
 GET_PNU_DATA=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.pnu = $1;
 
+-- PNU 목록 일괄 조회 ($1: PNU 배열, 요청 순서대로 반환)
+GET_PNU_DATA_BATCH=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", hp.PNU AS "PNU" FROM unnest($1::text[]) WITH ORDINALITY AS req(pnu, ord) JOIN housing_prices hp ON hp.pnu = req.pnu ORDER BY req.ord;
+
 -- 시도 목록 조회
 GET_SIDO_LIST=SELECT DISTINCT 시도코드 AS "sidoCd", 시도 AS "sido" FROM ADDR_STEP ORDER BY 시도코드;
 
@@ -19,10 +22,32 @@ GET_EMD_LIST=SELECT DISTINCT 시도코드 as "sidoCd", 시도 as "sido", 시군
 -- 동리 목록 조회
 GET_RI_LIST=SELECT DISTINCT 시도코드 AS "sidoCd", 시도 as "sido", 시군구코드 AS "sigunguCd", 시군구 as "sigungu", 읍면코드 AS "emdCd", 읍면 as "emd", 동리코드 AS "riCd", 동리 as "ri" FROM ADDR_STEP WHERE 읍면코드 LIKE $1 || '%' ORDER BY ri;
 
--- 도로명주소 조회
-GET_ROAD_ADDR_LIST=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.도로명주소 LIKE '%' || $1 || '%';
+-- 주소 단계 전체 조회 (주소 캐시 적재용)
+GET_ADDR_STEP_ALL=SELECT DISTINCT 시도코드 AS "sidoCd", 시도 AS "sido", 시군구코드 AS "sigunguCd", 시군구 AS "sigungu", 읍면코드 AS "emdCd", 읍면 AS "emd", 동리코드 AS "riCd", 동리 AS "ri" FROM ADDR_STEP;
+
+-- 도로명주소 조회 (최대 행 수 $2, NULL 이면 전체)
+GET_ROAD_ADDR_LIST=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.도로명주소 LIKE '%' || $1 || '%' LIMIT $2;
+
+-- 도로명주소 목록으로 조회 (검색 인덱스로 찾은 주소 배열 $1, 최대 행 수 $2)
+GET_ROAD_ADDR_BY_ADDRS=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.도로명주소 = ANY($1::text[]) LIMIT $2;
+
+-- 도로명주소 조회 페이지 (단지코드/동코드/호코드/건축물대장PK/PNU 순, 최대 행 수 $2)
+GET_ROAD_ADDR_PAGE=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.도로명주소 LIKE '%' || $1 || '%' ORDER BY 단지코드, 동코드, 호코드, 건축물대장PK, PNU LIMIT $2;
+
+-- 도로명주소 조회 다음 페이지 ($3~$7: 이전 페이지 마지막 행의 단지코드, 동코드, 호코드, 건축물대장PK, PNU)
+GET_ROAD_ADDR_PAGE_AFTER=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.도로명주소 LIKE '%' || $1 || '%' AND (단지코드, 동코드, 호코드, 건축물대장PK, PNU) > ($3, $4, $5, $6, $7) ORDER BY 단지코드, 동코드, 호코드, 건축물대장PK, PNU LIMIT $2;
 
--- 지번주소 조회 (본번과 부번은 옵션)
+-- 도로명주소 목록으로 조회 페이지 (검색 인덱스로 찾은 주소 배열 $1, 최대 행 수 $2)
+GET_ROAD_ADDR_BY_ADDRS_PAGE=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.도로명주소 = ANY($1::text[]) ORDER BY 단지코드, 동코드, 호코드, 건축물대장PK, PNU LIMIT $2;
+
+-- 도로명주소 목록으로 조회 다음 페이지 ($3~$7: 이전 페이지 마지막 행의 단지코드, 동코드, 호코드, 건축물대장PK, PNU)
+GET_ROAD_ADDR_BY_ADDRS_PAGE_AFTER=SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" FROM housing_prices hp WHERE hp.도로명주소 = ANY($1::text[]) AND (단지코드, 동코드, 호코드, 건축물대장PK, PNU) > ($3, $4, $5, $6, $7) ORDER BY 단지코드, 동코드, 호코드, 건축물대장PK, PNU LIMIT $2;
+
+-- 고유 도로명주소 목록 (검색 인덱스 구성용)
+GET_ROAD_ADDR_DISTINCT=SELECT DISTINCT 도로명주소 FROM housing_prices;
+
+-- 지번주소 조회 (특수지코드, 본번, 부번, 다음 페이지 조건은 옵션 / $10: 최대 행 수, NULL 이면 전체)
+-- 시작 시 블록 조합별 쿼리(GET_JIBUN_ADDR_TEMPLATE__spCd_bon 등)로 컴파일되어 미리 준비됩니다.
 GET_JIBUN_ADDR_TEMPLATE=<<SQL
 SELECT 법정동코드 AS "legalCd", 도로명주소 AS "roadAddr", 시도 AS "sido", 시군구 AS "sigungu", 읍면 AS "emd", 동리 AS "ri", CASE WHEN 특수지코드 = '0' THEN '1' WHEN 특수지코드 = '1' THEN '2' WHEN 특수지코드 = '2' THEN '3' WHEN 특수지코드 = '6' THEN '5' ELSE 특수지코드 END AS "spCd", 본번 AS "bon", 부번 AS "boo", 특수지명 AS "spNm", 단지명 AS "cmpNm", 동명 AS "dongNm", 호명 AS "hoNm", 전용면적 AS "exArea", 공시가격 AS "pubPrice", 단지코드 AS "cmpCd", 동코드 AS "dongCd", 호코드 AS "hoCd", 건축물대장PK AS "bldbLedgerPK", "(구)건축물대장PK" AS "oldBldbLedgerPK", PNU AS "PNU" 
 FROM housing_prices hp 
@@ -36,4 +61,9 @@ AND 본번 = $3
 {% if boo %}
 AND 부번 = $4
 {% endif %}
+{% if after %}
+AND (단지코드, 동코드, 호코드, 건축물대장PK, PNU) > ($5, $6, $7, $8, $9)
+{% endif %}
+ORDER BY 단지코드, 동코드, 호코드, 건축물대장PK, PNU
+LIMIT $10
 SQL
\ No newline at end of file
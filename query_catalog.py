@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+from query_loader import QUERIES_FILE, load_queries
+from statement_registry import StatementRegistry, build_queries, preparable, statements
+
+logger = logging.getLogger(__name__)
+
+# 쿼리 파일 변경 확인 간격 (초, 0이면 감시하지 않고 관리자 API 로만 다시 읽음)
+QUERIES_RELOAD_SECONDS = float(os.getenv("QUERIES_RELOAD_SECONDS", "5"))
+
+# PostgreSQL 16 부터 매개변수 값 없이 일반 실행 계획을 확인할 수 있음
+GENERIC_PLAN_MIN_MAJOR = 16
+
+
+class QueryCatalog:
+    """
+    queries.sql 을 감시하여 서비스 재시작 없이 쿼리를 교체하는 카탈로그
+
+    파일이 바뀌면 새로 파싱하고, 모든 쿼리를 DB 에서 준비(PREPARE)해 보고
+    (PostgreSQL 16 이상이면 EXPLAIN (GENERIC_PLAN) 으로 실행 계획까지) 실행하지 않고 검증합니다.
+    하나라도 실패하면 기존 쿼리를 그대로 사용하고 오류를 기록합니다.
+    검증을 통과하면 statement_registry 의 쿼리 목록을 한 번에 교체하며,
+    이미 열린 커넥션은 다음 사용 시 바뀐 쿼리만 다시 준비합니다.
+    """
+
+    def __init__(self, registry: StatementRegistry, file_path: str):
+        self.registry = registry
+        self.file_path = file_path
+        self.mtime: Optional[float] = self._read_mtime()
+        self.loaded_at: Optional[float] = time.time()
+        self.last_checked_at: Optional[float] = None
+        self.reloads = 0
+        # 마지막 검증 실패 내역 (이름 → 오류 메시지, 파일 파싱 오류는 "<file>")
+        self.errors: Dict[str, str] = {}
+        self._lock = asyncio.Lock()
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.file_path).st_mtime
+        except OSError:
+            return None
+
+    async def validate(self, pool, queries: Dict[str, str]) -> Dict[str, str]:
+        """
+        쿼리를 실행하지 않고 준비(및 일반 실행 계획 확인)만 해 봅니다.
+
+        Returns:
+            실패한 쿼리 이름 → 오류 메시지 (모두 통과하면 빈 dict)
+        """
+        errors = {}
+        async with pool.acquire() as conn:
+            generic_plan = conn.get_server_version().major >= GENERIC_PLAN_MIN_MAJOR
+            for name, sql in preparable(queries).items():
+                try:
+                    await conn.prepare(sql)
+                    if generic_plan:
+                        await conn.execute(f"EXPLAIN (GENERIC_PLAN) {sql.strip().rstrip(';')}")
+                except Exception as e:
+                    errors[name] = str(e)
+        return errors
+
+    async def reload(self, pool, force: bool = False) -> Dict[str, Any]:
+        """
+        쿼리 파일이 바뀌었으면(force 면 항상) 다시 읽고 검증한 뒤 교체합니다.
+
+        Returns:
+            stats() 결과
+        """
+        async with self._lock:
+            self.last_checked_at = time.time()
+            mtime = self._read_mtime()
+            if not force and mtime == self.mtime:
+                return self.stats()
+
+            try:
+                queries, templates = build_queries(load_queries(self.file_path))
+            except Exception as e:
+                # 파일 파싱/템플릿 컴파일 오류: 같은 파일로 다시 시도하지 않도록 mtime 은 기록
+                self.mtime = mtime
+                self.errors = {"<file>": str(e)}
+                logger.error(f"쿼리 파일 파싱 실패, 기존 쿼리를 유지합니다: {str(e)}")
+                return self.stats()
+
+            errors = await self.validate(pool, queries)
+            self.mtime = mtime
+            if errors:
+                self.errors = errors
+                for name, message in errors.items():
+                    logger.error(f"쿼리 검증 실패: {name}, {message}")
+                logger.error(f"쿼리 {len(errors)}개 검증 실패, 기존 쿼리를 유지합니다.")
+                return self.stats()
+
+            changed = sorted(name for name, sql in queries.items() if self.registry.queries.get(name) != sql)
+            self.registry.swap(queries, templates)
+            self.errors = {}
+            self.reloads += 1
+            self.loaded_at = time.time()
+            logger.info(f"쿼리 목록 교체 완료: 변경/추가 {len(changed)}개, 세대 {self.registry.generation}")
+            return self.stats()
+
+    async def run_watcher(self, pool, interval: float) -> None:
+        """interval 초마다 쿼리 파일 변경을 확인합니다. (lifespan 에서 태스크로 실행)"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload(pool)
+            except Exception as e:
+                logger.error(f"쿼리 파일 다시 읽기 중 오류 발생: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "file": self.file_path,
+            "generation": self.registry.generation,
+            "reloads": self.reloads,
+            "loaded_at": self.loaded_at,
+            "last_checked_at": self.last_checked_at,
+            "query_count": len(self.registry.queries),
+            "errors": self.errors,
+            "prepare_errors": self.registry.prepare_errors,
+        }
+
+
+query_catalog = QueryCatalog(statements, QUERIES_FILE)
@@ -1,3 +1,8 @@
+import os
+
+# 쿼리 파일 경로
+QUERIES_FILE = os.getenv("QUERIES_FILE", "queries.sql")
+
 def load_queries(file_path):
     queries = {}
     current_query_id = None
@@ -42,4 +47,4 @@ def load_queries(file_path):
                 
     return queries
 
-queries = load_queries("queries.sql")
+queries = load_queries(QUERIES_FILE)
@@ -1,10 +1,28 @@
+import functools
+import itertools
+import logging
 import re
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
 
-def parse_template(template: str, params: Dict[str, Any]) -> Tuple[str, List[Any]]:
+logger = logging.getLogger(__name__)
+
+# {% if 변수 %} ... {% endif %} 블록 (중첩 없음)
+_BLOCK_PATTERN = re.compile(r'{%\s*if\s+(\w+)\s*%}(.*?){%\s*endif\s*%}', re.DOTALL)
+_PLACEHOLDER_PATTERN = re.compile(r'\$(\d+)')
+
+
+class TemplateVariant(NamedTuple):
+    """활성 블록 조합 하나에 해당하는 완성된 쿼리"""
+    name: str
+    sql: str
+    # 새 자리표시자 순서대로 값을 가져올 곳: (블록 변수명 또는 None(기본 부분), 순번)
+    sources: Tuple[Tuple[Optional[str], int], ...]
+
+
+class CompiledTemplate:
     """
-    조건부 쿼리 템플릿을 파싱하여 실행 가능한 쿼리와 매개변수 목록을 반환합니다.
-    
+    조건부 쿼리 템플릿을 한 번 파싱하여 모든 블록 조합의 쿼리를 미리 만들어 둔 것
+
     예시 템플릿:
     ```
     SELECT * FROM table
@@ -16,34 +34,111 @@ def parse_template(template: str, params: Dict[str, Any]) -> Tuple[str, List[Any
     AND condition3 = $3
     {% endif %}
     ```
+    블록이 빠진 조합은 남은 자리표시자를 원래 번호 순으로 $1 부터 다시 매깁니다.
+    (예: param2 없이 param3 만 있으면 condition3 = $2)
+
+    값 연결 규칙:
+        - 블록 밖의 자리표시자는 base_args 를 원래 번호 순으로 사용
+        - 블록 안의 자리표시자는 그 블록 변수의 값을 사용
+          (자리표시자가 여러 개면 값(튜플)의 원소를 원래 번호 순으로 사용)
+    """
+
+    def __init__(self, name: str, template: str):
+        self.name = name
+        self.template = template
+
+        segments: List[Tuple[Optional[str], str]] = []
+        position = 0
+        for match in _BLOCK_PATTERN.finditer(template):
+            segments.append((None, template[position:match.start()]))
+            segments.append((match.group(1), match.group(2)))
+            position = match.end()
+        segments.append((None, template[position:]))
+        if '{%' in ''.join(text for _, text in segments):
+            raise ValueError(f"{name}: 닫히지 않았거나 지원하지 않는 템플릿 태그가 있습니다.")
+
+        self.block_names: List[str] = list(dict.fromkeys(block for block, _ in segments if block))
+
+        # 원래 자리표시자 번호 → 값을 가져올 곳
+        owners: Dict[int, Optional[str]] = {}
+        for block, text in segments:
+            for number in map(int, _PLACEHOLDER_PATTERN.findall(text)):
+                if owners.setdefault(number, block) != block:
+                    raise ValueError(f"{name}: ${number} 가 여러 블록에서 사용됩니다.")
+        positions: Dict[Optional[str], List[int]] = {}
+        for number in sorted(owners):
+            positions.setdefault(owners[number], []).append(number)
+        source_of = {
+            number: (block, numbers.index(number))
+            for block, numbers in positions.items() for number in numbers
+        }
+
+        self.variants: Dict[FrozenSet[str], TemplateVariant] = {}
+        for flags in itertools.product((False, True), repeat=len(self.block_names)):
+            active = frozenset(block for block, on in zip(self.block_names, flags) if on)
+            self.variants[active] = self._compile_variant(segments, active, source_of)
+
+    def _variant_name(self, active: FrozenSet[str]) -> str:
+        suffix = "_".join(block for block in self.block_names if block in active) or "BASE"
+        return f"{self.name}__{suffix}"
+
+    def _compile_variant(self, segments, active: FrozenSet[str], source_of) -> TemplateVariant:
+        sql = "".join(text for block, text in segments if block is None or block in active)
+        originals = sorted({int(number) for number in _PLACEHOLDER_PATTERN.findall(sql)})
+        renumber = {old: new for new, old in enumerate(originals, 1)}
+        sql = _PLACEHOLDER_PATTERN.sub(lambda m: f"${renumber[int(m.group(1))]}", sql)
+        # 빈 줄 정리 (블록 태그가 있던 줄)
+        sql = "\n".join(line for line in sql.split("\n") if line.strip())
+        return TemplateVariant(self._variant_name(active), sql, tuple(source_of[number] for number in originals))
+
+    def bind(self, params: Dict[str, Any], base_args: Sequence[Any] = ()) -> Tuple[TemplateVariant, List[Any]]:
+        """
+        값이 있는(참인) 변수의 블록만 포함한 쿼리와 그 순서에 맞춘 매개변수 목록을 반환합니다.
+
+        Args:
+            params: 블록 변수명 → 값
+            base_args: 블록 밖 자리표시자 값 (원래 번호 순)
+        """
+        active = frozenset(block for block in self.block_names if params.get(block))
+        variant = self.variants[active]
+        args = []
+        for block, index in variant.sources:
+            if block is None:
+                args.append(base_args[index] if index < len(base_args) else None)
+            else:
+                value = params[block]
+                args.append(value[index] if isinstance(value, (list, tuple)) else value)
+        return variant, args
+
+    def named_queries(self) -> Dict[str, str]:
+        """미리 만든 모든 조합의 쿼리 (이름 → SQL)"""
+        return {variant.name: variant.sql for variant in self.variants.values()}
+
+
+def is_template(sql: str) -> bool:
+    return '{%' in sql
+
+
+def compile_templates(queries: Dict[str, str]) -> Dict[str, CompiledTemplate]:
+    """queries.sql 의 조건부 템플릿을 모두 컴파일합니다."""
+    templates = {}
+    for name, sql in queries.items():
+        if is_template(sql):
+            templates[name] = CompiledTemplate(name, sql)
+            logger.info(f"쿼리 템플릿 컴파일: {name}, 조합 {len(templates[name].variants)}개")
+    return templates
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_cached(template: str) -> CompiledTemplate:
+    return CompiledTemplate("TEMPLATE", template)
+
+
+def parse_template(template: str, params: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """
+    조건부 쿼리 템플릿을 파싱하여 실행 가능한 쿼리와 매개변수 목록을 반환합니다.
+
+    컴파일 결과는 템플릿 문자열별로 캐시되며, 블록 밖의 $1 에는 params['legalCode'] 를 사용합니다.
     """
-    # if 블록 찾기
-    if_pattern = r'{%\s*if\s+(\w+)\s*%}(.*?)(?:{%\s*endif\s*%})'
-    
-    # 매개변수 목록
-    query_params = []
-    param_index = 1
-    
-    # 기본 쿼리 (첫 번째 매개변수는 항상 포함)
-    query = template
-    query_params.append(params.get('legalCode'))
-    
-    # if 블록 처리
-    for match in re.finditer(if_pattern, template, re.DOTALL):
-        param_name = match.group(1)
-        block_content = match.group(2)
-        
-        if param_name in params and params[param_name]:
-            # 매개변수가 존재하면 블록 내용 유지하고 매개변수 추가
-            param_index += 1
-            query_params.append(params[param_name])
-            # $n을 실제 인덱스로 대체
-            block_content = re.sub(r'\$\d+', f'${param_index}', block_content)
-        else:
-            # 매개변수가 없으면 블록 제거
-            query = query.replace(match.group(0), '')
-    
-    # if 블록 태그 제거
-    query = re.sub(r'{%.*?%}', '', query)
-    
-    return query, query_params 
\ No newline at end of file
+    variant, args = _compile_cached(template).bind(params, [params.get('legalCode')])
+    return variant.sql, args
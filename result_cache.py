@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# 캐시 메모리 한도 (바이트, 0이면 사용하지 않음), 항목 하나의 최대 크기 (넘으면 캐시하지 않음)
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+
+# 키/OrderedDict 노드 등 본문 외에 항목마다 드는 대략적인 메모리
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class JSONPage(NamedTuple):
+    """직렬화를 마친 조회 결과 (JSON 배열 조각, 행 수, 다음 페이지 커서)"""
+    array: bytes
+    count: int
+    next: Optional[str] = None
+
+
+def _freeze(value: Any) -> Hashable:
+    """쿼리 파라미터를 캐시 키로 쓸 수 있게 바꿉니다. (목록 → 튜플)"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _entry_size(key: Tuple, page: JSONPage) -> int:
+    return len(page.array) + len(page.next or "") + len(repr(key)) + ENTRY_OVERHEAD_BYTES
+
+
+class ResultCache:
+    """
+    이름 있는 쿼리의 결과 캐시 (키: 쿼리 이름 + 파라미터)
+
+    결과를 JSON 조각으로 직렬화한 상태로 저장하므로, 적중하면 커넥션 풀과 직렬화를 모두 건너뜁니다.
+    메모리 한도는 항목 수가 아니라 저장한 바이트 수로 정하고, 넘으면 가장 오래 쓰지 않은 항목부터 버립니다(LRU).
+    데이터셋 버전이나 쿼리 목록 세대가 바뀌면 전체를 비웁니다.
+    (버전을 모르는 동안에는 비울 시점을 알 수 없으므로 캐시하지 않음)
+    같은 키의 동시 조회는 하나로 합치고, 기다리는 요청이 모두 떠나면 (클라이언트 연결 끊김) 조회도 취소합니다.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self._data: "OrderedDict[Tuple, Tuple[JSONPage, int]]" = OrderedDict()
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        self._waiters: Dict[Tuple, int] = {}
+        self.version: Optional[Tuple] = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def _check_version(self, version: Tuple) -> None:
+        if version != self.version:
+            if self._data:
+                self.invalidations += 1
+                logger.info(f"결과 캐시 비움: 버전 {self.version} → {version} ({len(self._data)}개)")
+            self.clear()
+            self.version = version
+
+    def _store(self, key: Tuple, page: JSONPage) -> None:
+        size = _entry_size(key, page)
+        if size > self.max_entry_bytes:
+            self.skipped += 1
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        self._data[key] = (page, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, evicted_size) = self._data.popitem(last=False)
+            self.bytes -= evicted_size
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        version: Tuple,
+        name: str,
+        args: Tuple,
+        loader: Callable[[], Awaitable[JSONPage]],
+    ) -> Tuple[JSONPage, bool]:
+        """
+        캐시된 결과를 반환하고, 없으면 loader 로 조회해 저장합니다.
+
+        Args:
+            version: 결과가 같다고 볼 수 있는 버전 (데이터셋 버전, 쿼리 목록 세대)
+            name: 준비된 쿼리 이름
+            args: 쿼리 파라미터
+
+        Returns:
+            (결과, 캐시 적중 여부)
+        """
+        if not self.enabled or version[0] is None:
+            return await loader(), False
+
+        self._check_version(version)
+        key = (name, _freeze(args))
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            metrics.result_cache_requests_total.inc(("hit",))
+            return entry[0], True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            metrics.result_cache_requests_total.inc(("coalesced",))
+            return await self._wait(key, task), True
+
+        self.misses += 1
+        metrics.result_cache_requests_total.inc(("miss",))
+        task = asyncio.create_task(self._load(version, key, loader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await self._wait(key, task), False
+
+    async def _wait(self, key: Tuple, task: asyncio.Task) -> JSONPage:
+        """합쳐진 조회를 기다립니다. 한 요청이 취소되어도 다른 요청이 기다리는 동안에는 조회를 계속합니다."""
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[key] == 1 and not task.done():
+                # 취소 중인 조회에 새 요청이 합쳐지지 않도록 바로 목록에서 뺌
+                self._forget(key, task)
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _forget(self, key: Tuple, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _load(self, version: Tuple, key: Tuple, loader: Callable[[], Awaitable[JSONPage]]) -> JSONPage:
+        page = await loader()
+        # 조회하는 동안 버전이 바뀌었으면 이전 버전의 결과이므로 저장하지 않음
+        if version == self.version:
+            self._store(key, page)
+        return page
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "version": self.version,
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "skipped_too_large": self.skipped,
+            "inflight": len(self._inflight),
+        }
+
+
+result_cache = ResultCache(RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_ENTRY_BYTES)
+
+
+def watch_cache() -> None:
+    """/metrics 출력 시 결과 캐시 크기를 함께 내보냅니다."""
+    def collect():
+        metrics.result_cache_bytes.set(result_cache.bytes)
+        metrics.result_cache_entries.set(len(result_cache._data))
+    metrics.registry.add_collector(collect)
+
+
+watch_cache()
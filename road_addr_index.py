@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import os
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from statement_registry import statements
+
+logger = logging.getLogger(__name__)
+
+# 검색어와 일치하는 도로명주소가 이 개수를 넘으면 인덱스 대신 LIKE 검색을 사용
+ROAD_ADDR_MAX_CANDIDATES = int(os.getenv("ROAD_ADDR_MAX_CANDIDATES", "5000"))
+# 증분 갱신 시 한 번에 반영할 주소 수 (반영 사이에 이벤트 루프에 양보)
+ROAD_ADDR_UPDATE_BATCH = int(os.getenv("ROAD_ADDR_UPDATE_BATCH", "2000"))
+# 삭제된 주소 비율이 이 값을 넘으면 증분 갱신 대신 전체 재구성
+ROAD_ADDR_REBUILD_RATIO = float(os.getenv("ROAD_ADDR_REBUILD_RATIO", "0.25"))
+
+
+def _bigrams(text: str) -> set:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def escape_like(term: str) -> str:
+    """LIKE 패턴에서 %, _, \\ 를 문자 그대로 찾도록 이스케이프합니다. (인덱스 검색과 같은 결과)"""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class RoadAddressIndex:
+    """
+    도로명주소 부분 문자열 검색용 2-gram 역색인
+
+    housing_prices 의 고유 도로명주소마다 번호를 붙이고, 2글자 단위(bigram)별로
+    해당 주소 번호 목록(array)을 보관합니다. 검색 시 검색어의 bigram 목록을 교집합하여
+    후보를 좁힌 뒤 실제 부분 문자열 포함 여부를 확인합니다.
+    삭제는 번호를 비워 두는 방식으로 처리하고, 삭제 비율이 커지면 전체를 다시 만듭니다.
+    """
+
+    def __init__(self, addresses: Iterable[str] = ()):
+        self._addresses: List[Optional[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self.removed_count = 0
+        for address in addresses:
+            self.add(address)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._ids
+
+    def addresses(self) -> set:
+        return set(self._ids)
+
+    @property
+    def removed_ratio(self) -> float:
+        return self.removed_count / len(self._addresses) if self._addresses else 0.0
+
+    def add(self, address: str) -> None:
+        if not address or address in self._ids:
+            return
+        address_id = len(self._addresses)
+        self._addresses.append(address)
+        self._ids[address] = address_id
+        for gram in _bigrams(address):
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = array('I', (address_id,))
+            else:
+                posting.append(address_id)
+
+    def remove(self, address: str) -> None:
+        address_id = self._ids.pop(address, None)
+        if address_id is not None:
+            self._addresses[address_id] = None
+            self.removed_count += 1
+
+    def search(self, term: str, max_results: Optional[int] = None) -> Optional[List[str]]:
+        """
+        term 을 포함하는 도로명주소 목록을 반환합니다.
+
+        Returns:
+            일치하는 주소 목록 (max_results 를 넘거나, 한 글자 검색어라 후보를 좁힐 수 없으면 None)
+        """
+        grams = _bigrams(term)
+        if not grams:
+            # 전체 주소를 확인해야 하므로 이벤트 루프에서 처리하지 않고 DB 의 LIKE 검색에 맡김
+            return None
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                return []
+            postings.append(posting)
+        postings.sort(key=len)
+        candidate_set = set(postings[0])
+        for posting in postings[1:]:
+            candidate_set.intersection_update(posting)
+            if not candidate_set:
+                return []
+
+        result = []
+        for address_id in sorted(candidate_set):
+            address = self._addresses[address_id]
+            if address is not None and term in address:
+                result.append(address)
+                if max_results is not None and len(result) > max_results:
+                    return None
+        return result
+
+
+class RoadAddressSearch:
+    """
+    도로명주소 검색 인덱스 관리자
+
+    lifespan 에서 백그라운드로 인덱스를 만들고, 준비되기 전에는 LIKE 검색을 사용합니다.
+    refresh() 는 DB 의 고유 도로명주소 목록과 비교하여 추가/삭제분만 반영합니다.
+    """
+
+    def __init__(self):
+        self.index: Optional[RoadAddressIndex] = None
+        self.loaded_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    async def refresh(self, pool) -> Dict[str, Any]:
+        """DB 의 도로명주소 목록으로 인덱스를 만들거나 증분 갱신합니다."""
+        async with self._refresh_lock:
+            start_time = time.time()
+            async with pool.acquire() as conn:
+                records = await statements.fetch(conn, "GET_ROAD_ADDR_DISTINCT")
+            latest = {record[0] for record in records if record[0]}
+
+            loop = asyncio.get_running_loop()
+            index = self.index
+            if index is None:
+                self.index = await loop.run_in_executor(None, RoadAddressIndex, latest)
+                stats = {"mode": "full", "added": len(latest), "removed": 0}
+            else:
+                current = index.addresses()
+                added = list(latest - current)
+                removed = list(current - latest)
+                if (index.removed_count + len(removed)) / max(len(current) + len(added), 1) > ROAD_ADDR_REBUILD_RATIO:
+                    # 삭제가 많으면 새 인덱스를 만들어 교체 (만드는 동안 기존 인덱스로 응답)
+                    self.index = await loop.run_in_executor(None, RoadAddressIndex, latest)
+                    stats = {"mode": "full", "added": len(added), "removed": len(removed)}
+                else:
+                    for i in range(0, len(removed), ROAD_ADDR_UPDATE_BATCH):
+                        for address in removed[i:i + ROAD_ADDR_UPDATE_BATCH]:
+                            index.remove(address)
+                        await asyncio.sleep(0)
+                    for i in range(0, len(added), ROAD_ADDR_UPDATE_BATCH):
+                        for address in added[i:i + ROAD_ADDR_UPDATE_BATCH]:
+                            index.add(address)
+                        await asyncio.sleep(0)
+                    stats = {"mode": "incremental", "added": len(added), "removed": len(removed)}
+
+            self.loaded_at = time.time()
+            stats["address_count"] = len(self.index)
+            stats["elapsed"] = self.loaded_at - start_time
+            logger.info(f"도로명주소 검색 인덱스 갱신 완료: {stats}")
+            return stats
+
+    def plan(self, term: str, limit: Optional[int] = None) -> Tuple[str, List[Any]]:
+        """
+        검색어에 맞는 도로명주소 조회 쿼리 이름과 파라미터를 결정합니다.
+
+        인덱스로 후보 주소를 찾을 수 있으면 주소 목록(= ANY) 조회를,
+        인덱스가 준비되지 않았거나 후보가 너무 많거나 한 글자 검색어면 LIKE 검색을 사용합니다.
+        LIKE 검색어는 이스케이프하여 인덱스와 같이 %, _ 를 문자 그대로 찾습니다.
+        """
+        if self.index is not None:
+            addresses = self.index.search(term, max_results=ROAD_ADDR_MAX_CANDIDATES)
+            if addresses is not None:
+                return "GET_ROAD_ADDR_BY_ADDRS", [addresses, limit]
+        return "GET_ROAD_ADDR_LIST", [escape_like(term), limit]
+
+    def plan_page(self, term: str, limit: int, after: Optional[Tuple[str, ...]] = None) -> Tuple[str, List[Any]]:
+        """
+        plan() 과 같은 방식으로 검색하되 단지코드/동코드/호코드/건축물대장PK/PNU 순 한 페이지를 조회하는 쿼리를 결정합니다.
+
+        다음 페이지 존재 여부를 알 수 있도록 limit + 1 행을 조회하며,
+        after 가 있으면 그 행 다음부터 조회합니다. (키셋 페이지네이션)
+        """
+        query_name, query_params = self.plan(term)
+        query_name = "GET_ROAD_ADDR_BY_ADDRS_PAGE" if query_name == "GET_ROAD_ADDR_BY_ADDRS" else "GET_ROAD_ADDR_PAGE"
+        query_params = [query_params[0], limit + 1]
+        if after is not None:
+            return query_name + "_AFTER", query_params + list(after)
+        return query_name, query_params
+
+
+road_addr_search = RoadAddressSearch()
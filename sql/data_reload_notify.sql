@@ -0,0 +1,42 @@
+-- 데이터 적재 알림 (LISTEN/NOTIFY)
+-- housing_prices, ADDR_STEP 이 바뀌면 트랜잭션 커밋 시점에 facc_data_reload 채널로 테이블 이름을 알립니다.
+-- 서버는 주 서버에 전용 커넥션으로 LISTEN 하고 있다가, 알림이 오면 기존 스냅샷으로 계속 응답하면서
+-- 주소 캐시와 도로명주소 검색 인덱스를 백그라운드에서 다시 만들고, 마지막에 데이터셋 버전을 올립니다.
+-- (ETag 와 조회 결과 캐시는 버전이 바뀔 때 함께 바뀝니다)
+--
+-- 채널 이름을 바꾸면 서버의 DATA_RELOAD_CHANNEL 도 같이 바꿉니다.
+-- 복제 서버에서는 LISTEN 할 수 없으므로 주 서버에서 실행합니다.
+--
+-- 실행: psql -h <host> -U <user> -d <db> -f sql/data_reload_notify.sql
+
+CREATE OR REPLACE FUNCTION facc_notify_data_reload() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    -- 같은 트랜잭션의 같은 알림은 한 번만 전달되므로 행 수와 관계없이 테이블당 한 번
+    PERFORM pg_notify('facc_data_reload', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$;
+
+-- 행 단위가 아니라 문장 단위 트리거 (COPY, TRUNCATE 포함)
+DROP TRIGGER IF EXISTS housing_prices_notify_reload ON housing_prices;
+CREATE TRIGGER housing_prices_notify_reload
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON housing_prices
+    FOR EACH STATEMENT EXECUTE FUNCTION facc_notify_data_reload();
+
+DROP TRIGGER IF EXISTS addr_step_notify_reload ON ADDR_STEP;
+CREATE TRIGGER addr_step_notify_reload
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ADDR_STEP
+    FOR EACH STATEMENT EXECUTE FUNCTION facc_notify_data_reload();
+
+-- 적재를 마친 뒤 새 데이터셋 버전을 기록하고 알립니다. (sql/dataset_version.sql 필요)
+-- 트리거 없이 이 프로시저만 호출해도 서버가 모든 파생 구조를 다시 만듭니다.
+-- 예: CALL facc_finish_load('2025-01');
+CREATE OR REPLACE PROCEDURE facc_finish_load(new_version TEXT)
+LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO dataset_version (version) VALUES (new_version)
+        ON CONFLICT (version) DO UPDATE SET updated_at = now();
+    PERFORM pg_notify('facc_data_reload', '*');
+END;
+$$;
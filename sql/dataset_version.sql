@@ -0,0 +1,15 @@
+-- 데이터셋 버전 테이블
+-- 서버는 이 테이블의 최신 version 값으로 /data/* 응답의 ETag 를 만듭니다.
+-- 공시가격 자료를 적재할 때마다 새 버전을 추가한 뒤
+-- POST /admin/dataset-version/refresh 를 호출하면 반영됩니다.
+-- (sql/data_reload_notify.sql 을 적용했다면 CALL facc_finish_load('2025-01') 로 기록하면 바로 반영됩니다)
+-- (테이블이 없으면 원본 테이블의 파일 번호와 누적 변경 건수(pg_stat_user_tables)로 대신 판단합니다)
+--
+-- 실행: psql -h <host> -U <user> -d <db> -f sql/dataset_version.sql
+
+CREATE TABLE IF NOT EXISTS dataset_version (
+    version    TEXT PRIMARY KEY,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 적재 후 예: INSERT INTO dataset_version (version) VALUES ('2025-01');
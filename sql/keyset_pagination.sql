@@ -0,0 +1,24 @@
+-- 지번주소/도로명주소 목록 페이지 조회용 인덱스
+-- /data/bonboo 는 법정동코드로 거른 뒤 (단지코드, 동코드, 호코드, 건축물대장PK, PNU) 순으로 이전 페이지 마지막 행 다음부터 읽습니다.
+-- 이 인덱스가 있으면 정렬 없이 인덱스 순서대로 limit 행만 읽으므로 뒤쪽 페이지도 첫 페이지와 비용이 같습니다.
+--
+-- 정렬 기준이 유일하지 않으면 페이지 경계에서 같은 값을 가진 행을 건너뛰므로 유일 인덱스로 보장합니다.
+-- PNU 의 앞 10자리가 법정동코드이므로, 이 인덱스가 유일하면 /data/roadAddr 가 쓰는
+-- (단지코드, 동코드, 호코드, 건축물대장PK, PNU) 도 유일합니다.
+-- 중복 행이 있으면 인덱스 생성이 실패하고 INVALID 인덱스가 남습니다. 아래 쿼리로 중복을 확인해 정리한 뒤
+-- DROP INDEX CONCURRENTLY housing_prices_keyset_uniq; 후 다시 실행하세요.
+--
+--   SELECT 법정동코드, 단지코드, 동코드, 호코드, 건축물대장PK, PNU, count(*)
+--   FROM housing_prices GROUP BY 1, 2, 3, 4, 5, 6 HAVING count(*) > 1;
+--
+-- 운영 중인 테이블을 잠그지 않도록 CONCURRENTLY 로 생성합니다. (트랜잭션 밖에서 실행)
+--
+-- 실행: psql -h <host> -U <user> -d <db> -f sql/keyset_pagination.sql
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS housing_prices_keyset_uniq
+    ON housing_prices (법정동코드, 단지코드, 동코드, 호코드, 건축물대장PK, PNU);
+
+-- 이전 버전의 (법정동코드, 단지코드, 동코드, 호코드) 인덱스는 위 인덱스로 대체됩니다.
+DROP INDEX CONCURRENTLY IF EXISTS housing_prices_legal_keyset_idx;
+
+ANALYZE housing_prices;
@@ -0,0 +1,11 @@
+-- 도로명주소 검색 인덱스용 DDL
+-- 서버의 도로명주소 검색은 메모리 2-gram 인덱스로 후보 주소를 찾은 뒤
+-- 도로명주소 = ANY($1) 로 행을 조회하므로, 도로명주소 컬럼에 B-tree 인덱스가 필요합니다.
+-- 운영 중인 테이블을 잠그지 않도록 CONCURRENTLY 로 생성합니다. (트랜잭션 밖에서 실행)
+--
+-- 실행: psql -h <host> -U <user> -d <db> -f sql/road_addr_index.sql
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS housing_prices_road_addr_idx
+    ON housing_prices (도로명주소);
+
+ANALYZE housing_prices;
@@ -0,0 +1,294 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Tuple
+
+import metrics
+from json_response import record_to_json
+from query_loader import queries
+from query_template import CompiledTemplate, compile_templates, is_template
+from workload import current_workload, statement_timeout
+
+logger = logging.getLogger(__name__)
+
+# 행을 DB 에서 JSON 문자열로 받는 쿼리의 이름 접미사
+JSON_SUFFIX = "__JSON"
+
+# row_to_json 결과가 FastAPI(jsonable_encoder + json.dumps) 출력과 같은 컬럼 타입
+# (timestamp 는 소수 초 표기가 달라 제외)
+JSON_SAFE_TYPES = frozenset({"text", "varchar", "bpchar", "name", "int2", "int4", "int8", "bool", "date"})
+# 그대로 두면 표기가 달라지지만 JSON 변형에서 FastAPI decimal_encoder 와 같게 바꾸는 타입
+JSON_NUMERIC_TYPES = frozenset({"numeric"})
+
+# decimal_encoder 와 같은 표기: 소수 자릿수가 0이면 정수, 아니면 float (84.50 → 84.5, 84.00 → 84.0)
+# float8 문자열은 PostgreSQL 12 이상(extra_float_digits 기본값)에서 Python repr 과 같은 최단 표기이며,
+# 1e15 이상 1e16 미만의 정수가 아닌 값만 지수 표기(1.2345e+15)로 달라집니다. (파싱한 값은 같음)
+NUMERIC_JSON = (
+    "CASE WHEN scale({0}) = 0 THEN {0}::text"
+    " WHEN abs({0}) < 1e16 AND {0}::float8 = trunc({0}::float8) THEN {0}::float8::int8::text || '.0'"
+    " ELSE {0}::float8::text END::json"
+)
+
+
+class StatementTimeout(asyncio.TimeoutError):
+    """쿼리가 요청 부류의 제한 시간을 넘어 취소됨 (504 로 응답)"""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"{name} 쿼리가 제한 시간({timeout:g}초)을 넘어 취소되었습니다.")
+        self.name = name
+        self.timeout = timeout
+
+
+def quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def json_query(sql: str, attributes=()) -> str:
+    """
+    쿼리 결과를 행별 JSON 문자열 한 컬럼으로 돌려주는 쿼리로 감쌉니다.
+
+    결과 컬럼(attributes)에 numeric 이 있으면 그 컬럼만 NUMERIC_JSON 으로 바꾼 뒤 row_to_json 으로 직렬화합니다.
+    """
+    sql = sql.strip().rstrip(';')
+    if not any(attribute.type.name in JSON_NUMERIC_TYPES for attribute in attributes):
+        return f"SELECT row_to_json(t)::text FROM ({sql}) t"
+    columns = []
+    for attribute in attributes:
+        column = "s." + quote_ident(attribute.name)
+        if attribute.type.name in JSON_NUMERIC_TYPES:
+            column = NUMERIC_JSON.format(column) + " AS " + quote_ident(attribute.name)
+        columns.append(column)
+    return f"SELECT row_to_json(t)::text FROM (SELECT {', '.join(columns)} FROM ({sql}) s) t"
+
+
+def is_json_safe(statement) -> bool:
+    return all(
+        attribute.type.name in JSON_SAFE_TYPES or attribute.type.name in JSON_NUMERIC_TYPES
+        for attribute in statement.get_attributes()
+    )
+
+
+class StatementStats:
+    """이름 있는 쿼리별 실행 횟수와 누적 실행 시간"""
+
+    __slots__ = ("count", "errors", "total_time", "max_time")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed: float, error: bool = False) -> None:
+        self.count += 1
+        self.total_time += elapsed
+        if elapsed > self.max_time:
+            self.max_time = elapsed
+        if error:
+            self.errors += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "avg_time": self.total_time / self.count if self.count else 0.0,
+            "max_time": self.max_time,
+        }
+
+
+def build_queries(query_map: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, CompiledTemplate]]:
+    """
+    queries.sql 에서 읽은 쿼리에 템플릿 조합을 더한 전체 쿼리 목록을 만듭니다.
+
+    JSON 변형(<이름>__JSON)은 결과 컬럼 타입을 알아야 만들 수 있으므로
+    커넥션에서 쿼리를 준비한 뒤 StatementRegistry.plan_json 이 추가합니다.
+
+    Returns:
+        (쿼리 이름 → SQL, 템플릿 이름 → 컴파일된 템플릿)
+    """
+    queries = dict(query_map)
+    templates = compile_templates(queries)
+    for template in templates.values():
+        queries.update(template.named_queries())
+    return queries, templates
+
+
+def preparable(queries: Dict[str, str]) -> Dict[str, str]:
+    return {name: sql for name, sql in queries.items() if not is_template(sql)}
+
+
+class StatementRegistry:
+    """
+    queries.sql 의 이름 있는 쿼리를 커넥션마다 미리 준비(PREPARE)해 두는 레지스트리
+
+    커넥션 풀의 init 콜백에서 모든 쿼리를 준비하므로, 배포 직후 첫 요청도
+    파싱/계획 비용 없이 실행됩니다. 엔드포인트는 쿼리 문자열 대신 이름으로 실행하며,
+    이름별 실행 횟수와 누적 실행 시간을 기록합니다.
+
+    조건부 템플릿({% if %})은 블록 조합별 쿼리로 컴파일하여 일반 쿼리와 같이 준비합니다.
+    """
+
+    def __init__(self, query_map: Dict[str, str]):
+        self.stats: Dict[str, StatementStats] = {}
+        self.json_safe: Dict[str, bool] = {}
+        # 쿼리 목록이 교체될 때마다 증가 (커넥션별 준비 상태를 비교하는 데 사용)
+        self.generation = 0
+        # 커넥션 init 에서 준비에 실패한 쿼리 (이름 → 오류 메시지)
+        self.prepare_errors: Dict[str, str] = {}
+        self.queries, self.templates = build_queries(query_map)
+
+    def swap(self, queries: Dict[str, str], templates: Dict[str, CompiledTemplate]) -> None:
+        """
+        검증을 마친 새 쿼리 목록으로 교체합니다.
+
+        이미 열린 커넥션은 다음 사용 시 SQL 이 바뀐 쿼리만 다시 준비합니다.
+        (await 없이 교체하므로 요청은 이전 목록이나 새 목록 중 하나만 봅니다)
+        """
+        self.queries, self.templates = queries, templates
+        self.json_safe = {}
+        self.prepare_errors = {}
+        self.generation += 1
+
+    def preparable(self) -> Dict[str, str]:
+        """준비 가능한 쿼리 목록 (템플릿 원문은 제외, 컴파일된 조합은 포함)"""
+        return preparable(self.queries)
+
+    def bind_template(self, name: str, params: Dict[str, Any], base_args=()) -> Tuple[str, List[Any]]:
+        """
+        템플릿에서 값이 있는 블록 조합의 쿼리 이름과 매개변수 목록을 반환합니다.
+
+        Returns:
+            (준비된 쿼리 이름, 쿼리 매개변수 목록)
+        """
+        variant, args = self.templates[name].bind(params, base_args)
+        return variant.name, args
+
+    async def init_connection(self, conn) -> None:
+        """
+        커넥션 풀 init 콜백: 새 커넥션에 모든 쿼리를 준비합니다.
+
+        처음 준비한 쿼리는 결과 컬럼 타입으로 JSON 변형을 만들어 함께 준비합니다. (이후 커넥션은 목록에 포함)
+        """
+        conn.prepared_statements = {}
+        conn.catalog_generation = self.generation
+        start_time = time.time()
+        for name, sql in self.preparable().items():
+            await self._prepare(conn, name, sql)
+        for name, statement in list(conn.prepared_statements.items()):
+            if conn.catalog_generation != self.generation:
+                # 준비하는 동안 쿼리 목록이 교체됨 (JSON 변형은 사용 시점에 만듦)
+                break
+            if name.endswith(JSON_SUFFIX) or name in self.json_safe:
+                continue
+            if self.plan_json(name, statement):
+                await self._prepare(conn, name + JSON_SUFFIX, self.queries[name + JSON_SUFFIX])
+        logger.info(f"커넥션 쿼리 준비 완료: {len(conn.prepared_statements)}개, 소요 시간: {time.time() - start_time:.4f}초")
+
+    async def _prepare(self, conn, name: str, sql: str) -> None:
+        try:
+            conn.prepared_statements[name] = await conn.prepare(sql)
+        except Exception as e:
+            # 준비에 실패한 쿼리는 실행 시점에 다시 시도
+            logger.error(f"쿼리 준비 실패: {name}, {str(e)}")
+            self.prepare_errors[name] = str(e)
+
+    def plan_json(self, name: str, statement) -> bool:
+        """
+        준비된 쿼리의 결과 컬럼 타입으로 DB 측 JSON 직렬화 가능 여부를 정하고, 가능하면 JSON 변형을 추가합니다.
+
+        같은 쿼리 목록 세대에서는 결과 컬럼 타입이 같으므로 한 번만 정합니다.
+        """
+        safe = is_json_safe(statement)
+        if safe:
+            self.queries[name + JSON_SUFFIX] = json_query(self.queries[name], statement.get_attributes())
+        else:
+            logger.info(f"{name}: JSON 으로 직렬화할 수 없는 컬럼 타입이 있어 Python 에서 변환합니다.")
+        self.json_safe[name] = safe
+        return safe
+
+    def _sync_connection(self, conn, prepared: Dict[str, Any]) -> None:
+        """쿼리 목록이 교체된 뒤 처음 사용하는 커넥션에서 SQL 이 바뀌었거나 없어진 쿼리를 버립니다."""
+        for name, statement in list(prepared.items()):
+            if self.queries.get(name) != statement.get_query():
+                del prepared[name]
+        conn.catalog_generation = self.generation
+
+    async def get_statement(self, conn, name: str):
+        prepared = getattr(conn, "prepared_statements", None)
+        if prepared is None:
+            # 레지스트리 init 없이 만들어진 커넥션은 매번 준비
+            return await conn.prepare(self.queries[name])
+        if conn.catalog_generation != self.generation:
+            self._sync_connection(conn, prepared)
+        statement = prepared.get(name)
+        if statement is None:
+            statement = await conn.prepare(self.queries[name])
+            prepared[name] = statement
+        return statement
+
+    async def fetch(self, conn, name: str, *args, timeout: float = None) -> List[Any]:
+        """
+        이름으로 준비된 쿼리를 실행합니다.
+
+        timeout 을 주지 않으면 요청 부류의 쿼리 제한 시간을 사용하며,
+        시간을 넘으면 asyncpg 가 서버에 취소 요청을 보내고 StatementTimeout 을 발생시킵니다.
+        """
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = StatementStats()
+        if timeout is None:
+            timeout = statement_timeout()
+
+        start_time = time.perf_counter()
+        try:
+            statement = await self.get_statement(conn, name)
+            rows = await statement.fetch(*args, timeout=timeout)
+        except asyncio.TimeoutError:
+            stats.record(time.perf_counter() - start_time, error=True)
+            if timeout is None:
+                raise
+            metrics.db_statement_timeouts_total.inc((current_workload.get(),))
+            raise StatementTimeout(name, timeout)
+        except Exception:
+            stats.record(time.perf_counter() - start_time, error=True)
+            raise
+        elapsed = time.perf_counter() - start_time
+        stats.record(elapsed)
+        metrics.db_query_duration_seconds.observe(elapsed, (name,))
+        return rows
+
+    async def fetch_json(self, conn, name: str, *args, timeout: float = None) -> List[str]:
+        """
+        이름으로 쿼리를 실행하고 행별 JSON 문자열 목록을 반환합니다.
+
+        결과 컬럼이 모두 JSON_SAFE_TYPES/JSON_NUMERIC_TYPES 이면 DB 가 row_to_json 으로 직렬화한 문자열을 그대로 받고,
+        그렇지 않으면 행을 받아 FastAPI 와 같은 방식으로 직렬화합니다.
+        """
+        safe = self.json_safe.get(name)
+        if safe is None:
+            generation = self.generation
+            statement = await self.get_statement(conn, name)
+            if generation != self.generation:
+                # 준비하는 동안 쿼리 목록이 교체됨 (이번에는 Python 에서 변환)
+                safe = False
+            else:
+                safe = self.plan_json(name, statement)
+
+        if safe:
+            rows = await self.fetch(conn, name + JSON_SUFFIX, *args, timeout=timeout)
+            return [row[0] for row in rows]
+        rows = await self.fetch(conn, name, *args, timeout=timeout)
+        return [record_to_json(row) for row in rows]
+
+    async def fetch_columns(self, conn, name: str, *args, timeout: float = None) -> Tuple[List[str], List[Any]]:
+        """이름으로 쿼리를 실행하고 (컬럼명 목록, 행 목록)을 반환합니다. (결과가 없어도 컬럼명 포함)"""
+        statement = await self.get_statement(conn, name)
+        rows = await self.fetch(conn, name, *args, timeout=timeout)
+        return [attribute.name for attribute in statement.get_attributes()], rows
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in sorted(self.stats.items())}
+
+
+statements = StatementRegistry(queries)
@@ -0,0 +1,12 @@
+"""
+기능 테스트 공통 설정
+
+저장소 루트의 모듈을 import 할 수 있게 하고, 작업 디렉터리와 관계없이 루트의 파일을 읽도록 경로를 지정합니다.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, ROOT_DIR)
+os.environ.setdefault("QUERIES_FILE", os.path.join(ROOT_DIR, "queries.sql"))
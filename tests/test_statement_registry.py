@@ -0,0 +1,46 @@
+"""
+statement_registry 의 DB JSON 변형 계획 테스트
+
+실행:
+    python -m pytest tests
+"""
+import pytest
+from asyncpg.types import Attribute, Type
+
+from query_loader import QUERIES_FILE, load_queries
+from statement_registry import JSON_SUFFIX, StatementRegistry
+
+# 조회 쿼리의 응답 컬럼 별칭 (housing_prices 컬럼 순서)
+ALIASES = [
+    "legalCd", "roadAddr", "sido", "sigungu", "emd", "ri", "spCd", "bon", "boo", "spNm",
+    "cmpNm", "dongNm", "hoNm", "exArea", "pubPrice", "cmpCd", "dongCd", "hoCd",
+    "bldbLedgerPK", "oldBldbLedgerPK", "PNU",
+]
+# benchmarks/schema.sql 에서 numeric 인 컬럼 (전용면적, 공시가격)
+NUMERIC_ALIASES = {"exArea", "pubPrice"}
+
+
+class PreparedHousingQuery:
+    """housing_prices 조회 쿼리를 준비했을 때의 결과 컬럼 (asyncpg PreparedStatement 대역)"""
+
+    def get_attributes(self):
+        return tuple(
+            Attribute(alias, Type(0, "numeric" if alias in NUMERIC_ALIASES else "text", "b", "pg_catalog"))
+            for alias in ALIASES
+        )
+
+
+@pytest.mark.parametrize("name", [
+    "GET_BUILDING_LEDGER",
+    "GET_PNU_DATA",
+    "GET_ROAD_ADDR_BY_ADDRS_PAGE",
+    "GET_JIBUN_ADDR_TEMPLATE__spCd_bon_boo",
+])
+def test_housing_queries_use_db_json(name):
+    # numeric 컬럼이 있어도 Python 변환(record_to_json) 대신 DB 의 JSON 변형을 사용
+    registry = StatementRegistry(load_queries(QUERIES_FILE))
+    assert registry.plan_json(name, PreparedHousingQuery())
+    sql = registry.queries[name + JSON_SUFFIX]
+    for alias in NUMERIC_ALIASES:
+        assert f'scale(s."{alias}")' in sql
+    assert 'scale(s."roadAddr")' not in sql
@@ -0,0 +1,357 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# V-World 검색 API 설정 (VWORLD_API_KEY 는 필수, 없으면 지번주소 조회가 실패함)
+VWORLD_API_KEY = os.getenv("VWORLD_API_KEY", "").strip()
+VWORLD_BASE_URL = os.getenv("VWORLD_BASE_URL", "https://api.vworld.kr/req/search")
+VWORLD_CONNECT_TIMEOUT = float(os.getenv("VWORLD_CONNECT_TIMEOUT", "3"))
+VWORLD_READ_TIMEOUT = float(os.getenv("VWORLD_READ_TIMEOUT", "10"))
+VWORLD_MAX_CONNECTIONS = int(os.getenv("VWORLD_MAX_CONNECTIONS", "20"))
+
+# 주소 → 조회 결과 캐시 설정 (SQLite 경로를 지정하면 재시작 후에도 유지)
+VWORLD_CACHE_SIZE = int(os.getenv("VWORLD_CACHE_SIZE", "10000"))
+VWORLD_CACHE_TTL = float(os.getenv("VWORLD_CACHE_TTL", "86400"))
+VWORLD_CACHE_DB = os.getenv("VWORLD_CACHE_DB", "")
+
+# 서킷 브레이커 설정 (연속 실패 횟수, 차단 유지 시간)
+VWORLD_BREAKER_THRESHOLD = int(os.getenv("VWORLD_BREAKER_THRESHOLD", "5"))
+VWORLD_BREAKER_RESET_SECONDS = float(os.getenv("VWORLD_BREAKER_RESET_SECONDS", "30"))
+
+# 캐시해도 되는 결과 상태 (일시적인 오류는 캐시하지 않음)
+_CACHEABLE_STATUSES = ("success", "not_found", "no_valid_pnu")
+
+
+def normalize_address(address: str) -> str:
+    """캐시 키로 사용할 수 있도록 주소의 공백을 정리합니다."""
+    return " ".join(address.split())
+
+
+class TTLCache:
+    """크기 제한(LRU)과 만료 시간(TTL)을 함께 적용하는 캐시"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None or entry[1] < time.time():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        self._data[key] = (value, expires_at or time.time() + self.ttl)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold 에 도달하면 reset_seconds 동안 호출을 차단합니다.
+    차단 시간이 지나면 한 번의 시험 호출(half-open)을 허용하고, 성공하면 다시 닫힙니다.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_running = False
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.error(f"V-World API 연속 실패 {self.failures}회, {self.reset_seconds}초 동안 호출을 차단합니다.")
+            self.opened_at = time.time()
+
+
+class _SqliteStore:
+    """캐시 영속화용 SQLite 저장소 (전용 스레드 하나에서만 접근)"""
+
+    def __init__(self, path: str):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vworld-cache")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vworld_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _load(self, limit: int) -> List[tuple]:
+        now = time.time()
+        self._conn.execute("DELETE FROM vworld_cache WHERE expires_at < ?", (now,))
+        self._conn.commit()
+        return self._conn.execute(
+            "SELECT key, value, expires_at FROM vworld_cache ORDER BY expires_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+
+    def _save(self, key: str, value: str, expires_at: float) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO vworld_cache (key, value, expires_at) VALUES (?, ?, ?)", (key, value, expires_at)
+        )
+        self._conn.commit()
+
+    async def load(self, limit: int) -> List[tuple]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._load, limit)
+
+    def save(self, key: str, value: Dict[str, Any], expires_at: float) -> None:
+        """저장은 기다리지 않고 전용 스레드에 맡깁니다."""
+        self._executor.submit(self._save, key, json.dumps(value, ensure_ascii=False), expires_at)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+
+def _process_items(address: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """V-World 검색 결과 항목에서 PNU 와 주소 정보를 추출합니다."""
+    processed_items = []
+    for item in items:
+        pnu = item.get("id")  # V-World API에서는 'id' 필드가 PNU입니다
+        item_address = item.get("address", {})
+        parcel_address = item_address.get("parcel", "")  # 지번주소
+
+        if not pnu:
+            logger.warning(f"항목에 PNU 정보가 없습니다: {item}")
+            continue
+
+        # 필요한 주소 정보 추출
+        address_info = {
+            "pnu": pnu,
+            "parcel_address": parcel_address,
+            "road_address": item_address.get("road", ""),
+            "sido": item_address.get("sido", ""),
+            "sigungu": item_address.get("sigungu", ""),
+            "zipcode": item_address.get("zipcode", ""),
+            "bldnm": item_address.get("bldnm", ""),
+            "point": item.get("point", {})
+        }
+
+        processed_items.append({
+            "pnu": pnu,
+            "parcel_address": parcel_address,
+            "address_info": address_info
+        })
+    logger.info(f"주소 '{address}'의 PNU {len(processed_items)}건 조회")
+    return processed_items
+
+
+class VWorldClient:
+    """
+    V-World 주소 검색 API 클라이언트
+
+    - 앱 수명 동안 하나의 aiohttp 세션(커넥션 풀)을 재사용하고 연결/읽기 타임아웃을 적용
+    - 정규화한 주소 → 처리된 결과를 LRU+TTL 캐시에 보관 (선택적으로 SQLite 에 영속화)
+    - 같은 주소에 대한 동시 요청은 하나의 외부 호출로 합침 (single-flight)
+    - 외부 API 장애 시 서킷 브레이커로 즉시 실패 처리
+    """
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.cache = TTLCache(VWORLD_CACHE_SIZE, VWORLD_CACHE_TTL)
+        self.breaker = CircuitBreaker(VWORLD_BREAKER_THRESHOLD, VWORLD_BREAKER_RESET_SECONDS)
+        self.upstream_calls = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._store: Optional[_SqliteStore] = None
+
+    async def start(self) -> None:
+        if not VWORLD_API_KEY:
+            logger.error("VWORLD_API_KEY 가 설정되지 않아 V-World 주소 검색(/data/jibunAddr)을 사용할 수 없습니다.")
+        self.session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(connect=VWORLD_CONNECT_TIMEOUT, sock_read=VWORLD_READ_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=VWORLD_MAX_CONNECTIONS, ttl_dns_cache=300),
+        )
+        if VWORLD_CACHE_DB:
+            try:
+                self._store = _SqliteStore(VWORLD_CACHE_DB)
+                for key, value, expires_at in reversed(await self._store.load(VWORLD_CACHE_SIZE)):
+                    self.cache.set(key, json.loads(value), expires_at)
+                logger.info(f"V-World 캐시 {len(self.cache)}건 복원: {VWORLD_CACHE_DB}")
+            except Exception as e:
+                logger.error(f"V-World 캐시 파일을 열 수 없습니다: {str(e)}")
+                self._store = None
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cache_size": len(self.cache),
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "inflight": len(self._inflight),
+            "upstream_calls": self.upstream_calls,
+            "breaker_state": self.breaker.state,
+            "breaker_failures": self.breaker.failures,
+            "api_key_configured": bool(VWORLD_API_KEY),
+        }
+
+    async def search(self, address: str) -> Dict[str, Any]:
+        """
+        주소를 V-World API 로 검색하여 PNU 목록을 반환합니다.
+
+        Returns:
+            Dictionary containing:
+            - items: 모든 결과 항목 (성공 시)
+            - error: 오류 메시지 (실패 시)
+            - status: 상태 코드
+        """
+        key = normalize_address(address)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # 같은 주소를 조회 중인 요청이 있으면 그 결과를 함께 사용 (single-flight)
+        # 먼저 요청한 클라이언트가 연결을 끊어도 외부 호출은 계속되도록 별도 태스크로 실행
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_and_cache(key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_cache(self, key: str) -> Dict[str, Any]:
+        result = await self._fetch(key)
+        if result.get("status") in _CACHEABLE_STATUSES:
+            self.cache.set(key, result)
+            if self._store is not None:
+                self._store.save(key, result, time.time() + VWORLD_CACHE_TTL)
+        return result
+
+    async def _fetch(self, address: str) -> Dict[str, Any]:
+        if not VWORLD_API_KEY:
+            return {
+                "error": "V-World API 키(VWORLD_API_KEY)가 설정되지 않아 조회할 수 없습니다.",
+                "status": "error"
+            }
+
+        if not self.breaker.allow():
+            logger.warning(f"V-World API 차단 중 (서킷 브레이커 열림), 주소: {address}")
+            return {
+                "error": "V-World API 장애로 일시적으로 조회할 수 없습니다.",
+                "status": "error"
+            }
+
+        params = {
+            "request": "search",
+            "key": VWORLD_API_KEY,
+            "query": address,
+            "type": "address",
+            "category": "PARCEL",
+            "size": "100",
+            "page": "1"
+        }
+
+        start_time = time.time()
+        self.upstream_calls += 1
+        try:
+            async with self.session.get(VWORLD_BASE_URL, params=params) as response:
+                logger.info(f"V-World API 응답 시간: {time.time() - start_time:.4f}초")
+
+                # 응답 상태 확인
+                if response.status != 200:
+                    logger.error(f"V-World API 오류: 상태 코드 {response.status}")
+                    if response.status >= 500:
+                        self.breaker.record_failure()
+                    else:
+                        self.breaker.record_success()
+                    return {
+                        "error": f"API 요청 실패: 상태 코드 {response.status}",
+                        "status": "error"
+                    }
+
+                # JSON 응답 파싱
+                data = await response.json(content_type=None)
+        except Exception as e:
+            self.breaker.record_failure()
+            logger.error(f"PNU 조회 중 오류 발생: {type(e).__name__} {str(e)}")
+            return {
+                "error": f"PNU 조회 중 오류 발생: {str(e)}",
+                "status": "error"
+            }
+
+        self.breaker.record_success()
+
+        # 응답 데이터 확인
+        if data.get("response", {}).get("status") != "OK":
+            error_msg = data.get("response", {}).get("error", {}).get("text", "알 수 없는 오류")
+            logger.error(f"V-World API 오류: {error_msg}")
+            return {
+                "error": f"API 응답 오류: {error_msg}",
+                "status": "error"
+            }
+
+        # 결과 항목 확인
+        items = data.get("response", {}).get("result", {}).get("items", [])
+        if not items:
+            logger.warning(f"주소 '{address}'에 대한 결과가 없습니다.")
+            return {
+                "error": "주소에 대한 결과가 없습니다.",
+                "status": "not_found"
+            }
+
+        processed_items = _process_items(address, items)
+        if not processed_items:
+            return {
+                "error": "유효한 PNU 정보가 없습니다.",
+                "status": "no_valid_pnu"
+            }
+
+        return {
+            "items": processed_items,
+            "status": "success"
+        }
+
+
+vworld_client = VWorldClient()
@@ -0,0 +1,215 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# 작업 부류 (이름:동시 요청 수:대기열 길이:최대 대기 시간(초)[:쿼리 제한 시간(초)], 쉼표로 구분 / 동시 요청 수 0이면 제한 없음)
+# 부류별 동시 요청 수의 합을 노드별 풀 크기(DATABASE_POOL_MAX_SIZE) 이하로 두면 한 부류가 커넥션을 모두 차지하지 못합니다.
+# 쿼리 제한 시간을 넘은 쿼리는 서버에서 취소되고 504 로 응답합니다. (생략하거나 0이면 풀의 command_timeout)
+WORKLOAD_CLASSES = os.getenv(
+    "WORKLOAD_CLASSES",
+    "point:12:100:2:5,scan:5:20:5:15,export:3:5:10:300,admin:2:10:30:120",
+)
+# 경로 → 부류 ([메서드 ]경로 접두사=부류, 쉼표로 구분, 가장 긴 접두사 우선), 일치하지 않으면 기본 부류
+WORKLOAD_ROUTES = os.getenv(
+    "WORKLOAD_ROUTES",
+    "/download/=export,/data/roadAddr/=scan,/data/bonboo/=scan,POST /data/pnu=scan,/admin/=admin",
+)
+WORKLOAD_DEFAULT_CLASS = os.getenv("WORKLOAD_DEFAULT_CLASS", "point")
+
+# 커넥션을 얻는 요청의 부류 (풀 대기 시간 지표 라벨, 백그라운드 작업은 "background")
+current_workload: contextvars.ContextVar[str] = contextvars.ContextVar("current_workload", default="background")
+
+
+class WorkloadRejected(Exception):
+    def __init__(self, workload: "WorkloadClass", reason: str):
+        super().__init__(f"{workload.name} 작업이 포화 상태입니다. ({reason})")
+        self.workload = workload
+        self.reason = reason
+
+
+class WorkloadClass:
+    """
+    작업 부류 하나의 입장 제어
+
+    동시에 처리하는 요청 수를 concurrency 로 제한하고, 자리가 없으면 queue 개까지만 timeout 초 동안 기다리게 합니다.
+    대기열이 가득 찼거나 제한 시간 안에 자리가 나지 않으면 바로 거절하여,
+    무거운 요청이 몰려도 다른 부류의 요청은 커넥션을 기다리지 않습니다.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue: int, timeout: float, statement_timeout: Optional[float] = None):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.timeout = timeout
+        self.statement_timeout = statement_timeout or None
+        self.retry_after = max(1, round(timeout))
+        self._semaphore = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+        self.in_use = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {"queue": 0, "timeout": 0}
+
+    async def admit(self) -> None:
+        """
+        자리가 날 때까지 기다렸다가 입장합니다. (응답 전송이 끝나면 release)
+
+        Raises:
+            WorkloadRejected: 대기열이 가득 찼거나 제한 시간 안에 자리가 나지 않은 경우
+        """
+        semaphore = self._semaphore
+        if semaphore is not None:
+            if semaphore.locked():
+                if self.waiting >= self.queue:
+                    self._reject("queue")
+                start_time = time.perf_counter()
+                self.waiting += 1
+                try:
+                    await asyncio.wait_for(semaphore.acquire(), self.timeout)
+                except asyncio.TimeoutError:
+                    self._reject("timeout")
+                finally:
+                    self.waiting -= 1
+                metrics.workload_admission_wait_seconds.observe(time.perf_counter() - start_time, (self.name,))
+            else:
+                await semaphore.acquire()
+                metrics.workload_admission_wait_seconds.observe(0.0, (self.name,))
+        self.in_use += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.in_use -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def _reject(self, reason: str) -> None:
+        self.rejected[reason] += 1
+        metrics.workload_rejections_total.inc((self.name, reason))
+        raise WorkloadRejected(self, reason)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "queue": self.queue,
+            "timeout": self.timeout,
+            "statement_timeout": self.statement_timeout,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
+
+
+def parse_classes(spec: str) -> Dict[str, WorkloadClass]:
+    classes = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, concurrency, queue, timeout, *statement_timeout = (part.strip() for part in item.split(":"))
+        classes[name] = WorkloadClass(
+            name, int(concurrency), int(queue), float(timeout),
+            float(statement_timeout[0]) if statement_timeout else None,
+        )
+    return classes
+
+
+def parse_routes(spec: str) -> List[Tuple[Optional[str], str, str]]:
+    """경로 규칙을 (메서드 또는 None, 접두사, 부류) 목록으로 바꿉니다. (긴 접두사 먼저)"""
+    routes = []
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        target, _, name = item.rpartition("=")
+        method, _, prefix = target.strip().rpartition(" ")
+        routes.append((method.upper() or None, prefix, name.strip()))
+    routes.sort(key=lambda route: len(route[1]), reverse=True)
+    return routes
+
+
+class WorkloadRouter:
+    """경로별 작업 부류 선택"""
+
+    def __init__(self, classes: Dict[str, WorkloadClass], routes: List[Tuple[Optional[str], str, str]], default: str):
+        unknown = {name for _, _, name in routes if name not in classes} | ({default} - set(classes))
+        if unknown:
+            raise ValueError(f"WORKLOAD_CLASSES 에 없는 부류: {', '.join(sorted(unknown))}")
+        self.classes = classes
+        self.routes = routes
+        self.default = classes[default]
+
+    def classify(self, method: str, path: str) -> WorkloadClass:
+        for route_method, prefix, name in self.routes:
+            if path.startswith(prefix) and (route_method is None or route_method == method):
+                return self.classes[name]
+        return self.default
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "classes": {name: workload.stats() for name, workload in self.classes.items()},
+            "routes": [f"{method + ' ' if method else ''}{prefix}={name}" for method, prefix, name in self.routes],
+            "default": self.default.name,
+        }
+
+
+workloads = WorkloadRouter(parse_classes(WORKLOAD_CLASSES), parse_routes(WORKLOAD_ROUTES), WORKLOAD_DEFAULT_CLASS)
+
+
+def statement_timeout() -> Optional[float]:
+    """현재 요청 부류의 쿼리 제한 시간(초)을 반환합니다. (백그라운드 작업이거나 정하지 않았으면 None)"""
+    workload = workloads.classes.get(current_workload.get())
+    return workload.statement_timeout if workload is not None else None
+
+
+def watch_workloads() -> None:
+    """/metrics 출력 시 부류별 처리 중/대기 요청 수를 함께 내보냅니다."""
+    def collect():
+        for name, workload in workloads.classes.items():
+            metrics.workload_requests.set(workload.in_use, (name, "in_use"))
+            metrics.workload_requests.set(workload.waiting, (name, "waiting"))
+    metrics.registry.add_collector(collect)
+
+
+watch_workloads()
+
+
+async def _release_after(body_iterator: AsyncIterator[bytes], workload: WorkloadClass) -> AsyncIterator[bytes]:
+    """응답 본문 전송(다운로드 스트리밍 포함)이 끝나면 자리를 돌려줍니다."""
+    try:
+        async for chunk in body_iterator:
+            yield chunk
+    finally:
+        workload.release()
+
+
+async def workload_middleware(request: Request, call_next):
+    """경로별 작업 부류의 자리를 얻은 요청만 처리하고, 포화 상태면 503 과 Retry-After 로 바로 거절합니다."""
+    workload = workloads.classify(request.method, request.url.path)
+    try:
+        await workload.admit()
+    except WorkloadRejected as e:
+        logger.warning(f"요청 거절: {request.method} {request.url.path} - {e}")
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Service busy: {workload.name}"},
+            headers={"Retry-After": str(workload.retry_after)},
+        )
+
+    token = current_workload.set(workload.name)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        workload.release()
+        raise
+    finally:
+        current_workload.reset(token)
+    response.body_iterator = _release_after(response.body_iterator, workload)
+    return response
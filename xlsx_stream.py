@@ -0,0 +1,178 @@
+import math
+import re
+import zipfile
+from decimal import Decimal
+from typing import Any, Iterable, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+# 엑셀 시트 한 장의 최대 행 수 (헤더 포함 1,048,576행)
+EXCEL_MAX_SHEET_ROWS = 1048576
+
+# XML 1.0 에서 허용되지 않는 제어 문자
+_ILLEGAL_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+_XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+# 시트 개수와 무관하게 미리 쓸 수 있도록 xml 확장자의 기본 타입을 워크시트로 지정
+_CONTENT_TYPES = (
+    _XML_HEADER
+    + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    + '<Default Extension="xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    + '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    + '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    + '</Types>'
+)
+
+_ROOT_RELS = (
+    _XML_HEADER
+    + f'<Relationships xmlns="{_PKG_REL_NS}">'
+    + f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+    + '</Relationships>'
+)
+
+_STYLES = (
+    _XML_HEADER
+    + f'<styleSheet xmlns="{_MAIN_NS}">'
+    + '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    + '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    + '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    + '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    + '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    + '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    + '</styleSheet>'
+)
+
+_SHEET_START = _XML_HEADER + f'<worksheet xmlns="{_MAIN_NS}"><sheetData>'
+_SHEET_END = '</sheetData></worksheet>'
+
+
+class _ChunkSink:
+    """zipfile 이 쓰는 바이트를 모아 두었다가 drain() 으로 넘겨주는 출력 객체 (seek 불가)"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, Decimal)) or (isinstance(value, float) and math.isfinite(value)):
+        return f'<c><v>{value}</v></c>'
+    text = _ILLEGAL_XML_CHARS.sub("", str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _row(values: Iterable[Any]) -> str:
+    return '<row>' + ''.join(_cell(v) for v in values) + '</row>'
+
+
+class XlsxStreamWriter:
+    """
+    행 단위로 XLSX 파일을 만들어 내는 스트리밍 작성기
+
+    공유 문자열 테이블 없이 인라인 문자열로 셀을 기록하므로 행 수와 관계없이
+    메모리 사용량이 일정합니다. 작성된 바이트는 drain() 으로 꺼내 전송합니다.
+    시트 행 수가 max_rows_per_sheet 에 도달하면 헤더를 반복하여 다음 시트로 넘어갑니다.
+
+    메서드는 블로킹(압축) 작업이므로 이벤트 루프가 아닌 스레드에서 호출해야 하며,
+    동시에 두 스레드에서 호출하지 않아야 합니다.
+    """
+
+    def __init__(self, columns: Sequence[str], max_rows_per_sheet: int = EXCEL_MAX_SHEET_ROWS - 1,
+                 compresslevel: int = 6):
+        self.columns = list(columns)
+        self.max_rows_per_sheet = max(1, min(max_rows_per_sheet, EXCEL_MAX_SHEET_ROWS - 1))
+        self.row_count = 0
+        self._sink = _ChunkSink()
+        self._zip = zipfile.ZipFile(self._sink, "w", compression=zipfile.ZIP_DEFLATED,
+                                    compresslevel=compresslevel)
+        self._sheet_names: List[str] = []
+        self._sheet = None
+        self._sheet_rows = 0
+        self._header = _row(self.columns).encode("utf-8")
+
+        self._zip.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._open_sheet()
+
+    def _open_sheet(self, name: Optional[str] = None) -> None:
+        index = len(self._sheet_names) + 1
+        self._sheet_names.append(name or f"Sheet{index}")
+        # 크기를 미리 알 수 없고 되돌아가 헤더를 고칠 수 없으므로(seek 불가), 2 GiB 를 넘는 시트도 쓸 수 있게 ZIP64 로 엶
+        self._sheet = self._zip.open(f"xl/worksheets/sheet{index}.xml", "w", force_zip64=True)
+        self._sheet.write(_SHEET_START.encode("utf-8"))
+        self._sheet.write(self._header)
+        self._sheet_rows = 0
+
+    def _close_sheet(self) -> None:
+        self._sheet.write(_SHEET_END.encode("utf-8"))
+        self._sheet.close()
+        self._sheet = None
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        buffer = []
+        for values in rows:
+            if self._sheet_rows >= self.max_rows_per_sheet:
+                self._sheet.write("".join(buffer).encode("utf-8"))
+                buffer = []
+                self._close_sheet()
+                self._open_sheet()
+            buffer.append(_row(values))
+            self._sheet_rows += 1
+            self.row_count += 1
+        if buffer:
+            self._sheet.write("".join(buffer).encode("utf-8"))
+
+    def add_notice_sheet(self, name: str, message: str) -> None:
+        """결과가 잘린 경우 등 안내 문구만 담은 시트를 추가합니다."""
+        self._close_sheet()
+        index = len(self._sheet_names) + 1
+        self._sheet_names.append(name)
+        with self._zip.open(f"xl/worksheets/sheet{index}.xml", "w") as sheet:
+            sheet.write((_SHEET_START + _row([message]) + _SHEET_END).encode("utf-8"))
+
+    def close(self) -> None:
+        if self._sheet is not None:
+            self._close_sheet()
+
+        sheets = "".join(
+            f'<sheet name="{escape(name)}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self._sheet_names, start=1)
+        )
+        self._zip.writestr(
+            "xl/workbook.xml",
+            _XML_HEADER + f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>{sheets}</sheets></workbook>',
+        )
+
+        count = len(self._sheet_names)
+        rels = "".join(
+            f'<Relationship Id="rId{i}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, count + 1)
+        )
+        rels += f'<Relationship Id="rId{count + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/>'
+        self._zip.writestr("xl/_rels/workbook.xml.rels",
+                           _XML_HEADER + f'<Relationships xmlns="{_PKG_REL_NS}">{rels}</Relationships>')
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+
+    def drain(self) -> bytes:
+        """지금까지 작성된 바이트를 꺼냅니다."""
+        return self._sink.drain()